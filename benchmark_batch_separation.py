@@ -0,0 +1,85 @@
+import argparse
+import time
+from ortools.sat.python import cp_model
+from preprocessing import load_course_data, build_lookup_tables, split_practical_courses
+
+DEFAULT_FILES = ['new_merged_data.csv', 'updated_lab_distribution.csv']
+NUM_DAYS = 6
+NUM_SLOTS = 7
+
+def add_batch_variables(model, course, teachers):
+    """The per-(teacher, day, slot) batch variables timetablr_6/timetablr_7 create for a split course"""
+    batch_assignments = {}
+    for batch in [1, 2]:
+        batch_assignments[batch] = {(teacher, d, s): model.NewBoolVar(f'batch{batch}_{course}_{teacher}_day{d}_slot{s}')
+                                    for teacher in teachers for d in range(NUM_DAYS) for s in range(NUM_SLOTS)}
+        model.Add(sum(batch_assignments[batch].values()) == 1)
+    return batch_assignments
+
+def legacy_separation(model, course, teachers, batch_assignments):
+    """Pairwise encoding used before: one constraint per teacher and pair of batch 1/batch 2 slots"""
+    for teacher in teachers:
+        for d1 in range(NUM_DAYS):
+            for s1 in range(NUM_SLOTS):
+                for d2 in range(NUM_DAYS):
+                    for s2 in range(NUM_SLOTS):
+                        model.Add(batch_assignments[1][(teacher, d1, s1)] +
+                                  batch_assignments[2][(teacher, d2, s2)] <= 1)
+
+def linear_separation(model, course, teachers, batch_assignments):
+    """Indicator encoding now used: 'teaches batch k' literals and an at-most-one per teacher"""
+    for teacher in teachers:
+        teaches = []
+        for batch in [1, 2]:
+            teaches_batch = model.NewBoolVar(f'batch{batch}_{course}_{teacher}')
+            model.Add(teaches_batch == sum(batch_assignments[batch][(teacher, d, s)]
+                                           for d in range(NUM_DAYS) for s in range(NUM_SLOTS)))
+            teaches.append(teaches_batch)
+        model.AddAtMostOne(teaches)
+
+def build(courses, encoding):
+    model = cp_model.CpModel()
+    batches = {}
+    start = time.perf_counter()
+    for course, teachers in courses.items():
+        batches[course] = add_batch_variables(model, course, teachers)
+        encoding(model, course, teachers, batches[course])
+    return time.perf_counter() - start, model, batches
+
+def same_teacher_allowed(courses, encoding):
+    """Whether any split course can give both batches to the same teacher (should be False)"""
+    for course, teachers in courses.items():
+        model = cp_model.CpModel()
+        batches = add_batch_variables(model, course, teachers)
+        encoding(model, course, teachers, batches)
+        teacher = teachers[0]
+        model.Add(sum(batches[1][(teacher, d, s)] for d in range(NUM_DAYS) for s in range(NUM_SLOTS)) == 1)
+        model.Add(sum(batches[2][(teacher, d, s)] for d in range(NUM_DAYS) for s in range(NUM_SLOTS)) == 1)
+        if cp_model.CpSolver().Solve(model) != cp_model.INFEASIBLE:
+            return True
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the pairwise and linear batch-separation encodings')
+    parser.add_argument('csv_files', nargs='*', default=DEFAULT_FILES, help='Course CSV files with a registration column')
+
+    args = parser.parse_args()
+
+    print(f"{'File':<30} {'Courses':>7} {'Encoding':<9} {'Variables':>9} {'Constraints':>11} {'Build (s)':>9}  Same teacher on both batches")
+    for csv_file in args.csv_files:
+        df = load_course_data(csv_file)
+        if df is None:
+            continue
+        tables = build_lookup_tables(df)
+        courses = {course: tables['qualified_teachers'][course]
+                   for course in split_practical_courses(tables['subject_rows'])
+                   if len(tables['qualified_teachers'][course]) >= 2}
+        for name, encoding in [('pairwise', legacy_separation), ('linear', linear_separation)]:
+            seconds, model, _ = build(courses, encoding)
+            proto = model.Proto()
+            allowed = 'allowed' if same_teacher_allowed(courses, encoding) else 'forbidden'
+            print(f"{csv_file:<30} {len(courses):>7} {name:<9} {len(proto.variables):>9} "
+                  f"{len(proto.constraints):>11} {seconds:>9.3f}  {allowed}")
+
+if __name__ == "__main__":
+    main()
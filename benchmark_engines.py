@@ -0,0 +1,256 @@
+import argparse
+import csv
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from synthetic_data import generate_course_mapping
+
+# engine name: (module, entry point, column layout of the input it reads, extra keyword arguments)
+ENGINES = {
+    'timetable_core': ('timetable_core', 'create_timetable', 'course_mapping', {}),
+    'timetable_core_interval': ('timetable_core', 'create_timetable', 'course_mapping', {'encoding': 'interval'}),
+    'timetable_manager': ('timetable_manager', 'create_timetable', 'course_mapping', {}),
+    'withslot': ('withslot', 'create_timetable', 'course_mapping', {}),
+    'timetable_3': ('timetable_3', 'create_timetable', 'course_mapping', {}),
+    'usingMLIP': ('usingMLIP', 'create_milp_timetable', 'code_credits', {}),
+    'usingga': ('usingga', 'genetic_algorithm', 'code_credits', {})
+}
+DEFAULT_TEACHERS = [10, 50, 200]
+HISTORY_FIELDS = ['timestamp', 'engine', 'teachers', 'subjects', 'rows', 'practical_share', 'open_elective_share',
+                  'seed', 'status', 'build_time', 'variables', 'constraints', 'solves', 'time_to_first_feasible',
+                  'time_to_optimal', 'total_time', 'peak_rss_mb', 'error']
+RESULT_MARKER = 'BENCHMARK_RESULT '
+
+def instrument_cp_sat(stats, start, time_limit):
+    """
+    Wrap CpSolver.Solve to record model size, build time and the time of the first solution.
+
+    An engine's own solution callback is kept; its first call is stamped before it runs.
+    """
+    from ortools.sat.python import cp_model
+
+    class FirstSolutionCallback(cp_model.CpSolverSolutionCallback):
+        def on_solution_callback(self):
+            if stats['time_to_first_feasible'] is None:
+                stats['time_to_first_feasible'] = time.perf_counter() - start
+
+    def stamp_first_solution(callback):
+        engine_callback = callback.on_solution_callback
+
+        def on_solution_callback():
+            if stats['time_to_first_feasible'] is None:
+                stats['time_to_first_feasible'] = time.perf_counter() - start
+            engine_callback()
+
+        # OnSolutionCallback looks the method up on the instance, so this shadows the class's
+        callback.on_solution_callback = on_solution_callback
+        return callback
+
+    original_solve = cp_model.CpSolver.Solve
+
+    def solve(solver, model, solution_callback=None):
+        if stats['build_time'] is None:
+            stats['build_time'] = time.perf_counter() - start
+        proto = model.Proto()
+        stats['variables'] += len(proto.variables)
+        stats['constraints'] += len(proto.constraints)
+        stats['solves'] += 1
+        if time_limit:
+            solver.parameters.max_time_in_seconds = time_limit
+        callback = stamp_first_solution(solution_callback) if solution_callback else FirstSolutionCallback()
+        status = original_solve(solver, model, callback)
+        stats['statuses'].append(solver.StatusName(status))
+        stats['solve_end'] = time.perf_counter() - start
+        return status
+
+    cp_model.CpSolver.Solve = solve
+
+def instrument_pulp(stats, start, time_limit):
+    """Wrap LpProblem.solve to record model size and build time"""
+    try:
+        import pulp
+    except ImportError:
+        return
+
+    original_solve = pulp.LpProblem.solve
+
+    def solve(problem, solver=None, **kwargs):
+        if stats['build_time'] is None:
+            stats['build_time'] = time.perf_counter() - start
+        stats['variables'] += problem.numVariables()
+        stats['constraints'] += problem.numConstraints()
+        stats['solves'] += 1
+        if solver is None and time_limit:
+            solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit)
+        status = original_solve(problem, solver, **kwargs)
+        stats['statuses'].append('OPTIMAL' if status == pulp.LpStatusOptimal else pulp.LpStatus[status].upper())
+        stats['solve_end'] = time.perf_counter() - start
+        return status
+
+    pulp.LpProblem.solve = solve
+
+def run_engine(engine, csv_file, time_limit=None):
+    """Run one engine on one input inside the current process and collect its statistics"""
+    module_name, function_name, _, kwargs = ENGINES[engine]
+    stats = {'build_time': None, 'variables': 0, 'constraints': 0, 'solves': 0, 'statuses': [],
+             'time_to_first_feasible': None, 'solve_end': None, 'error': None}
+    start = time.perf_counter()
+    instrument_cp_sat(stats, start, time_limit)
+    instrument_pulp(stats, start, time_limit)
+
+    result = None
+    try:
+        module = importlib.import_module(module_name)
+        result = getattr(module, function_name)(csv_file, **kwargs)
+    except Exception as e:
+        stats['error'] = f"{type(e).__name__}: {e}"
+    stats['total_time'] = time.perf_counter() - start
+
+    statuses = stats.pop('statuses')
+    solve_end = stats.pop('solve_end')
+    if stats['error']:
+        stats['status'] = 'ERROR'
+    elif result is None:
+        stats['status'] = next((s for s in statuses if s not in ('OPTIMAL', 'FEASIBLE')), 'NO_SOLUTION')
+    elif statuses and all(s == 'OPTIMAL' for s in statuses):
+        stats['status'] = 'OPTIMAL'
+    else:
+        stats['status'] = 'FEASIBLE'
+    stats['time_to_optimal'] = solve_end if stats['status'] == 'OPTIMAL' else None
+    return stats
+
+def write_engine_input(df, layout, path):
+    """Write the generated data in the column layout an engine reads"""
+    if layout == 'code_credits':
+        df = df.rename(columns={'course_code': 'Code', 'credits': 'Credits'})
+    df.to_csv(path, index=False)
+    return path
+
+def run_in_subprocess(engine, csv_file, time_limit, timeout, verbose=False):
+    """
+    Run an engine in a fresh interpreter so that every measurement starts from a clean
+    process and peak RSS covers only that engine. Needs a POSIX system for os.wait4.
+    """
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', engine, csv_file]
+    if time_limit:
+        cmd += ['--time-limit', str(time_limit)]
+
+    with tempfile.TemporaryFile(mode='w+') as out:
+        proc = subprocess.Popen(cmd, stdout=out, stderr=None if verbose else subprocess.DEVNULL,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        deadline = time.monotonic() + timeout if timeout else None
+        timed_out = False
+        while True:
+            pid, wait_status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if deadline and time.monotonic() > deadline:
+                proc.kill()
+                pid, wait_status, usage = os.wait4(proc.pid, 0)
+                timed_out = True
+                break
+            time.sleep(0.05)
+        proc.returncode = os.waitstatus_to_exitcode(wait_status)
+
+        out.seek(0)
+        lines = [line for line in out.read().splitlines() if line.startswith(RESULT_MARKER)]
+
+    if lines:
+        stats = json.loads(lines[-1][len(RESULT_MARKER):])
+    else:
+        stats = {'status': 'TIMEOUT' if timed_out else 'CRASHED',
+                 'error': f"killed after {timeout}s" if timed_out else f"exit code {proc.returncode}"}
+    # ru_maxrss is reported in kilobytes on Linux
+    stats['peak_rss_mb'] = round(usage.ru_maxrss / 1024, 1)
+    return stats
+
+def append_history(records, history_prefix):
+    """Append benchmark records to <prefix>.jsonl and <prefix>.csv"""
+    with open(f'{history_prefix}.jsonl', 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+
+    csv_path = f'{history_prefix}.csv'
+    new_file = not os.path.exists(csv_path)
+    with open(csv_path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=HISTORY_FIELDS, extrasaction='ignore')
+        if new_file:
+            writer.writeheader()
+        writer.writerows(records)
+
+def format_seconds(value):
+    return '-' if value is None else f'{value:.2f}'
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the timetable engines on synthetic course mappings')
+    parser.add_argument('--teachers', '-t', type=int, nargs='+', default=DEFAULT_TEACHERS,
+                        help=f'Instance sizes in number of faculty (default: {DEFAULT_TEACHERS})')
+    parser.add_argument('--engines', '-e', nargs='+', choices=sorted(ENGINES), default=sorted(ENGINES),
+                        help='Engines to run (default: all)')
+    parser.add_argument('--practical-share', type=float, default=0.3,
+                        help='Share of subjects with practical hours (default: 0.3)')
+    parser.add_argument('--open-elective-share', type=float, default=0.05,
+                        help='Share of subjects that are open electives (default: 0.05)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the generator (default: 0)')
+    parser.add_argument('--time-limit', type=float, default=60,
+                        help='Solver time limit per solve in seconds (default: 60)')
+    parser.add_argument('--timeout', type=float, default=600,
+                        help='Wall-clock limit per engine run in seconds (default: 600)')
+    parser.add_argument('--history', default='benchmark_history',
+                        help='Prefix of the .jsonl/.csv files results are appended to (default: benchmark_history)')
+    parser.add_argument('--keep-inputs', default=None, help='Directory to keep the generated inputs in')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Show the engines\' own log output')
+    parser.add_argument('--worker', nargs=2, metavar=('ENGINE', 'CSV'), help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.worker:
+        engine, csv_file = args.worker
+        print(RESULT_MARKER + json.dumps(run_engine(engine, csv_file, args.time_limit)), flush=True)
+        return
+
+    input_dir = args.keep_inputs or tempfile.mkdtemp(prefix='timetable_benchmark_')
+    os.makedirs(input_dir, exist_ok=True)
+
+    print(f"{'Engine':<24} {'Teachers':>8} {'Status':<12} {'Build (s)':>9} {'Vars':>9} {'Cons':>9} "
+          f"{'First (s)':>9} {'Optimal (s)':>11} {'Total (s)':>9} {'RSS (MB)':>9}")
+    records = []
+    for num_teachers in args.teachers:
+        df = generate_course_mapping(num_teachers, practical_share=args.practical_share,
+                                     open_elective_share=args.open_elective_share, seed=args.seed)
+        for engine in args.engines:
+            layout = ENGINES[engine][2]
+            csv_file = os.path.join(input_dir, f'synthetic_{num_teachers}_{args.seed}_{layout}.csv')
+            if not os.path.exists(csv_file):
+                write_engine_input(df, layout, csv_file)
+
+            stats = run_in_subprocess(engine, csv_file, args.time_limit, args.timeout, args.verbose)
+            record = {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'engine': engine,
+                'teachers': num_teachers,
+                'subjects': int(df['course_code'].nunique()),
+                'rows': len(df),
+                'practical_share': args.practical_share,
+                'open_elective_share': args.open_elective_share,
+                'seed': args.seed,
+                **stats
+            }
+            records.append(record)
+            print(f"{engine:<24} {num_teachers:>8} {record['status']:<12} {format_seconds(record.get('build_time')):>9} "
+                  f"{record.get('variables', 0):>9} {record.get('constraints', 0):>9} "
+                  f"{format_seconds(record.get('time_to_first_feasible')):>9} "
+                  f"{format_seconds(record.get('time_to_optimal')):>11} {format_seconds(record.get('total_time')):>9} "
+                  f"{record['peak_rss_mb']:>9}", flush=True)
+            if record.get('error'):
+                print(f"    {record['error']}")
+
+    append_history(records, args.history)
+    print(f"Results appended to {args.history}.jsonl and {args.history}.csv")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import time
+from preprocessing import load_course_data, build_lookup_tables
+
+DEFAULT_FILES = ['course_mapping_output.csv', 'matched_course_teacher-1.csv',
+                 'lab_hours_less_than_3.csv', 'practical_hours_gt_3_lt_5.csv', 'merge.csv']
+
+def legacy_lookup_tables(df):
+    """The per-teacher/per-subject DataFrame scans the solvers used before build_lookup_tables"""
+    teachers = sorted(df['Faculty'].dropna().unique().tolist())
+    teacher_subjects = {teacher: df[df['Faculty'] == teacher]['Subject'].unique().tolist()
+                        for teacher in teachers}
+    qualified_teachers = {}
+    subject_rows = {}
+    subject_primary_teacher = {}
+    for subj in df['Subject'].unique():
+        qualified_teachers[subj] = df[df['Subject'] == subj]['Faculty'].unique().tolist()
+        subj_data = df[df['Subject'] == subj].iloc[0]
+        subject_rows[subj] = subj_data.to_dict()
+        subject_primary_teacher[subj] = df[df['Subject'] == subj].iloc[0]['Faculty']
+    return {
+        'teachers': teachers,
+        'teacher_subjects': teacher_subjects,
+        'qualified_teachers': qualified_teachers,
+        'subject_rows': subject_rows,
+        'subject_primary_teacher': subject_primary_teacher,
+        'subject_practical_hours': dict(zip(df['Subject'], df['practical_hours'])),
+    }
+
+def time_call(func, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def check_same(legacy, tables):
+    """Confirm both stages produce the same lookups"""
+    for key in ['teachers', 'teacher_subjects', 'subject_primary_teacher', 'subject_practical_hours']:
+        if legacy[key] != tables[key]:
+            return f"'{key}' differs"
+    for subj, row in legacy['subject_rows'].items():
+        if any(row[col] != tables['subject_rows'][subj][col]
+               for col in ['lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']):
+            return f"'subject_rows' differs for {subj}"
+    for subj, faculty in legacy['qualified_teachers'].items():
+        if [teacher for teacher in faculty if teacher == teacher] != tables['qualified_teachers'][subj]:
+            return f"'qualified_teachers' differs for {subj}"
+    return "identical"
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the old and new solver input preprocessing')
+    parser.add_argument('csv_files', nargs='*', default=DEFAULT_FILES, help='Course CSV files to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, best is reported (default: 3)')
+
+    args = parser.parse_args()
+
+    print(f"{'File':<34} {'Rows':>7} {'Teachers':>8} {'Subjects':>8} {'Before (s)':>11} {'After (s)':>10} {'Speedup':>8}  Result")
+    for csv_file in args.csv_files:
+        df = load_course_data(csv_file)
+        if df is None:
+            continue
+        before, legacy = time_call(legacy_lookup_tables, df, args.repeat)
+        after, tables = time_call(build_lookup_tables, df, args.repeat)
+        print(f"{csv_file:<34} {len(df):>7} {len(tables['teachers']):>8} {len(tables['subject_rows']):>8} "
+              f"{before:>11.3f} {after:>10.3f} {before / after:>7.1f}x  {check_same(legacy, tables)}")
+
+if __name__ == "__main__":
+    main()
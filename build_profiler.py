@@ -0,0 +1,157 @@
+import argparse
+import importlib
+import json
+import logging
+import time
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+DEFAULT_PROFILE_FILE = 'build_profile.jsonl'
+PROFILED_ENGINES = ['timetable_core', 'withslot']
+
+def constraint_literals(ct):
+    """Number of variable occurrences (literals and linear terms) in a ConstraintProto"""
+    count = len(ct.enforcement_literal)
+    if ct.has_linear():
+        count += len(ct.linear.vars)
+    elif ct.has_bool_or():
+        count += len(ct.bool_or.literals)
+    elif ct.has_bool_and():
+        count += len(ct.bool_and.literals)
+    elif ct.has_at_most_one():
+        count += len(ct.at_most_one.literals)
+    elif ct.has_exactly_one():
+        count += len(ct.exactly_one.literals)
+    elif ct.has_bool_xor():
+        count += len(ct.bool_xor.literals)
+    elif ct.has_lin_max():
+        count += len(ct.lin_max.target.vars) + sum(len(expr.vars) for expr in ct.lin_max.exprs)
+    elif ct.has_no_overlap():
+        count += len(ct.no_overlap.intervals)
+    elif ct.has_cumulative():
+        count += len(ct.cumulative.intervals)
+    return count
+
+class BuildProfiler:
+    """
+    Record what each constraint family adds to a CP-SAT model while it is built.
+
+    Call section(name) before the code of each family; everything added until the next
+    section (or solve_started) is counted for that family. A family may be entered several
+    times, its numbers add up. A disabled profiler does nothing, so engines can call it
+    unconditionally.
+
+    Args:
+        model: The CpModel being built
+        engine: Engine name written to the report
+        enabled: Whether to record anything
+    """
+
+    def __init__(self, model, engine, enabled=True):
+        self.model = model
+        self.engine = engine
+        self.enabled = enabled
+        self.families = {}
+        self.current = None
+        self.teachers = None
+        self.solve_time = None
+        self.status = None
+        if enabled:
+            self._snapshot()
+
+    def _snapshot(self):
+        proto = self.model.Proto()
+        self.mark_time = time.perf_counter()
+        self.mark_variables = len(proto.variables)
+        self.mark_constraints = len(proto.constraints)
+
+    def _close(self):
+        name = self.current or 'other'
+        proto = self.model.Proto()
+        if self.current is None and len(proto.constraints) == self.mark_constraints \
+                and len(proto.variables) == self.mark_variables:
+            return
+        family = self.families.setdefault(name, {'family': name, 'wall_time': 0.0, 'variables': 0,
+                                                 'constraints': 0, 'literals': 0})
+        family['wall_time'] += time.perf_counter() - self.mark_time
+        family['variables'] += len(proto.variables) - self.mark_variables
+        family['constraints'] += len(proto.constraints) - self.mark_constraints
+        family['literals'] += sum(constraint_literals(proto.constraints[i])
+                                  for i in range(self.mark_constraints, len(proto.constraints)))
+        # Counting literals is not part of the build
+        self._snapshot()
+
+    def section(self, name):
+        """Start counting for the constraint family `name`"""
+        if not self.enabled:
+            return
+        self._close()
+        self.current = name
+
+    def solve_started(self, teachers=None):
+        """Close the last family; everything from here on is search time"""
+        if not self.enabled:
+            return
+        self._close()
+        self.current = None
+        self.teachers = teachers
+        self.solve_start = time.perf_counter()
+
+    def solve_finished(self, solver, status):
+        if not self.enabled:
+            return
+        self.solve_time = time.perf_counter() - self.solve_start
+        self.status = solver.StatusName(status)
+
+    def report(self):
+        """The profile as a JSON-serialisable dict, families sorted by wall time"""
+        families = sorted(self.families.values(), key=lambda family: family['wall_time'], reverse=True)
+        return {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'engine': self.engine,
+            'teachers': self.teachers,
+            'build_time': sum(family['wall_time'] for family in families),
+            'solve_time': self.solve_time,
+            'status': self.status,
+            'families': families
+        }
+
+    def save(self, profile_file):
+        """Append the report to a JSON-lines file and log it as a table"""
+        if not self.enabled:
+            return
+        report = self.report()
+        logging.info("Model build profile:\n" + format_report(report))
+        try:
+            with open(profile_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(report) + '\n')
+        except OSError as e:
+            logging.warning(f"Could not write build profile {profile_file}: {e}")
+
+def format_report(report):
+    """Console table of a build profile report"""
+    lines = [f"{'Family':<22} {'Time (s)':>9} {'Share':>6} {'Variables':>10} {'Constraints':>11} {'Literals':>10}"]
+    total = report['build_time'] or 1.0
+    for family in report['families']:
+        lines.append(f"{family['family']:<22} {family['wall_time']:>9.3f} {family['wall_time'] / total:>6.0%} "
+                     f"{family['variables']:>10} {family['constraints']:>11} {family['literals']:>10}")
+    lines.append(f"{'model build':<22} {report['build_time']:>9.3f}")
+    if report['solve_time'] is not None:
+        lines.append(f"{'search':<22} {report['solve_time']:>9.3f}  {report['status']}")
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile the model build of a CP-SAT engine per constraint family')
+    parser.add_argument('csv_file', help='Path to the CSV file containing course data')
+    parser.add_argument('--engine', '-e', choices=PROFILED_ENGINES, default='timetable_core',
+                        help='Engine to profile (default: timetable_core)')
+    parser.add_argument('--output', '-o', default=DEFAULT_PROFILE_FILE,
+                        help=f'JSON-lines file the report is appended to (default: {DEFAULT_PROFILE_FILE})')
+
+    args = parser.parse_args()
+
+    module = importlib.import_module(args.engine)
+    module.create_timetable(args.csv_file, profile_build=args.output)
+
+if __name__ == "__main__":
+    main()
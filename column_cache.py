@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Bump whenever what a loader stores changes, so older caches are rebuilt instead of read
+SCHEMA_VERSION = 1
+CACHE_DIR = '.column_cache'
+CATEGORICAL_COLUMNS = ['Faculty', 'Code', 'course_code', 'Subject', 'Section', 'Department']
+METADATA_KEY = b'column_cache'
+
+def arrow_available():
+    try:
+        import pyarrow.feather  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def cache_path(csv_file_path, kind):
+    """Feather file caching `kind` of a CSV, in the CACHE_DIR next to it"""
+    directory, name = os.path.split(os.path.abspath(csv_file_path))
+    return os.path.join(directory, CACHE_DIR, f'{name}.{kind}.feather')
+
+def file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+def source_stamp(csv_file_path):
+    stat = os.stat(csv_file_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(csv_file_path)}
+
+def read_cached(csv_file_path, kind):
+    """
+    The DataFrame cached for a CSV, or None if there is no usable cache.
+
+    The Feather file is memory-mapped. It is only used if it was written with the current
+    SCHEMA_VERSION for the same kind and the CSV still has the recorded size and
+    modification time, or else the recorded content hash.
+    """
+    path = cache_path(csv_file_path, kind)
+    if not os.path.exists(path) or not arrow_available():
+        return None
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    try:
+        table = feather.read_table(path, memory_map=True)
+        metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+        stat = os.stat(csv_file_path)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable column cache {path}: {e}")
+        return None
+
+    source = metadata.get('source', {})
+    if metadata.get('schema_version') != SCHEMA_VERSION or metadata.get('kind') != kind:
+        return None
+    if (source.get('size'), source.get('mtime_ns')) != (stat.st_size, stat.st_mtime_ns) \
+            and source.get('sha256') != file_sha256(csv_file_path):
+        return None
+    # Codes and names are stored dictionary-encoded but handed out as plain strings, as
+    # groupby(...).agg(list) in build_lookup_tables does not work on categorical columns
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    return table.to_pandas()
+
+def write_cached(df, csv_file_path, kind):
+    """Store a loaded DataFrame as an uncompressed Feather file, CATEGORICAL_COLUMNS dictionary-encoded"""
+    if not arrow_available():
+        logging.warning("pyarrow is not installed, the column cache is disabled")
+        return None
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    path = cache_path(csv_file_path, kind)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df = df.astype({col: 'category' for col in CATEGORICAL_COLUMNS if col in df.columns})
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {'schema_version': SCHEMA_VERSION, 'kind': kind, 'source': source_stamp(csv_file_path)}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: json.dumps(metadata)})
+    tmp_path = f'{path}.tmp'
+    # Uncompressed, so reads can map the columns instead of decoding them
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+    return path
+
+def cached_load(csv_file_path, kind, loader, create=False):
+    """
+    Load a CSV through its column cache.
+
+    The cache is used whenever a CACHE_DIR directory exists next to the CSV (or create is
+    set), and rewritten when it is missing or stale. Without pyarrow, or without the
+    directory, this is just loader(csv_file_path).
+
+    Args:
+        csv_file_path: CSV to load
+        kind: Name of what loader returns, part of the cache file name
+        loader: Function reading and validating the CSV, returning a DataFrame or None
+        create: Create the cache directory if needed
+
+    Returns:
+        What loader returns
+    """
+    enabled = create or os.path.isdir(os.path.dirname(cache_path(csv_file_path, kind)))
+    if enabled and os.path.exists(csv_file_path):
+        df = read_cached(csv_file_path, kind)
+        if df is not None:
+            return df
+
+    df = loader(csv_file_path)
+    if enabled and df is not None:
+        write_cached(df, csv_file_path, kind)
+    return df
+
+def read_csv_cached(csv_file_path, create=False):
+    """pd.read_csv of a raw input through its column cache, see cached_load"""
+    return cached_load(csv_file_path, 'raw', pd.read_csv, create=create)
+
+def main():
+    from preprocessing import read_course_data
+
+    parser = argparse.ArgumentParser(description='Build the column cache of CSV inputs')
+    parser.add_argument('csv_files', nargs='+', help='CSV files to cache')
+    parser.add_argument('--raw', action='store_true',
+                        help='Cache the files as read, e.g. data_teacher.csv, instead of as validated course mappings')
+
+    args = parser.parse_args()
+
+    if not arrow_available():
+        logging.error("❌ The column cache needs pyarrow (pip install pyarrow)")
+        return
+    kind, loader = ('raw', pd.read_csv) if args.raw else ('course_data', read_course_data)
+    for csv_file in args.csv_files:
+        df = cached_load(csv_file, kind, loader, create=True)
+        if df is not None:
+            logging.info(f"✅ Cached {len(df)} rows of {csv_file} in {cache_path(csv_file, kind)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import logging
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Fraction of all teachers in the largest component above which splitting the model is not worth it
+MONOLITHIC_COMPONENT_SHARE = 0.9
+
+def shared_teacher_groups(df, kinds=('practical', 'open_elective', 'section')):
+    """
+    Collect the groups of teachers that share a constraint in the solver models.
+
+    Args:
+        df: Course data with 'Faculty' and 'course_code' (or raw export 'Code') columns
+        kinds: Which links to include:
+            'practical' - teachers qualified for the same practical subject (shared batches)
+            'open_elective' - teachers of the same OpenElective subject
+            'section' - teachers of the same course in the same section (needs a 'Section' column)
+
+    Returns:
+        List of (kind, teachers) tuples
+    """
+    df = df.dropna(subset=['Faculty'])
+    code = 'course_code' if 'course_code' in df.columns else 'Code'
+    groups = []
+
+    if 'practical' in kinds and 'practical_hours' in df.columns:
+        practical_hours = pd.to_numeric(df['practical_hours'], errors='coerce').fillna(0)
+        for _, faculty in df[practical_hours > 0].groupby(code)['Faculty']:
+            groups.append(('practical', faculty.unique().tolist()))
+
+    if 'open_elective' in kinds:
+        open_electives = df[df[code].astype(str).str.contains('OpenElective', regex=False)]
+        for _, faculty in open_electives.groupby(code)['Faculty']:
+            groups.append(('open_elective', faculty.unique().tolist()))
+
+    if 'section' in kinds and 'Section' in df.columns:
+        for _, faculty in df.dropna(subset=['Section']).groupby([code, 'Section'])['Faculty']:
+            groups.append(('section', faculty.unique().tolist()))
+
+    return groups
+
+def build_coupling_graph(teachers, groups):
+    """
+    Build an undirected graph of teachers linked by shared constraints.
+
+    Args:
+        teachers: All teachers in the instance (isolated teachers become single nodes)
+        groups: Iterable of (kind, teachers) tuples, e.g. from shared_teacher_groups
+
+    Returns:
+        Dict mapping each teacher to {neighbour: set of link kinds}
+    """
+    graph = {teacher: {} for teacher in teachers}
+    for kind, members in groups:
+        members = [teacher for teacher in members if teacher in graph]
+        for i, teacher in enumerate(members):
+            for other in members[i + 1:]:
+                if other == teacher:
+                    continue
+                graph[teacher].setdefault(other, set()).add(kind)
+                graph[other].setdefault(teacher, set()).add(kind)
+    return graph
+
+def find_components(graph):
+    """
+    Split the coupling graph into connected components.
+
+    Returns:
+        List of dicts with 'teachers', 'size', 'edges' and 'edge_kinds', largest first
+    """
+    components = []
+    seen = set()
+    for start in graph:
+        if start in seen:
+            continue
+        seen.add(start)
+        stack = [start]
+        members = []
+        while stack:
+            teacher = stack.pop()
+            members.append(teacher)
+            for neighbour in graph[teacher]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+
+        # Each edge is seen from both ends
+        edges = 0
+        edge_kinds = {}
+        for teacher in members:
+            for kinds in graph[teacher].values():
+                edges += 1
+                for kind in kinds:
+                    edge_kinds[kind] = edge_kinds.get(kind, 0) + 1
+        components.append({
+            'teachers': sorted(members),
+            'size': len(members),
+            'edges': edges // 2,
+            'edge_kinds': {kind: count // 2 for kind, count in edge_kinds.items()}
+        })
+
+    # Largest components first so the slowest models can be started as early as possible
+    return sorted(components, key=lambda component: component['size'], reverse=True)
+
+def choose_strategy(components):
+    """Return 'decomposed' unless one component holds nearly the whole instance"""
+    total = sum(component['size'] for component in components)
+    if len(components) <= 1 or components[0]['size'] >= MONOLITHIC_COMPONENT_SHARE * total:
+        return 'single'
+    return 'decomposed'
+
+def format_components_report(components, limit=10):
+    """Summarize the component structure as text"""
+    total = sum(component['size'] for component in components)
+    singletons = sum(1 for component in components if component['size'] == 1)
+    lines = [
+        f"{total} teachers in {len(components)} components "
+        f"({singletons} independent teachers), suggested strategy: {choose_strategy(components)}",
+        f"{'Size':>6} {'Edges':>7}  Edge kinds"
+    ]
+    for component in components[:limit]:
+        kinds = ', '.join(f"{kind}={count}" for kind, count in sorted(component['edge_kinds'].items()))
+        lines.append(f"{component['size']:>6} {component['edges']:>7}  {kinds}")
+    if len(components) > limit:
+        lines.append(f"... {len(components) - limit} more components")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the teacher coupling components of a course CSV')
+    parser.add_argument('csv_file', help='Path to the CSV file containing course data')
+    parser.add_argument('--kinds', nargs='+', default=['practical', 'open_elective', 'section'],
+                        choices=['practical', 'open_elective', 'section'],
+                        help='Which shared constraints link teachers (default: all)')
+    parser.add_argument('--limit', type=int, default=10, help='Number of components to list (default: 10)')
+
+    args = parser.parse_args()
+
+    try:
+        df = pd.read_csv(args.csv_file)
+    except FileNotFoundError:
+        logging.error(f"File not found: {args.csv_file}")
+        return 1
+
+    teachers = sorted(df['Faculty'].dropna().unique().tolist())
+    graph = build_coupling_graph(teachers, shared_teacher_groups(df, args.kinds))
+    print(format_components_report(find_components(graph), args.limit))
+    return 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import itertools
+from functools import lru_cache
+
+# Day categories of timetable_core and timetable_manager: 0 = A (8-3), 1 = C (12-7), 2 = B
+NUM_CATEGORIES = 3
+MIN_DAYS_PER_CATEGORY = 1
+MAX_DAYS_PER_CATEGORY = 2
+
+@lru_cache(maxsize=None)
+def valid_day_patterns(num_days, min_days=MIN_DAYS_PER_CATEGORY, max_days=MAX_DAYS_PER_CATEGORY,
+                       forbidden_transitions=()):
+    """
+    Enumerate every weekly sequence of day categories that satisfies the category rules.
+
+    There are only NUM_CATEGORIES ** num_days sequences (729 for a six-day week), so the
+    table is built once per set of rules and cached.
+
+    Args:
+        num_days: Days in the week
+        min_days: Fewest days each category must be used
+        max_days: Most days each category may be used
+        forbidden_transitions: (category, next day's category) pairs that may not follow each other
+
+    Returns:
+        Tuple of category tuples, one entry per day
+    """
+    patterns = []
+    for pattern in itertools.product(range(NUM_CATEGORIES), repeat=num_days):
+        if not all(min_days <= pattern.count(cat) <= max_days for cat in range(NUM_CATEGORIES)):
+            continue
+        if any(pair in forbidden_transitions for pair in zip(pattern, pattern[1:])):
+            continue
+        patterns.append(pattern)
+    return tuple(patterns)
+
+@lru_cache(maxsize=None)
+def one_hot_day_patterns(num_days, **rules):
+    """valid_day_patterns with each day's category spread over NUM_CATEGORIES 0/1 values"""
+    return tuple(tuple(int(day == cat) for day in pattern for cat in range(NUM_CATEGORIES))
+                 for pattern in valid_day_patterns(num_days, **rules))
+
+def add_day_pattern_constraint(model, teacher_day_category, teacher, num_days, **rules):
+    """
+    Restrict a teacher's one-hot day categories to the valid weekly patterns with a single
+    table constraint.
+
+    Args:
+        model: The CpModel
+        teacher_day_category: {(teacher, day, category): BoolVar}
+        teacher: Teacher whose week to constrain
+        num_days: Days in the week
+        **rules: Passed on to valid_day_patterns
+
+    Returns:
+        The constraint, so callers can add enforcement literals
+    """
+    variables = [teacher_day_category[(teacher, d, cat)] for d in range(num_days) for cat in range(NUM_CATEGORIES)]
+    return model.AddAllowedAssignments(variables, one_hot_day_patterns(num_days, **rules))
@@ -1,7 +1,11 @@
 import os
 import logging
 import argparse
-from timetable_manager import create_timetable, export_timetable_to_csv, export_timetable_to_excel
+from timetable_manager import (create_timetable, create_timetable_incremental, export_timetable_to_csv,
+                               export_timetable_to_excel, violation_report)
+from solver_config import add_solver_arguments, solver_config_from_args
+from solution_stream import solution_writer
+from prescreen import apply_prescreen
 
 def main():
     parser = argparse.ArgumentParser(description='University Timetable Generator')
@@ -12,29 +16,74 @@ def main():
     parser.add_argument('--format', '-f', choices=['excel', 'csv'], default='excel',
                         help='Output format (excel or csv)')
     parser.add_argument('--relaxed', '-r', action='store_true',
-                        help='Relax constraints if no feasible solution is found')
+                        help='If no feasible solution is found, relax only the constraints of the teachers '
+                             'in conflict and solve again')
+    parser.add_argument('--soft', action='store_true',
+                        help='Treat free slots, slot type variety, C-then-A days and the Mon-Fri/Tue-Sat split as '
+                             'penalties and return the least-violating timetable with a per-teacher report')
+    parser.add_argument('--previous-input', default=None,
+                        help='Course mapping CSV the previous timetable was generated from')
+    parser.add_argument('--previous-timetable', default=None,
+                        help='Previous timetable CSV; with --previous-input only changed teachers are re-solved')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write every improving solution to the output file as soon as it is found; '
+                             'Ctrl+C or SIGTERM then stops the search and keeps the best timetable so far')
+    parser.add_argument('--prescreen', action='store_true',
+                        help='Check every teacher against the weekly capacity before building the model '
+                             'and stop if any cannot be scheduled')
+    parser.add_argument('--quarantine', default=None,
+                        help='Pre-screen, move the rows of teachers that cannot be scheduled to this CSV '
+                             'and solve the rest')
+    parser.add_argument('--day-patterns', choices=['counts', 'table'], default='counts',
+                        help='Bound the days of each slot type with linear counts, or allow only the precomputed '
+                             'valid weekly patterns with one table constraint per teacher (default: counts)')
+    add_solver_arguments(parser)
     
     args = parser.parse_args()
+    if bool(args.previous_input) != bool(args.previous_timetable):
+        parser.error("--previous-input and --previous-timetable must be given together")
+    solver_config = solver_config_from_args(args)
+
+    input_file = args.input
+    if args.prescreen or args.quarantine:
+        input_file = apply_prescreen(input_file, 'timetable_manager', args.quarantine)
+        if input_file is None:
+            print("Failed to generate timetable. Please check your input data")
+            return
+
+    if args.format == 'excel':
+        output_file = args.output if args.output.endswith('.xlsx') else args.output + '.xlsx'
+        export = export_timetable_to_excel
+    else:  # csv
+        output_file = args.output if args.output.endswith('.csv') else args.output + '.csv'
+        export = export_timetable_to_csv
+    on_solution = solution_writer(output_file, export) if args.stream else None
     
-    print(f"Generating timetable from {args.input}...")
-    
-    # First try with full constraints
-    timetables = create_timetable(args.input, relaxed_constraints=False)
+    print(f"Generating timetable from {input_file}...")
     
-    # If that fails and relaxed mode is enabled, try with relaxed constraints
-    if timetables is None and args.relaxed:
-        print("No feasible solution with full constraints. Trying with relaxed constraints...")
-        timetables = create_timetable(args.input, relaxed_constraints=True)
+    # With --relaxed, an infeasible model is relaxed and solved again in the same run
+    if args.previous_input and args.previous_timetable:
+        timetables = create_timetable_incremental(args.previous_input, input_file, args.previous_timetable,
+                                                  solver_config=solver_config, on_solution=on_solution,
+                                                  relax_on_infeasible=args.relaxed, soft_constraints=args.soft,
+                                                  day_patterns=args.day_patterns)
+    else:
+        timetables = create_timetable(input_file, solver_config=solver_config, on_solution=on_solution,
+                                      relax_on_infeasible=args.relaxed, soft_constraints=args.soft,
+                                      day_patterns=args.day_patterns)
+
+    if timetables is not None and args.soft:
+        report = violation_report(timetables)
+        if report.empty:
+            print("No optional rule is broken")
+        else:
+            print(f"{len(report)} teachers break optional rules:")
+            for row in report.itertuples():
+                print(f"  {row.Teacher}: {row.Violations} ({row.Details})")
     
     if timetables is not None:
-        if args.format == 'excel':
-            output_file = args.output if args.output.endswith('.xlsx') else args.output + '.xlsx'
-            export_timetable_to_excel(timetables, output_file)
-            print(f"Timetable exported to {output_file}")
-        else:  # csv
-            output_file = args.output if args.output.endswith('.csv') else args.output + '.csv'
-            export_timetable_to_csv(timetables, output_file)
-            print(f"Timetable exported to {output_file}")
+        export(timetables, output_file)
+        print(f"Timetable exported to {output_file}")
     else:
         print("Failed to generate timetable. Please check your input data")
 
@@ -0,0 +1,195 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+from difflib import SequenceMatcher
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+DEFAULT_CUTOFF = 0.75
+DEFAULT_TOP_CANDIDATES = 10
+DEFAULT_TEACHER_FILE = 'Teacher-2025-05-06.csv'
+DEFAULT_CACHE_FILE = 'teacher_match_cache.json'
+TITLES = ['mr. ', 'mrs. ', 'dr. ']
+
+def clean_name(first, last):
+    """Lower-cased 'first last' teacher name without titles and repeated spaces"""
+    full = f"{first} {last}".lower().strip()
+    for title in TITLES:
+        full = full.replace(title, "")
+    return ' '.join(full.split())
+
+def clean_faculty_name(name):
+    """Lower-cased Faculty name with normalized spaces"""
+    return ' '.join(name.lower().strip().split())
+
+def trigrams(name):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NameMatcher:
+    """
+    Fuzzy matcher of names against a fixed list of choices, giving the same result as
+    difflib.get_close_matches(name, choices, n=1, cutoff=cutoff).
+
+    Choices are indexed by character trigram and word. The top_candidates choices that
+    share the most trigrams and words with a name are scored first; their best score then
+    rules out, by difflib's cheap upper bounds, almost every other choice before a full
+    SequenceMatcher ratio is computed. Results are kept per distinct name, optionally in
+    a JSON cache file that is only reused for the same choices and cutoff. Manual
+    overrides always win over the fuzzy match.
+
+    Args:
+        choices: Names to match against
+        cutoff: Lowest similarity ratio accepted as a match
+        top_candidates: Number of indexed candidates scored before the bound check
+        cache_file: JSON file of earlier matches to reuse and extend
+        overrides: {name: choice or None} of matches to use as given
+    """
+
+    def __init__(self, choices, cutoff=DEFAULT_CUTOFF, top_candidates=DEFAULT_TOP_CANDIDATES,
+                 cache_file=None, overrides=None):
+        self.choices = list(choices)
+        self.cutoff = cutoff
+        self.top_candidates = top_candidates
+        self.cache_file = cache_file
+        self.overrides = dict(overrides or {})
+        self.index = {}
+        for position, choice in enumerate(self.choices):
+            for key in trigrams(choice) | set(choice.split()):
+                self.index.setdefault(key, set()).add(position)
+
+        self.choices_key = hashlib.sha256(json.dumps([self.choices, cutoff]).encode('utf-8')).hexdigest()
+        self.cache = {}
+        if cache_file:
+            try:
+                with open(cache_file, encoding='utf-8') as f:
+                    stored = json.load(f)
+                if stored.get('choices_key') == self.choices_key:
+                    self.cache = stored['matches']
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+        self.scored = 0
+
+    def candidates(self, name):
+        """Positions of the choices sharing the most trigrams and words with name"""
+        hits = {}
+        for key in trigrams(name) | set(name.split()):
+            for position in self.index.get(key, ()):
+                hits[position] = hits.get(position, 0) + 1
+        return sorted(hits, key=lambda position: (-hits[position], position))[:self.top_candidates]
+
+    def _match(self, name):
+        # Same scoring as get_close_matches: the choice is seq1, the name seq2, and ties go to the larger choice
+        matcher = SequenceMatcher()
+        matcher.set_seq2(name)
+        best = None
+
+        def consider(choice, threshold):
+            nonlocal best
+            matcher.set_seq1(choice)
+            if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold:
+                self.scored += 1
+                score = matcher.ratio()
+                if score >= self.cutoff and (best is None or (score, choice) > best):
+                    best = (score, choice)
+
+        blocked = self.candidates(name)
+        for position in blocked:
+            consider(self.choices[position], self.cutoff)
+        blocked = set(blocked)
+        for position, choice in enumerate(self.choices):
+            if position not in blocked:
+                consider(choice, best[0] if best else self.cutoff)
+        return best[1] if best else None
+
+    def match(self, name):
+        """Best choice for one name, or None"""
+        if name in self.overrides:
+            return self.overrides[name]
+        if name not in self.cache:
+            self.cache[name] = self._match(name)
+        return self.cache[name]
+
+    def match_all(self, names):
+        """Match a sequence of names, scoring each distinct name once; returns a list"""
+        matches = {name: self.match(name) for name in dict.fromkeys(names)}
+        return [matches[name] for name in names]
+
+    def save(self):
+        """Write the match cache, if a cache file was given"""
+        if not self.cache_file:
+            return
+        tmp_path = f'{self.cache_file}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'choices_key': self.choices_key, 'matches': self.cache}, f, indent=1)
+        os.replace(tmp_path, self.cache_file)
+
+def load_overrides(overrides_file):
+    """
+    Read manual matches from a CSV with 'Faculty' and 'teacher_name' columns. Both are
+    cleaned like the names they replace; an empty teacher_name means 'no match'.
+    """
+    if not overrides_file:
+        return {}
+    df = pd.read_csv(overrides_file, dtype=str).fillna('')
+    return {clean_faculty_name(row.Faculty): clean_faculty_name(row.teacher_name) or None
+            for row in df.itertuples()}
+
+def load_teachers(teacher_file=DEFAULT_TEACHER_FILE):
+    """Teacher list with a 'full_name_clean' column to match Faculty names against"""
+    teacher_df = pd.read_csv(teacher_file)
+    teacher_df["full_name_clean"] = [clean_name(first, last) for first, last in
+                                     zip(teacher_df["teacher_id__first_name"], teacher_df["teacher_id__last_name"])]
+    return teacher_df
+
+def attach_teacher_ids(course_df, teacher_df, cache_file=None, overrides_file=None, cutoff=DEFAULT_CUTOFF):
+    """
+    Add the 'id' of the best matching teacher to every row of a course mapping.
+
+    Args:
+        course_df: Course rows with a 'Faculty' column
+        teacher_df: Teachers from load_teachers
+        cache_file: JSON match cache to reuse and update
+        overrides_file: CSV of manual matches, see load_overrides
+        cutoff: Lowest similarity ratio accepted as a match
+
+    Returns:
+        course_df merged with the matched teacher's 'id' (NaN when nothing matched),
+        with helper columns 'Faculty_clean', 'matched_teacher_name' and 'full_name_clean'
+    """
+    matcher = NameMatcher(teacher_df["full_name_clean"].tolist(), cutoff=cutoff, cache_file=cache_file,
+                          overrides=load_overrides(overrides_file))
+    course_df = course_df.copy()
+    course_df["Faculty_clean"] = course_df["Faculty"].apply(clean_faculty_name)
+    course_df["matched_teacher_name"] = matcher.match_all(course_df["Faculty_clean"].tolist())
+    matcher.save()
+    logging.info(f"Matched {course_df['Faculty_clean'].nunique()} distinct Faculty names to "
+                 f"{len(matcher.choices)} teachers with {matcher.scored} full comparisons")
+    return pd.merge(course_df, teacher_df[["id", "full_name_clean"]],
+                    left_on="matched_teacher_name", right_on="full_name_clean", how="left")
+
+def main():
+    parser = argparse.ArgumentParser(description='Match the Faculty names of a course mapping to teacher ids')
+    parser.add_argument('csv_file', help='Course mapping CSV with a Faculty column')
+    parser.add_argument('--teachers', '-t', default=DEFAULT_TEACHER_FILE,
+                        help=f'Teacher CSV with id and first/last name columns (default: {DEFAULT_TEACHER_FILE})')
+    parser.add_argument('--output', '-o', default='matched_course_teacher-1.csv', help='Output CSV')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_FILE,
+                        help=f'JSON match cache, empty to disable (default: {DEFAULT_CACHE_FILE})')
+    parser.add_argument('--overrides', default=None,
+                        help='CSV of manual matches with Faculty and teacher_name columns')
+    parser.add_argument('--cutoff', type=float, default=DEFAULT_CUTOFF,
+                        help=f'Lowest similarity ratio accepted as a match (default: {DEFAULT_CUTOFF})')
+
+    args = parser.parse_args()
+
+    merged_df = attach_teacher_ids(pd.read_csv(args.csv_file), load_teachers(args.teachers),
+                                   cache_file=args.cache or None, overrides_file=args.overrides, cutoff=args.cutoff)
+    merged_df.drop(columns=["Faculty_clean", "matched_teacher_name", "full_name_clean"]).to_csv(args.output, index=False)
+    logging.info(f"✅ Merged data saved to '{args.output}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+DEFAULT_STATE_FILE = '.pipeline_state.json'
+
+# Data preparation scripts, each run as is from the repository directory. A stage depends on
+# the stages that produce its inputs; 'code' lists the modules whose changes make it stale.
+STAGES = {
+    'course_mapping': {
+        'script': 'sample.py',
+        'code': ['preprocessing.py', 'column_cache.py'],
+        'inputs': ['data_teacher.csv', 'courses.csv'],
+        'outputs': ['course_mapping_output.csv']
+    },
+    'teacher_ids': {
+        'script': 'teacher_id.py',
+        'code': ['name_matcher.py'],
+        'inputs': ['course_mapping_output.csv', 'Teacher-2025-05-06.csv'],
+        'outputs': ['matched_course_teacher-1.csv']
+    },
+    'teacher_schedule': {
+        'script': 'slotgen.py',
+        'code': [],
+        'inputs': [],
+        'outputs': ['simulated_teacher_schedule.csv']
+    },
+    'course_teacher_schedule': {
+        'script': 'withslotass.py',
+        'code': [],
+        'inputs': ['matched_course_teacher-1.csv', 'simulated_teacher_schedule.csv'],
+        'outputs': ['final_course_teacher_schedule.csv']
+    },
+    'rooms': {
+        'script': 'datamerge.py',
+        'code': [],
+        'inputs': ['rooms.csv', 'course_mapping_output.csv', 'venues.csv'],
+        'outputs': ['final_output.csv']
+    },
+    'credits': {
+        'script': 'credits.py',
+        'code': [],
+        'inputs': ['file_01.csv'],
+        'outputs': ['filtered_file1.csv']
+    },
+    'aiml_courses': {
+        'script': 'less3.py',
+        'code': [],
+        'inputs': ['aiml_courses.csv', 'course_mapping_output.csv'],
+        'outputs': ['matched_aiml_courses.csv']
+    }
+}
+
+def stage_dependencies(stages=STAGES):
+    """{stage: set of stages producing one of its inputs}"""
+    producers = {output: name for name, stage in stages.items() for output in stage['outputs']}
+    return {name: {producers[path] for path in stage['inputs'] if path in producers}
+            for name, stage in stages.items()}
+
+def upstream_of(targets, stages=STAGES):
+    """The targets and every stage they depend on, directly or not"""
+    dependencies = stage_dependencies(stages)
+    selected = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(dependencies[name])
+    return selected
+
+class FileHasher:
+    """
+    SHA-256 of files, reusing the digest recorded for a file whose size and modification
+    time have not changed, so unchanged inputs are not read again.
+
+    Args:
+        known: {path: {'size', 'mtime_ns', 'sha256'}} from an earlier run
+    """
+
+    def __init__(self, known=None):
+        self.known = dict(known or {})
+
+    def digest(self, path):
+        """Hex digest of a file, or None if it does not exist"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        entry = self.known.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        self.known[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha.hexdigest()}
+        return self.known[path]['sha256']
+
+def stage_fingerprint(stage, hasher):
+    """Combined digest of a stage's script, code modules and input files"""
+    parts = [f"{path}={hasher.digest(path)}" for path in [stage['script'], *stage['code'], *stage['inputs']]]
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+def stale_reason(name, stage, state, hasher):
+    """Why a stage has to run, or None if its recorded outputs are up to date"""
+    recorded = state.get('stages', {}).get(name)
+    if recorded is None:
+        return 'never run'
+    missing = [path for path in stage['outputs'] if not os.path.exists(path)]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    if recorded['fingerprint'] != stage_fingerprint(stage, hasher):
+        return 'inputs or code changed'
+    return None
+
+def load_state(state_file):
+    try:
+        with open(state_file, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_state(state_file, state):
+    tmp_path = f'{state_file}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, state_file)
+
+def run_stage(name, stage):
+    """Run a stage's script in its own interpreter; returns (name, wall time, CompletedProcess)"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, stage['script']], capture_output=True, text=True)
+    return name, time.perf_counter() - start, proc
+
+def run_pipeline(targets=None, force=False, dry_run=False, max_workers=None,
+                 state_file=DEFAULT_STATE_FILE, stages=STAGES):
+    """
+    Bring the outputs of the target stages up to date.
+
+    A stage runs when it has never run, one of its outputs is missing or the fingerprint
+    of its script, code modules and inputs differs from the last successful run. Stages are
+    checked once all the stages they depend on have finished, so a stage whose upstream
+    output came out byte-identical is still skipped. Stages without a path between them
+    run concurrently, each in its own process.
+
+    Args:
+        targets: Stages to bring up to date with their upstream stages (default: all)
+        force: Run every selected stage
+        dry_run: Only report which stages are stale; downstream stages of a stale stage
+            are reported as 'upstream stale'
+        max_workers: Most stages to run at once
+        state_file: JSON file with the fingerprints of the last successful runs
+        stages: Stage declarations, see STAGES
+
+    Returns:
+        {stage: 'ran', 'up to date', 'failed', 'skipped' or the dry-run reason}
+    """
+    selected = upstream_of(targets or stages, stages)
+    dependencies = {name: deps & selected for name, deps in stage_dependencies(stages).items() if name in selected}
+    order = topological_order(dependencies)
+    state = load_state(state_file)
+    state.setdefault('stages', {})
+    hasher = FileHasher(state.get('files'))
+    results = {}
+
+    if dry_run:
+        for name in order:
+            stale = [dep for dep in dependencies[name] if results[dep] != 'up to date']
+            reason = 'forced' if force else stale_reason(name, stages[name], state, hasher)
+            results[name] = reason or ('upstream stale' if stale else 'up to date')
+            logging.info(f"{name:<24} {results[name]}")
+        return results
+
+    remaining = dict(dependencies)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        while remaining or running:
+            for name in [name for name, deps in remaining.items() if all(dep in results for dep in deps)]:
+                del remaining[name]
+                if any(results[dep] in ('failed', 'skipped') for dep in dependencies[name]):
+                    results[name] = 'skipped'
+                    logging.error(f"❌ Skipping {name}: an upstream stage failed")
+                    continue
+                reason = 'forced' if force else stale_reason(name, stages[name], state, hasher)
+                if reason is None:
+                    results[name] = 'up to date'
+                    logging.info(f"{name} is up to date")
+                    continue
+                logging.info(f"Running {name} ({stages[name]['script']}): {reason}")
+                # Fingerprint the inputs the stage is started with, not what they may become
+                fingerprint = stage_fingerprint(stages[name], hasher)
+                running[executor.submit(run_stage, name, stages[name])] = fingerprint
+            if not running:
+                continue
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                fingerprint = running.pop(future)
+                name, wall_time, proc = future.result()
+                if proc.returncode != 0:
+                    results[name] = 'failed'
+                    state['stages'].pop(name, None)
+                    logging.error(f"❌ {name} failed after {wall_time:.2f}s:\n{proc.stderr.strip()}")
+                    continue
+                results[name] = 'ran'
+                state['stages'][name] = {'fingerprint': fingerprint, 'wall_time': wall_time,
+                                         'finished': time.strftime('%Y-%m-%dT%H:%M:%S')}
+                logging.info(f"✅ {name} finished in {wall_time:.2f}s")
+            state['files'] = hasher.known
+            save_state(state_file, state)
+
+    return results
+
+def topological_order(dependencies):
+    """Stage names with every stage after the stages it depends on"""
+    order = []
+    placed = set()
+    while len(order) < len(dependencies):
+        ready = sorted(name for name, deps in dependencies.items() if name not in placed and deps <= placed)
+        if not ready:
+            raise ValueError(f"Stages depend on each other in a cycle: {sorted(set(dependencies) - placed)}")
+        order.extend(ready)
+        placed.update(ready)
+    return order
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the data preparation scripts, re-running only stale stages')
+    parser.add_argument('targets', nargs='*', metavar='stage',
+                        help=f"Stages to bring up to date with their upstream stages (default: all of {', '.join(STAGES)})")
+    parser.add_argument('--force', action='store_true', help='Run the selected stages even if they are up to date')
+    parser.add_argument('--dry-run', '-n', action='store_true', help='Only list which stages are stale')
+    parser.add_argument('--workers', type=int, default=None, help='Most stages to run at once')
+    parser.add_argument('--state-file', default=DEFAULT_STATE_FILE,
+                        help=f'JSON file with the fingerprints of the last runs (default: {DEFAULT_STATE_FILE})')
+
+    args = parser.parse_args()
+    unknown = [target for target in args.targets if target not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    # Scripts read and write their files relative to the repository
+    state_file = os.path.abspath(args.state_file)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    results = run_pipeline(args.targets or None, force=args.force, dry_run=args.dry_run,
+                           max_workers=args.workers, state_file=state_file)
+    if any(result in ('failed', 'skipped') for result in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import logging
+import pandas as pd
+from column_cache import cached_load
+
+REQUIRED_COLUMNS = ['course_code', 'Faculty', 'lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']
+NUMERIC_COLUMNS = ['lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']
+HOUR_COLUMNS = ['lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def load_course_data(csv_file_path):
+    """
+    Read and validate a course CSV the way every create_timetable variant expects it.
+
+    Numeric columns are coerced, rows without valid credits (1-5) are dropped and
+    a 'Subject' column mirroring 'course_code' is added. If the CSV has a column cache
+    (column_cache.py), the validated data is read from there.
+
+    Returns:
+        The filtered DataFrame, or None if the file is missing, empty or invalid
+    """
+    return cached_load(csv_file_path, 'course_data', read_course_data)
+
+def read_course_data(csv_file_path):
+    """load_course_data without the column cache"""
+    try:
+        df = pd.read_csv(csv_file_path)
+
+    except FileNotFoundError:
+        logging.error(f"File not found: {csv_file_path}")
+        return None
+    except pd.errors.EmptyDataError:
+        logging.error(f"File is empty or invalid: {csv_file_path}")
+        return None
+
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        logging.error(f"Missing required columns in the CSV file. Required: {REQUIRED_COLUMNS}")
+        return None
+
+    # Convert numeric columns
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    df = df.dropna(subset=['credits'])
+    df = df[(df['credits'] >= 1) & (df['credits'] <= 5)]
+
+    if df.empty:
+        logging.error("No valid data found after filtering.")
+        return None
+
+    df = df.copy()
+    df['Subject'] = df['course_code']
+    return df
+
+def build_lookup_tables(df):
+    """
+    Build every teacher/subject lookup table used by the solvers in one pass over the data.
+
+    Args:
+        df: Course data as returned by load_course_data
+
+    Returns:
+        Dict with:
+            'teachers' - sorted list of faculty names
+            'teacher_subjects' - {teacher: subjects in order of first appearance}
+            'qualified_teachers' - {subject: teachers in order of first appearance}
+            'subject_rows' - {subject: values of the first row for that subject}
+            'subject_primary_teacher' - {subject: faculty of the first row for that subject}
+            'subject_lecture_hours', 'subject_tutorial_hours', 'subject_practical_hours',
+            'subject_credits' - {subject: value of the last row for that subject}
+            'teacher_subject_hours' - {(teacher, subject): first non-null hours and credits}
+    """
+    staffed = df.dropna(subset=['Faculty'])
+    pairs = staffed.drop_duplicates(subset=['Faculty', 'Subject'])
+
+    teachers = sorted(pairs['Faculty'].unique().tolist())
+    teacher_subjects = pairs.groupby('Faculty', sort=False)['Subject'].agg(list).to_dict()
+    qualified_teachers = pairs.groupby('Subject', sort=False)['Faculty'].agg(list).to_dict()
+
+    first_rows = df.drop_duplicates(subset='Subject', keep='first').set_index('Subject')
+    subject_rows = first_rows.to_dict(orient='index')
+
+    # dict(zip(...)) over all rows keeps the last value seen for each subject
+    last_rows = df.drop_duplicates(subset='Subject', keep='last').set_index('Subject')
+
+    pair_hours = staffed.groupby(['Faculty', 'Subject'])[HOUR_COLUMNS].first()
+
+    return {
+        'teachers': teachers,
+        'teacher_subjects': teacher_subjects,
+        'qualified_teachers': {subj: qualified_teachers.get(subj, []) for subj in subject_rows},
+        'subject_rows': subject_rows,
+        'subject_primary_teacher': first_rows['Faculty'].to_dict(),
+        'subject_lecture_hours': last_rows['lecture_hours'].to_dict(),
+        'subject_tutorial_hours': last_rows['tutorial_hours'].to_dict(),
+        'subject_practical_hours': last_rows['practical_hours'].to_dict(),
+        'subject_credits': last_rows['credits'].to_dict(),
+        'teacher_subject_hours': pair_hours.to_dict(orient='index'),
+    }
+
+EXPORT_KEYS = ['Code', 'Faculty', 'Section']
+EXPORT_CHUNK_ROWS = 100_000
+ASSIGNMENT_COLUMNS = ['course_code', 'Faculty', 'Section', 'lecture_hours', 'tutorial_hours', 'practical_hours', 'credits',
+                      'periods', 'multiplicity']
+
+def course_variants(courses_df):
+    """
+    Distinct hour/credit variants of every course code, with the number of course list rows
+    each stands for, in the order that keeps the first and the last row of the code.
+
+    Variants are listed by first appearance, except that the variant of the code's last
+    row goes last. If that is also the first variant, one of its rows is split off into a
+    closing entry of its own.
+    """
+    columns = HOUR_COLUMNS
+    counts = {}
+    last_variant = {}
+    for code, *variant in courses_df[['course_code'] + columns].itertuples(index=False, name=None):
+        code_counts = counts.setdefault(code, {})
+        code_counts[tuple(variant)] = code_counts.get(tuple(variant), 0) + 1
+        last_variant[code] = tuple(variant)
+
+    rows = []
+    for code, code_counts in counts.items():
+        order = [[variant, count] for variant, count in code_counts.items()]
+        last = last_variant[code]
+        if order[-1][0] != last:
+            if order[0][0] == last:
+                order[0][1] -= 1
+                order.append([last, 1])
+            else:
+                order.append(order.pop(next(i for i, (variant, _) in enumerate(order) if variant == last)))
+        rows += [(code, *variant, count) for variant, count in order]
+    return pd.DataFrame(rows, columns=['course_code'] + columns + ['course_rows'])
+
+def normalize_codes(codes):
+    """Course codes stripped and upper-cased, so export and course list codes compare equal"""
+    return codes.astype(str).str.strip().str.upper()
+
+def period_counts(teachers_df):
+    """
+    Periods per (Code, Faculty, Section) of a timetable export held in memory.
+
+    Returns:
+        DataFrame with EXPORT_KEYS and 'periods', in order of first appearance
+    """
+    teachers_df = teachers_df.assign(Code=normalize_codes(teachers_df['Code']))
+    periods = teachers_df.groupby(EXPORT_KEYS, sort=False, dropna=False).size().rename('periods')
+    return periods.reset_index()
+
+def stream_period_counts(csv_file_path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    period_counts of a timetable export read in chunks.
+
+    Only the key columns are parsed, as strings, and each chunk is folded into the
+    running counts before the next is read, so memory is bounded by the number of
+    (Code, Faculty, Section) groups and one chunk, not by the size of the export. The
+    export's Lecture_date is a weekday, so every row is one period of the week.
+
+    Args:
+        csv_file_path: Export with at least the EXPORT_KEYS columns
+        chunk_rows: Rows parsed at a time
+
+    Returns:
+        The same DataFrame as period_counts on the whole file
+    """
+    counts = {}
+    rows = 0
+    reader = pd.read_csv(csv_file_path, usecols=EXPORT_KEYS, dtype=dict.fromkeys(EXPORT_KEYS, 'str'),
+                         chunksize=chunk_rows)
+    for chunk in reader:
+        rows += len(chunk)
+        chunk = chunk.assign(Code=normalize_codes(chunk['Code']))
+        for key, periods in chunk.groupby(EXPORT_KEYS, sort=False, dropna=False).size().items():
+            # NaN != NaN, so missing values are keyed as None to add up across chunks
+            key = tuple(None if pd.isna(value) else value for value in key)
+            counts[key] = counts.get(key, 0) + periods
+    logging.info(f"Read {rows} periods of {csv_file_path} into {len(counts)} (Code, Faculty, Section) groups")
+    return pd.DataFrame([(*key, periods) for key, periods in counts.items()], columns=EXPORT_KEYS + ['periods'])
+
+def build_assignment_table(teachers_df, courses_df):
+    """
+    Canonical course mapping from a timetable export (one row per period) and the course list.
+
+    Joining the two row by row repeats every period once per course list row of its code
+    (one per department offering it). Both sides are aggregated first instead: periods
+    per (faculty, code, section) and hour/credit variants per code, so the join only
+    touches the reduced tables. Rows keep the order of the row-by-row join, and the
+    first and last row of every subject hold the same values as there, so
+    build_lookup_tables returns the same tables for both.
+
+    Args:
+        teachers_df: Timetable export with 'Code', 'Faculty' and 'Section' columns
+        courses_df: Course list with 'course_code' and the hour and credit columns
+
+    Returns:
+        DataFrame with ASSIGNMENT_COLUMNS; 'periods' counts the export rows of the faculty,
+        course and section and 'multiplicity' the rows of the row-by-row join it replaces
+    """
+    return assignment_table_from_periods(period_counts(teachers_df), courses_df)
+
+def assignment_table_from_periods(periods, courses_df):
+    """build_assignment_table from the period_counts or stream_period_counts of an export"""
+    courses_df = courses_df.assign(course_code=normalize_codes(courses_df['course_code']))
+    table = periods.merge(course_variants(courses_df), left_on='Code', right_on='course_code', how='inner')
+    table['multiplicity'] = table['periods'] * table['course_rows']
+    return table[ASSIGNMENT_COLUMNS].reset_index(drop=True)
+
+def split_practical_courses(subject_rows):
+    """Practical courses whose first row registers 60 students, which are split into two batches"""
+    return [subj for subj, row in subject_rows.items()
+            if row['practical_hours'] > 0 and row.get('registration') == 60]
@@ -0,0 +1,241 @@
+import argparse
+import logging
+import os
+import sys
+import pandas as pd
+from preprocessing import load_course_data
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Week shape and limits of each engine, mirroring the constants and constraints in its module.
+# Every teacher works 5 of the 6 days (Mon-Fri or Tue-Sat) in all of them.
+#   slots_per_day: slots a teacher can be given on one day
+#   lab_slots_per_day: slots lab sessions can use on one day (withslot keeps labs in their own array)
+#   slots_per_lab_hour: slots taken by one practical hour
+#   labs_in_subject_slots: lab sessions use the subject's weekly slots instead of adding to them
+ENGINE_LIMITS = {
+    'timetable_core': {'working_days': 5, 'slots_per_day': 7, 'max_hours_per_day': 5, 'max_consecutive': 2,
+                       'lab_slots_per_day': 7, 'slots_per_lab_hour': 2, 'labs_in_subject_slots': True},
+    'timetable_core_interval': {'working_days': 5, 'slots_per_day': 7, 'max_hours_per_day': 5, 'max_consecutive': 2,
+                                'lab_slots_per_day': 7, 'slots_per_lab_hour': 2, 'labs_in_subject_slots': False},
+    'timetable_manager': {'working_days': 5, 'slots_per_day': 7, 'max_hours_per_day': 7, 'max_consecutive': 4,
+                          'lab_slots_per_day': 7, 'slots_per_lab_hour': 2, 'labs_in_subject_slots': True},
+    # At most 7 of the 11 theory and 4 of the 6 lab slots are open on a day, whatever its slot type
+    'withslot': {'working_days': 5, 'slots_per_day': 7, 'max_hours_per_day': 5, 'max_consecutive': 2,
+                 'lab_slots_per_day': 4, 'slots_per_lab_hour': 1, 'labs_in_subject_slots': False},
+}
+REPORT_COLUMNS = ['engine', 'check', 'teacher', 'subject', 'demand', 'capacity']
+
+def max_busy_slots(num_slots, max_consecutive):
+    """Most slots of a day that can be taught without a run longer than max_consecutive"""
+    return num_slots - num_slots // (max_consecutive + 1)
+
+def max_lab_sessions(num_slots, max_consecutive, length=2):
+    """Most lab sessions of `length` slots that fit in a day without a run longer than max_consecutive"""
+    per_run = max_consecutive // length
+    if per_run == 0:
+        return 0
+    sessions, free = 0, num_slots
+    while free >= length:
+        run = min(per_run, free // length)
+        sessions += run
+        free -= run * length + 1
+    return sessions
+
+def engine_capacity(engine):
+    """Weekly slot and lab session capacity of one teacher under an engine's limits"""
+    limits = ENGINE_LIMITS[engine]
+    day_slots = min(limits['max_hours_per_day'], max_busy_slots(limits['slots_per_day'], limits['max_consecutive']))
+    if limits['slots_per_lab_hour'] == 2:
+        day_labs = max_lab_sessions(limits['slots_per_day'], limits['max_consecutive'])
+    else:
+        day_labs = max_busy_slots(limits['lab_slots_per_day'], limits['max_consecutive'])
+    return {'weekly_slots': limits['working_days'] * day_slots, 'weekly_labs': limits['working_days'] * day_labs}
+
+def teacher_demand(df, engine):
+    """
+    Weekly slots and lab sessions each (teacher, subject) pair needs, read the way the engine reads them.
+
+    timetable_core and timetable_manager take the hours of a subject's first row for every
+    teacher; withslot takes the first row of each teacher-subject pair.
+
+    Returns:
+        DataFrame with 'Faculty', 'Subject', 'lecture_hours', 'tutorial_hours', 'practical_hours',
+        'weekly_slots' and 'lab_sessions' columns, one row per pair
+    """
+    hours = ['lecture_hours', 'tutorial_hours', 'practical_hours']
+    pairs = df.dropna(subset=['Faculty']).drop_duplicates(subset=['Faculty', 'Subject'])[['Faculty', 'Subject']]
+    if engine == 'withslot':
+        pair_hours = df.dropna(subset=['Faculty']).groupby(['Faculty', 'Subject'])[hours].first().fillna(0)
+        pairs = pairs.join(pair_hours, on=['Faculty', 'Subject'])
+    else:
+        subject_hours = df.drop_duplicates(subset='Subject', keep='first').set_index('Subject')[hours].fillna(0)
+        pairs = pairs.join(subject_hours, on='Subject')
+
+    if engine.startswith('timetable_core'):
+        # Lectures and tutorials for every teacher; the 2 x practical_hours lab sessions of
+        # both batches are shared between the qualified teachers and checked per subject
+        pairs['weekly_slots'] = pairs['lecture_hours'] + pairs['tutorial_hours']
+        pairs['lab_sessions'] = 0
+    elif engine == 'timetable_manager':
+        pairs['weekly_slots'] = pairs['lecture_hours'] + pairs['tutorial_hours'] + 2 * pairs['practical_hours']
+        pairs['lab_sessions'] = (pairs['practical_hours'] // 2).where(pairs['practical_hours'] >= 2, 0)
+    else:
+        pairs['weekly_slots'] = pairs['lecture_hours'] + pairs['tutorial_hours'] + pairs['practical_hours']
+        pairs['lab_sessions'] = pairs['practical_hours']
+    return pairs
+
+def prescreen(df, engine='timetable_core'):
+    """
+    Find teachers and subjects that can never be scheduled under an engine's limits.
+
+    Only bounds that hold for every timetable are checked, so a clean report does not
+    guarantee a feasible model, but every reported row does make it infeasible.
+
+    Args:
+        df: Course data as returned by load_course_data
+        engine: One of ENGINE_LIMITS
+
+    Returns:
+        DataFrame with REPORT_COLUMNS; 'check' is one of
+            'weekly_load' - the teacher needs more slots than the working week holds
+            'lab_sessions' - the teacher needs more lab sessions than fit in the week
+            'practical_coverage' - the qualified teachers of a subject cannot host all lab sessions
+            'primary_lab' - the subject's first teacher cannot take the batch 1 lab it must take
+    """
+    limits = ENGINE_LIMITS[engine]
+    capacity = engine_capacity(engine)
+    pairs = teacher_demand(df, engine)
+    load = pairs.groupby('Faculty')[['weekly_slots', 'lab_sessions']].sum()
+
+    reports = []
+    over = load[load['weekly_slots'] > capacity['weekly_slots']]
+    reports.append(pd.DataFrame({'check': 'weekly_load', 'teacher': over.index, 'subject': None,
+                                 'demand': over['weekly_slots'].values, 'capacity': capacity['weekly_slots']}))
+    over = load[load['lab_sessions'] > capacity['weekly_labs']]
+    reports.append(pd.DataFrame({'check': 'lab_sessions', 'teacher': over.index, 'subject': None,
+                                 'demand': over['lab_sessions'].values, 'capacity': capacity['weekly_labs']}))
+
+    if engine.startswith('timetable_core'):
+        practicals = pairs[pairs['practical_hours'] > 0].copy()
+        if limits['labs_in_subject_slots']:
+            # Each session takes two of the teacher's slots of that subject; sessions cannot
+            # share a slot since three taught slots in a row break MAX_CONSECUTIVE_SLOTS
+            hosted = practicals['weekly_slots'] // 2
+        else:
+            spare = (capacity['weekly_slots'] - practicals['Faculty'].map(load['weekly_slots'])).clip(lower=0)
+            hosted = spare // 2
+        practicals['hosted'] = hosted.clip(upper=capacity['weekly_labs'])
+
+        coverage = practicals.groupby('Subject').agg(demand=('practical_hours', 'first'), capacity=('hosted', 'sum'))
+        coverage['demand'] = 2 * coverage['demand']
+        short = coverage[coverage['demand'] > coverage['capacity']]
+        reports.append(pd.DataFrame({'check': 'practical_coverage', 'teacher': None, 'subject': short.index,
+                                     'demand': short['demand'].values, 'capacity': short['capacity'].values}))
+
+        primary = df.dropna(subset=['Faculty']).drop_duplicates(subset='Subject', keep='first')[['Subject', 'Faculty']]
+        primary = practicals.merge(primary, on=['Subject', 'Faculty'])
+        short = primary[primary['hosted'] < 1]
+        reports.append(pd.DataFrame({'check': 'primary_lab', 'teacher': short['Faculty'].values,
+                                     'subject': short['Subject'].values, 'demand': 1, 'capacity': 0}))
+
+    reports = [r for r in reports if not r.empty]
+    report = pd.concat(reports, ignore_index=True) if reports else pd.DataFrame(columns=REPORT_COLUMNS)
+    report['engine'] = engine
+    return report[REPORT_COLUMNS]
+
+def quarantine(df, report):
+    """
+    Split the course data into rows that can still be solved and rows of reported teachers
+    and subjects. A teacher-level problem removes every row of that teacher, a subject-level
+    problem every row of that subject.
+
+    Returns:
+        (kept, quarantined) DataFrames
+    """
+    teachers = set(report.loc[report['teacher'].notna(), 'teacher'])
+    subjects = set(report.loc[report['teacher'].isna(), 'subject'])
+    dropped = df['Faculty'].isin(teachers) | df['Subject'].isin(subjects)
+    return df[~dropped], df[dropped]
+
+def screen_and_quarantine(df, engine='timetable_core'):
+    """
+    Quarantine reported teachers and subjects until the remaining data passes the pre-screen.
+
+    Dropping a teacher can leave a shared practical without enough qualified teachers,
+    so the screen is repeated on what is left.
+
+    Returns:
+        (kept, quarantined, report) with the report rows of every round
+    """
+    reports = [prescreen(df, engine)]
+    quarantined = [df.iloc[0:0]]
+    while not reports[-1].empty:
+        df, dropped = quarantine(df, reports[-1])
+        quarantined.append(dropped)
+        reports.append(prescreen(df, engine))
+    return df, pd.concat(quarantined), pd.concat(reports, ignore_index=True)
+
+def log_report(report):
+    """Log one line per pre-screen finding"""
+    if report.empty:
+        logging.info("✅ Pre-screen found no teacher or subject over capacity")
+        return
+    for row in report.itertuples():
+        who = row.teacher if isinstance(row.teacher, str) else f"subject {row.subject}"
+        what = f" ({row.subject})" if isinstance(row.teacher, str) and isinstance(row.subject, str) else ""
+        logging.error(f"❌ {who}{what}: {row.check} needs {row.demand:g}, at most {row.capacity:g} possible")
+
+def apply_prescreen(csv_file_path, engine, quarantine_file=None):
+    """
+    Pre-screen an input file before building a model for it.
+
+    Args:
+        csv_file_path: Course CSV the engine would read
+        engine: One of ENGINE_LIMITS
+        quarantine_file: If given, write the rows of reported teachers and subjects here and
+            the remaining rows to '<quarantine_file root>.screened.csv'
+
+    Returns:
+        Path of the file to solve (csv_file_path, or the screened file when rows were
+        quarantined), or None if the input has problems and nothing was quarantined
+    """
+    df = load_course_data(csv_file_path)
+    if df is None:
+        return None
+    if quarantine_file is None:
+        report = prescreen(df, engine)
+        log_report(report)
+        return csv_file_path if report.empty else None
+
+    kept, dropped, report = screen_and_quarantine(df, engine)
+    log_report(report)
+    if dropped.empty:
+        return csv_file_path
+    if kept.empty:
+        logging.error("❌ Every teacher was quarantined, nothing left to solve")
+        return None
+
+    columns = [col for col in df.columns if col != 'Subject']
+    dropped[columns].to_csv(quarantine_file, index=False)
+    screened_file = f"{os.path.splitext(quarantine_file)[0]}.screened.csv"
+    kept[columns].to_csv(screened_file, index=False)
+    logging.info(f"Quarantined {len(dropped)} rows of {dropped['Faculty'].nunique()} teachers to "
+                 f"'{quarantine_file}', solving the other {kept['Faculty'].nunique()} from '{screened_file}'")
+    return screened_file
+
+def main():
+    parser = argparse.ArgumentParser(description='Check a course CSV for teachers and subjects that cannot be scheduled')
+    parser.add_argument('csv_file', help='Path to the CSV file containing course data')
+    parser.add_argument('--engine', '-e', choices=sorted(ENGINE_LIMITS), default='timetable_core',
+                        help='Engine whose limits to check against (default: timetable_core)')
+    parser.add_argument('--quarantine', '-q', default=None,
+                        help='Write the rows of reported teachers and subjects to this CSV and the rest '
+                             'to <name>.screened.csv')
+
+    args = parser.parse_args()
+
+    return 0 if apply_prescreen(args.csv_file, args.engine, args.quarantine) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
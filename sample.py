@@ -1,26 +1,16 @@
-import pandas as pd
+from column_cache import read_csv_cached
+from preprocessing import stream_period_counts, assignment_table_from_periods
 
-# Load the CSV files
-teachers_df = pd.read_csv("data_teacher.csv")
-courses_df = pd.read_csv("courses.csv")
+# Count the periods of every faculty, course and section while reading the export in chunks,
+# and load the course list, from its column cache if there is one
+periods = stream_period_counts("data_teacher.csv")
+courses_df = read_csv_cached("courses.csv")
 
-# Normalize course codes for accurate matching
-teachers_df['Code'] = teachers_df['Code'].astype(str).str.strip().str.upper()
-courses_df['course_code'] = courses_df['course_code'].astype(str).str.strip().str.upper()
-
-# Merge on course codes
-merged_df = pd.merge(
-    teachers_df,
-    courses_df,
-    left_on='Code',
-    right_on='course_code',
-    how='inner'
-)
-
-# Select only required columns
-result = merged_df[['course_code', 'Faculty', 'lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']]
+# One row per faculty, course, section and hour variant, with the number of periods
+# and of rows the old row-by-row merge on course code produced for it
+result = assignment_table_from_periods(periods, courses_df)
 
 # Save to a new CSV
 result.to_csv("course_mapping_output.csv", index=False)
 
-print("✅ Output saved as course_mapping_output.csv")
+print(f"✅ Output saved as course_mapping_output.csv ({len(result)} rows for {result['multiplicity'].sum()} merged rows)")
@@ -0,0 +1,87 @@
+import contextlib
+import logging
+import os
+import signal
+import threading
+from ortools.sat.python import cp_model
+
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class TimetableSolutionCallback(cp_model.CpSolverSolutionCallback):
+    """
+    Turn every improving solution found during the search into timetables.
+
+    Args:
+        extract: Function that builds {teacher: DataFrame} from a variable value getter
+        on_solution: Optional function called with the timetables of each new solution
+    """
+
+    def __init__(self, extract, on_solution=None):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.extract = extract
+        self.on_solution = on_solution
+        self.solution_count = 0
+
+    def on_solution_callback(self):
+        self.solution_count += 1
+        logging.info(f"Solution {self.solution_count}: objective {self.ObjectiveValue():g} "
+                     f"after {self.WallTime():.1f}s")
+        if self.on_solution is not None:
+            try:
+                self.on_solution(self.extract(self.Value))
+            except Exception as e:
+                # An exception escaping the callback would abort the whole search
+                logging.error(f"❌ Could not handle intermediate solution: {e}")
+
+def write_atomically(timetables, output_file, export_func):
+    """
+    Export timetables to a temporary file next to output_file and move it into place,
+    so readers never see a partially written timetable.
+    """
+    root, ext = os.path.splitext(output_file)
+    tmp_file = f"{root}.partial{ext}"
+    if export_func(timetables, tmp_file) is None:
+        return None
+    os.replace(tmp_file, output_file)
+    return output_file
+
+def solution_writer(output_file, export_func):
+    """Build an on_solution function that atomically rewrites output_file with each solution"""
+    def on_solution(timetables):
+        write_atomically(timetables, output_file, export_func)
+    return on_solution
+
+@contextlib.contextmanager
+def stop_on_signals(callback, signals=STOP_SIGNALS):
+    """
+    Stop the search of callback's solve on SIGINT/SIGTERM, keeping the best solution so far.
+
+    Python signal handlers only run once Solve returns, so the signals are blocked and
+    waited for on a separate thread instead. Does nothing where signal masks are unsupported.
+    """
+    if not hasattr(signal, 'pthread_sigmask') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    done = threading.Event()
+
+    def watch():
+        signum = signal.sigwait(signals)
+        if not done.is_set():
+            logging.warning(f"Received {signal.Signals(signum).name}, stopping the search "
+                            f"and keeping the best solution found so far")
+            callback.StopSearch()
+
+    previous_mask = signal.pthread_sigmask(signal.SIG_BLOCK, signals)
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        yield
+    finally:
+        done.set()
+        if watcher.is_alive():
+            signal.pthread_kill(watcher.ident, signals[0])
+        watcher.join()
+        signal.pthread_sigmask(signal.SIG_SETMASK, previous_mask)
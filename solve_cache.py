@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+import os
+import pandas as pd
+
+CACHE_VERSION = 1
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def make_key(payload):
+    """Hash a JSON-serializable description of a solve into a stable cache key"""
+    canonical = json.dumps({'version': CACHE_VERSION, 'payload': payload}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class SolveCache:
+    """
+    Content-addressed disk cache of solved timetables.
+
+    Each entry holds the {teacher: DataFrame} result of one independently solved
+    group of teachers, stored under the hash of everything that went into its model.
+    Entries are evicted least recently used first once the cache grows past
+    max_entries or max_bytes. An index of the last key seen for each teacher is kept
+    so that report() can tell changed teachers apart from new ones.
+    """
+
+    def __init__(self, cache_dir, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.index = {}
+        self.hits = []
+        self.changed = []
+        self.new = []
+        self.evicted = 0
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def get(self, key, teachers):
+        """Return the cached {teacher: DataFrame} for key, or None on a miss"""
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            for teacher in teachers:
+                if teacher in self.index and self.index[teacher] != key:
+                    self.changed.append(teacher)
+                else:
+                    self.new.append(teacher)
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        os.utime(path)
+        self.hits.extend(teachers)
+        return {teacher: pd.DataFrame(table['data'], columns=table['columns'])
+                for teacher, table in entry['timetables'].items()}
+
+    def put(self, key, timetables):
+        """Store the {teacher: DataFrame} result solved for key"""
+        entry = {'timetables': {teacher: df.to_dict(orient='split') for teacher, df in timetables.items()}}
+        path = self._entry_path(key)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        for teacher in timetables:
+            self.index[teacher] = key
+
+    def save(self):
+        """Write the teacher index and evict entries beyond the size limits"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json') and name != 'index.json':
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort(reverse=True)
+        total_bytes = 0
+        for count, (_, size, path) in enumerate(entries, start=1):
+            total_bytes += size
+            if count > self.max_entries or total_bytes > self.max_bytes:
+                os.remove(path)
+                self.evicted += 1
+
+        live_keys = {os.path.basename(path)[:-len('.json')] for _, _, path in entries if os.path.exists(path)}
+        self.index = {teacher: key for teacher, key in self.index.items() if key in live_keys}
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, sort_keys=True)
+
+    def report(self):
+        """Summarize which teachers were reused, re-solved because their inputs changed, or new"""
+        return {
+            'hits': sorted(self.hits),
+            'changed': sorted(self.changed),
+            'new': sorted(self.new),
+            'evicted_entries': self.evicted
+        }
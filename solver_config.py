@@ -0,0 +1,270 @@
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from ortools.sat.python import cp_model
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Settings understood by apply_solver_config; anything left unset keeps the engine's own default
+SOLVER_SETTINGS = ['num_workers', 'max_time_in_seconds', 'random_seed', 'relative_gap_limit',
+                   'log_search_progress', 'presolve_level', 'linearization_level']
+
+PRESETS = {
+    'default': {},
+    # Stop at the first timetable that satisfies every constraint
+    'fast-feasible': {
+        'max_time_in_seconds': 60,
+        'relative_gap_limit': 1.0,
+        'presolve_level': 1,
+        'linearization_level': 0
+    },
+    # Spend longer and prove optimality of the batch objective where possible
+    'thorough': {
+        'max_time_in_seconds': 1800,
+        'relative_gap_limit': 0.0,
+        'presolve_level': 2,
+        'linearization_level': 2
+    }
+}
+
+def load_solver_config(preset=None, config_file=None, overrides=None):
+    """
+    Combine a named preset, a JSON config file and explicit overrides, in that order of precedence.
+
+    The config file may name its own 'preset', which is applied before the file's settings.
+
+    Returns:
+        Dict of solver settings
+    """
+    config = dict(PRESETS.get(preset or 'default', {}))
+    if preset and preset not in PRESETS:
+        logging.warning(f"Unknown solver preset '{preset}'. Available: {sorted(PRESETS)}")
+
+    if config_file:
+        try:
+            with open(config_file, encoding='utf-8') as f:
+                file_config = json.load(f)
+        except FileNotFoundError:
+            logging.warning(f"Solver config file not found: {config_file}")
+            file_config = {}
+        except json.JSONDecodeError as e:
+            logging.warning(f"Solver config file is not valid JSON: {config_file} ({e})")
+            file_config = {}
+        if 'preset' in file_config and not preset:
+            config = dict(PRESETS.get(file_config['preset'], {}))
+        config.update({key: value for key, value in file_config.items() if key != 'preset'})
+
+    if overrides:
+        config.update({key: value for key, value in overrides.items() if value is not None})
+
+    unknown = set(config) - set(SOLVER_SETTINGS) - {'run_log'}
+    if unknown:
+        logging.warning(f"Ignoring unknown solver settings: {sorted(unknown)}")
+    return config
+
+def apply_solver_config(solver, config):
+    """Set the CP-SAT parameters described by a solver config on a CpSolver"""
+    if not config:
+        return solver
+    params = solver.parameters
+    if config.get('num_workers') is not None:
+        params.num_workers = int(config['num_workers'])
+    if config.get('max_time_in_seconds') is not None:
+        params.max_time_in_seconds = float(config['max_time_in_seconds'])
+    if config.get('random_seed') is not None:
+        params.random_seed = int(config['random_seed'])
+    if config.get('relative_gap_limit') is not None:
+        params.relative_gap_limit = float(config['relative_gap_limit'])
+    if config.get('log_search_progress') is not None:
+        params.log_search_progress = bool(config['log_search_progress'])
+    if config.get('presolve_level') is not None:
+        # CP-SAT has no single presolve level: 0 disables presolve, 1 keeps it without probing, 2 is the default
+        level = int(config['presolve_level'])
+        params.cp_model_presolve = level > 0
+        params.cp_model_probing_level = 0 if level == 1 else 2
+    if config.get('linearization_level') is not None:
+        params.linearization_level = int(config['linearization_level'])
+    return solver
+
+def add_solver_arguments(parser):
+    """Add the shared solver flags to an argparse parser"""
+    group = parser.add_argument_group('solver')
+    group.add_argument('--preset', choices=sorted(PRESETS), default=None,
+                       help='Named solver settings preset')
+    group.add_argument('--solver-config', default=None,
+                       help='JSON file with solver settings (overridden by the flags below)')
+    group.add_argument('--num-workers', type=int, default=None, help='Number of CP-SAT search workers')
+    group.add_argument('--time-limit', type=float, default=None, help='Time limit per solve in seconds')
+    group.add_argument('--random-seed', type=int, default=None, help='CP-SAT random seed')
+    group.add_argument('--relative-gap', type=float, default=None,
+                       help='Stop when the objective is within this relative gap of the bound')
+    group.add_argument('--log-search-progress', action='store_true', default=None,
+                       help='Print the CP-SAT search log')
+    group.add_argument('--presolve-level', type=int, choices=[0, 1, 2], default=None,
+                       help='0 = no presolve, 1 = presolve without probing, 2 = full presolve')
+    group.add_argument('--linearization-level', type=int, choices=[0, 1, 2], default=None,
+                       help='CP-SAT linearization level')
+    group.add_argument('--run-log', default='solver_runs.jsonl',
+                       help='JSON-lines file recording the settings, timing and search statistics of every solve '
+                            '(default: solver_runs.jsonl, empty to disable)')
+    group.add_argument('--prometheus-file', default=None,
+                       help='Prometheus textfile (node_exporter textfile collector) rewritten with the '
+                            'statistics of the last solve of each engine')
+    return parser
+
+def solver_config_from_args(args):
+    """Build a solver config from the flags added by add_solver_arguments"""
+    config = load_solver_config(args.preset, args.solver_config, {
+        'num_workers': args.num_workers,
+        'max_time_in_seconds': args.time_limit,
+        'random_seed': args.random_seed,
+        'relative_gap_limit': args.relative_gap,
+        'log_search_progress': args.log_search_progress,
+        'presolve_level': args.presolve_level,
+        'linearization_level': args.linearization_level
+    })
+    if args.run_log:
+        config['run_log'] = args.run_log
+    if args.prometheus_file:
+        config['prometheus_file'] = args.prometheus_file
+    return config
+
+def solve_statistics(solver, status):
+    """
+    Search statistics of the last solve from its CpSolverResponse.
+
+    The objective and bound are None when no solution was found. 'presolved_variables' is
+    the size of the model the search ran on (booleans and integers left after presolve) and
+    'worker' the subsolver that found the returned solution.
+    """
+    response = solver.ResponseProto()
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        'status': solver.StatusName(status),
+        'wall_time': solver.WallTime(),
+        'user_time': solver.UserTime(),
+        'deterministic_time': response.deterministic_time,
+        'conflicts': solver.NumConflicts(),
+        'branches': solver.NumBranches(),
+        'objective': solver.ObjectiveValue() if solved else None,
+        'best_bound': solver.BestObjectiveBound() if solved else None,
+        'presolved_variables': response.num_booleans + response.num_integers,
+        'presolved_booleans': response.num_booleans,
+        'worker': response.solution_info or None
+    }
+
+def record_solve(config, solver, status, engine, teachers):
+    """Append the settings and statistics of one solve to the config's run log and Prometheus textfile"""
+    if not config or not (config.get('run_log') or config.get('prometheus_file')):
+        return
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'engine': engine,
+        'teachers': teachers,
+        'settings': {key: config[key] for key in SOLVER_SETTINGS if key in config},
+        **solve_statistics(solver, status)
+    }
+    if config.get('run_log'):
+        try:
+            with open(config['run_log'], 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        except OSError as e:
+            logging.warning(f"Could not write solver run log {config['run_log']}: {e}")
+    if config.get('prometheus_file'):
+        try:
+            write_prometheus_textfile(config['prometheus_file'], record)
+        except OSError as e:
+            logging.warning(f"Could not write Prometheus textfile {config['prometheus_file']}: {e}")
+
+# Gauges written for the last solve of each engine: record field -> (metric name, help text)
+PROMETHEUS_GAUGES = {
+    'teachers': ('timetable_solve_teachers', 'Teachers in the last solved model'),
+    'wall_time': ('timetable_solve_wall_seconds', 'Wall time of the last solve'),
+    'user_time': ('timetable_solve_user_seconds', 'User time of the last solve'),
+    'deterministic_time': ('timetable_solve_deterministic_seconds', 'Deterministic time of the last solve'),
+    'conflicts': ('timetable_solve_conflicts', 'Conflicts in the last solve'),
+    'branches': ('timetable_solve_branches', 'Branches in the last solve'),
+    'objective': ('timetable_solve_objective', 'Objective of the last solution'),
+    'best_bound': ('timetable_solve_best_bound', 'Best objective bound of the last solve'),
+    'presolved_variables': ('timetable_solve_presolved_variables', 'Variables left after presolve in the last solve'),
+    'presolved_booleans': ('timetable_solve_presolved_booleans', 'Booleans left after presolve in the last solve'),
+    'timestamp': ('timetable_solve_timestamp_seconds', 'Unix time the last solve finished')
+}
+PROMETHEUS_INFO = ('timetable_solve_info', 'Status and solution worker of the last solve, always 1')
+PROMETHEUS_COUNTER = ('timetable_solves_total', 'Solves by engine and status')
+SAMPLE_PATTERN = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+def prometheus_labels(labels):
+    """Format a label dict as key="value" pairs of the Prometheus text format"""
+    escaped = {key: str(value).replace('\\', '\\\\').replace('"', '\\"') for key, value in labels.items()}
+    return ','.join(f'{key}="{value}"' for key, value in escaped.items())
+
+def prometheus_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+@contextmanager
+def exclusive_lock(path):
+    """Hold an exclusive lock on the sidecar file path + '.lock' (no-op without fcntl)"""
+    with open(f'{path}.lock', 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+def write_prometheus_textfile(path, record):
+    """
+    Rewrite a Prometheus textfile with the statistics of the last solve of record['engine'].
+
+    Samples of other engines and the solve counters already in the file are kept. The
+    read-modify-write holds a lock, so solves finishing at the same time in worker
+    processes all count, and the file is replaced atomically so the textfile collector
+    never reads a partial file.
+    """
+    with exclusive_lock(path):
+        update_prometheus_textfile(path, record)
+
+def update_prometheus_textfile(path, record):
+    samples = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                match = SAMPLE_PATTERN.match(line.strip())
+                if match:
+                    samples[(match.group(1), match.group(2))] = float(match.group(3))
+
+    engine = prometheus_labels({'engine': record['engine']})
+    samples = {key: value for key, value in samples.items()
+               if key[0] == PROMETHEUS_COUNTER[0] or not key[1].startswith(engine)}
+    values = dict(record, timestamp=time.time())
+    for field, (name, _) in PROMETHEUS_GAUGES.items():
+        if values.get(field) is not None:
+            samples[(name, engine)] = values[field]
+    info = prometheus_labels({'engine': record['engine'], 'status': record['status'], 'worker': record['worker'] or ''})
+    samples[(PROMETHEUS_INFO[0], info)] = 1
+    counter = prometheus_labels({'engine': record['engine'], 'status': record['status']})
+    samples[(PROMETHEUS_COUNTER[0], counter)] = samples.get((PROMETHEUS_COUNTER[0], counter), 0) + 1
+
+    lines = []
+    metrics = list(PROMETHEUS_GAUGES.values()) + [PROMETHEUS_INFO]
+    for (name, help_text), kind in [(metric, 'gauge') for metric in metrics] + [(PROMETHEUS_COUNTER, 'counter')]:
+        rows = sorted((labels, value) for (metric, labels), value in samples.items() if metric == name)
+        if rows:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            lines += [f'{name}{{{labels}}} {prometheus_value(value)}' for labels, value in rows]
+
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(temp_path, path)
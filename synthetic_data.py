@@ -0,0 +1,94 @@
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+# (lecture, tutorial, practical) hour patterns and their share of subjects in course_mapping_output.csv
+THEORY_PATTERNS = {(3, 0, 0): 0.37, (3, 1, 0): 0.29, (2, 2, 0): 0.14, (1, 0, 0): 0.16, (4, 2, 0): 0.04}
+PRACTICAL_PATTERNS = {(3, 0, 2): 0.24, (0, 0, 2): 0.23, (3, 0, 4): 0.23, (2, 0, 4): 0.12,
+                      (0, 0, 4): 0.12, (1, 0, 4): 0.03, (1, 0, 6): 0.03}
+COLUMNS = ['course_code', 'Faculty', 'lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def subject_credits(lecture, tutorial, practical):
+    """Credits for an L-T-P pattern, clipped to the 1-5 range the solvers accept"""
+    return int(min(5, max(1, lecture + tutorial + practical // 2)))
+
+def generate_course_mapping(num_teachers, practical_share=0.3, open_elective_share=0.05,
+                            subjects_per_teacher=(1, 3), sections=(1, 3), teachers_per_subject=3,
+                            theory_patterns=None, practical_patterns=None, seed=0):
+    """
+    Generate a course mapping shaped like course_mapping_output.csv.
+
+    Args:
+        num_teachers: Number of faculty
+        practical_share: Share of subjects with practical hours
+        open_elective_share: Share of subjects that are open electives ('OpenElective' in the code)
+        subjects_per_teacher: (min, max) distinct subjects taught by each teacher
+        sections: (min, max) duplicate rows per teacher-subject pair, one per section taught
+        teachers_per_subject: Average number of teachers sharing a subject
+        theory_patterns, practical_patterns: {(lecture, tutorial, practical): weight} subject mixes
+        seed: Random seed, the same arguments always give the same data
+
+    Returns:
+        DataFrame with the course_mapping_output.csv columns
+    """
+    rng = np.random.default_rng(seed)
+    theory_patterns = theory_patterns or THEORY_PATTERNS
+    practical_patterns = practical_patterns or PRACTICAL_PATTERNS
+
+    mean_subjects = (subjects_per_teacher[0] + subjects_per_teacher[1]) / 2
+    num_subjects = max(1, int(round(num_teachers * mean_subjects / teachers_per_subject)))
+
+    def pick_patterns(patterns, count):
+        keys = list(patterns)
+        weights = np.array([patterns[key] for key in keys], dtype=float)
+        return [keys[i] for i in rng.choice(len(keys), size=count, p=weights / weights.sum())]
+
+    is_practical = rng.random(num_subjects) < practical_share
+    is_open_elective = rng.random(num_subjects) < open_elective_share
+    practical_hours = iter(pick_patterns(practical_patterns, int(is_practical.sum())))
+    theory_hours = iter(pick_patterns(theory_patterns, int((~is_practical).sum())))
+
+    subjects = []
+    for i in range(num_subjects):
+        lecture, tutorial, practical = next(practical_hours) if is_practical[i] else next(theory_hours)
+        code = f'OpenElective{i:04d}' if is_open_elective[i] else f'SY{23000 + i}'
+        subjects.append((code, lecture, tutorial, practical, subject_credits(lecture, tutorial, practical)))
+
+    rows = []
+    for t in range(num_teachers):
+        teacher = f'Teacher {t:05d}'
+        count = min(num_subjects, int(rng.integers(subjects_per_teacher[0], subjects_per_teacher[1] + 1)))
+        for i in rng.choice(num_subjects, size=count, replace=False):
+            code, lecture, tutorial, practical, credits = subjects[i]
+            for _ in range(int(rng.integers(sections[0], sections[1] + 1))):
+                rows.append((code, teacher, lecture, tutorial, practical, credits))
+
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic course mapping CSV')
+    parser.add_argument('--teachers', '-t', type=int, default=100, help='Number of faculty (default: 100)')
+    parser.add_argument('--practical-share', type=float, default=0.3,
+                        help='Share of subjects with practical hours (default: 0.3)')
+    parser.add_argument('--open-elective-share', type=float, default=0.05,
+                        help='Share of subjects that are open electives (default: 0.05)')
+    parser.add_argument('--subjects-per-teacher', type=int, nargs=2, default=[1, 3], metavar=('MIN', 'MAX'),
+                        help='Distinct subjects per teacher (default: 1 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--output', '-o', default='synthetic_course_mapping.csv',
+                        help='Output CSV file (default: synthetic_course_mapping.csv)')
+
+    args = parser.parse_args()
+
+    df = generate_course_mapping(args.teachers, practical_share=args.practical_share,
+                                 open_elective_share=args.open_elective_share,
+                                 subjects_per_teacher=tuple(args.subjects_per_teacher), seed=args.seed)
+    df.to_csv(args.output, index=False)
+    logging.info(f"✅ Wrote {len(df)} rows for {df['Faculty'].nunique()} teachers and "
+                 f"{df['course_code'].nunique()} subjects to '{args.output}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import re
+
+# Times before this hour are in the afternoon ('1.00' is 13:00); the teaching day runs 8.00-7.00
+FIRST_MORNING_HOUR = 8
+
+TIME_PATTERN = re.compile(r'(\d{1,2})\.(\d{2})')
+
+def to_minutes(clock):
+    """Convert a 'h.mm' clock time from the slot tables to minutes after midnight"""
+    match = TIME_PATTERN.fullmatch(clock.strip())
+    if not match:
+        raise ValueError(f"Invalid slot time: {clock!r}")
+    hour, minute = int(match.group(1)), int(match.group(2))
+    if hour < FIRST_MORNING_HOUR:
+        hour += 12
+    return hour * 60 + minute
+
+def slot_minutes(timing):
+    """
+    Convert a slot timing such as '10.00-10.50' or a lab pair such as
+    '8.00-8.50/8.50-9.40' to a (start, end) interval in minutes.
+    """
+    parts = [part.split('-') for part in timing.split('/')]
+    return to_minutes(parts[0][0]), to_minutes(parts[-1][1])
+
+def build_time_grid(slot_tables):
+    """
+    Build the list of (kind, index, name, start, end) slots for every slot table.
+
+    Args:
+        slot_tables: {kind: {slot name: timing}}, e.g. {'theory': THEORY_SLOTS, 'lab': LAB_SLOTS}
+    """
+    grid = []
+    for kind, slots in slot_tables.items():
+        for index, (name, timing) in enumerate(slots.items()):
+            start, end = slot_minutes(timing)
+            grid.append((kind, index, name, start, end))
+    return grid
+
+def overlap_matrix(grid):
+    """Matrix whose [i][j] entry says whether slots i and j of the grid overlap in time"""
+    return [[a[3] < b[4] and b[3] < a[4] for b in grid] for a in grid]
+
+def overlap_cliques(grid):
+    """
+    Maximal groups of slots that all overlap one another.
+
+    Slots are intervals, so every maximal group is the set of slots running at the
+    start time of one of them. Each slot is in at least one group, and two slots
+    overlap exactly when they share a group.
+
+    Returns:
+        List of [(kind, index), ...] groups
+    """
+    groups = []
+    for point in sorted({slot[3] for slot in grid}):
+        group = frozenset((kind, index) for kind, index, _, start, end in grid if start <= point < end)
+        if group and group not in groups:
+            groups.append(group)
+    maximal = [group for group in groups if not any(group < other for other in groups)]
+    return [sorted(group, key=lambda slot: (slot[0], slot[1])) for group in maximal]
@@ -1,6 +1,8 @@
 import pandas as pd
 from ortools.sat.python import cp_model
 import logging
+from preprocessing import load_course_data, build_lookup_tables
+from solver_config import apply_solver_config, record_solve
 import time
 import concurrent.futures
 import os
@@ -16,7 +18,8 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 
 def process_teacher_batch(teacher_batch, df, subject_lecture_hours, subject_tutorial_hours, 
                    subject_practical_hours, subject_weekly_slots, subject_consecutive_slots,
-                   teacher_subjects, days, num_slots, slot_categories, teacher_day_preferences=None):
+                   teacher_subjects, days, num_slots, slot_categories, teacher_day_preferences=None,
+                   solver_config=None):
     """Process a batch of teachers to create timetables"""
     logging.info(f"Processing batch of {len(teacher_batch)} teachers")
     
@@ -226,9 +229,11 @@ def process_teacher_batch(teacher_batch, df, subject_lecture_hours, subject_tuto
     # Set a time limit for the solver
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = 120  # 2 minutes per batch
+    apply_solver_config(solver, solver_config)
     
     # Solve the model
     status = solver.Solve(model)
+    record_solve(solver_config, solver, status, 'timetable_3', len(teacher_batch))
     
     # Process results
     timetables = {}
@@ -300,18 +305,12 @@ def add_open_elective_constraints(model, subject_assignments, teachers, days, nu
     # Ensure all open electives are scheduled at same time slots if needed
     # Note: This would require additional logic if there are multiple open elective groups
 
-def create_timetable(csv_file_path, teacher_preferences_file=None):
+def create_timetable(csv_file_path, teacher_preferences_file=None, solver_config=None):
     start_time = time.time()
     logging.info(f"Starting timetable creation process")
     
-    try:
-        df = pd.read_csv(csv_file_path)
-        
-    except FileNotFoundError:
-        logging.error(f"File not found: {csv_file_path}")
-        return None
-    except pd.errors.EmptyDataError:
-        logging.error(f"File is empty or invalid: {csv_file_path}")
+    df = load_course_data(csv_file_path)
+    if df is None:
         return None
     
     # Load teacher preferences if provided
@@ -349,35 +348,17 @@ def create_timetable(csv_file_path, teacher_preferences_file=None):
         except Exception as e:
             logging.warning(f"Error loading teacher preferences: {str(e)}")
 
-    required_columns = ['course_code', 'Faculty', 'lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']
-    if not all(col in df.columns for col in required_columns):
-        logging.error(f"Missing required columns in the CSV file. Required: {required_columns}")
-        return None
-
-    # Convert numeric columns
-    for col in ['lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    df = df.dropna(subset=['credits'])
-    df = df[(df['credits'] >= 1) & (df['credits'] <= 5)]
-
-    if df.empty:
-        logging.error("No valid data found after filtering.")
-        return None
-
-    df['Subject'] = df['course_code']
-
-    teachers = sorted(df['Faculty'].dropna().unique().tolist())
+    tables = build_lookup_tables(df)
+    teachers = tables['teachers']
     logging.info(f"Processing {len(teachers)} teachers")
     
     # Create dictionaries for hours
-    subject_lecture_hours = dict(zip(df['Subject'], df['lecture_hours']))
-    subject_tutorial_hours = dict(zip(df['Subject'], df['tutorial_hours']))
-    subject_practical_hours = dict(zip(df['Subject'], df['practical_hours']))
-    subject_credits = dict(zip(df['Subject'], df['credits']))
+    subject_lecture_hours = tables['subject_lecture_hours']
+    subject_tutorial_hours = tables['subject_tutorial_hours']
+    subject_practical_hours = tables['subject_practical_hours']
+    subject_credits = tables['subject_credits']
     
-    teacher_subjects = {teacher: df[df['Faculty'] == teacher]['Subject'].unique().tolist()
-                        for teacher in teachers}
+    teacher_subjects = tables['teacher_subjects']
 
     days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'] 
     num_slots = 7
@@ -386,9 +367,7 @@ def create_timetable(csv_file_path, teacher_preferences_file=None):
     subject_weekly_slots = {}
     subject_consecutive_slots = {}  # To track which subjects need consecutive slots
     
-    for subj in df['Subject'].unique():
-        # Get the subject data
-        subj_data = df[df['Subject'] == subj].iloc[0]
+    for subj, subj_data in tables['subject_rows'].items():
         
         # Weekly slots for lectures
         lecture_slots = subj_data['lecture_hours']
@@ -429,7 +408,8 @@ def create_timetable(csv_file_path, teacher_preferences_file=None):
         batch_timetables = process_teacher_batch(
             teacher_batch, df, subject_lecture_hours, subject_tutorial_hours, 
             subject_practical_hours, subject_weekly_slots, subject_consecutive_slots,
-            teacher_subjects, days, num_slots, slot_categories, teacher_day_preferences
+            teacher_subjects, days, num_slots, slot_categories, teacher_day_preferences,
+            solver_config
         )
         
         # Add results to overall timetables
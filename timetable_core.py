@@ -1,62 +1,72 @@
 import pandas as pd
 from ortools.sat.python import cp_model
 import logging
+import os
+import concurrent.futures
+from preprocessing import load_course_data, build_lookup_tables
+from coupling_graph import build_coupling_graph, find_components, choose_strategy
+from solve_cache import SolveCache, make_key
+from timetable_hints import load_timetable_hints, add_core_hints
+from solver_config import apply_solver_config, record_solve
+from day_patterns import add_day_pattern_constraint
+from solution_stream import TimetableSolutionCallback, stop_on_signals
+from build_profiler import BuildProfiler
 
 MAX_HOURS_PER_DAY = 5
 MAX_CONSECUTIVE_SLOTS = 2  # Maximum consecutive teaching slots
 MORNING_SLOTS = [0, 1, 2]    
 SURVEY_LAB_CODE = 'CE23331'  
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
+NUM_SLOTS = 7
+SLOT_CATEGORIES = {
+    0: 0, 1: 0, 2: 0,  # Morning
+    3: 1, 4: 1,        # Afternoon
+    5: 2, 6: 2         # Evening
+}
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def create_timetable(csv_file_path):
-    try:
-        df = pd.read_csv(csv_file_path)
-        
-    except FileNotFoundError:
-        logging.error(f"File not found: {csv_file_path}")
-        return None
-    except pd.errors.EmptyDataError:
-        logging.error(f"File is empty or invalid: {csv_file_path}")
-        return None
-
-    required_columns = ['course_code', 'Faculty', 'lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']
-    if not all(col in df.columns for col in required_columns):
-        logging.error(f"Missing required columns in the CSV file. Required: {required_columns}")
-        return None
-
-    # Convert numeric columns
-    for col in ['lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    df = df.dropna(subset=['credits'])
-    df = df[(df['credits'] >= 1) & (df['credits'] <= 5)]
-
-    if df.empty:
-        logging.error("No valid data found after filtering.")
+def create_timetable(csv_file_path, strategy='single', max_workers=None, cache_dir=None,
+                     hint_file=None, partial_hints=False, repair_hint=False, solver_config=None,
+                     on_solution=None, encoding='boolean', profile_build=None, day_patterns='counts'):
+    """
+    Create a timetable based on input CSV data.
+
+    Args:
+        csv_file_path: Path to the CSV file with course data
+        strategy: 'single' solves one model for all teachers, 'decomposed' solves each
+            independent group of teachers as its own model on a process pool, 'auto'
+            picks one of the two from the coupling components of the input, and
+            'hierarchical' plans the week of all teachers without slot positions and then
+            packs every teacher-day on its own, see timetable_hierarchical.solve_hierarchical
+        max_workers: Number of worker processes for decomposed mode (default: all cores)
+        cache_dir: Directory of a solve cache; groups of teachers whose inputs are unchanged
+            since an earlier run reuse their stored timetable instead of being solved again
+        hint_file: Timetable CSV from an earlier export_timetable_to_csv run used to warm-start the solver
+        partial_hints: Only hint the assignments present in hint_file instead of every variable
+        repair_hint: Let the solver repair hints that no longer satisfy the constraints
+        solver_config: CP-SAT settings from solver_config.load_solver_config
+        on_solution: If given, called with the timetables of every improving solution as the
+            search finds it ('single' strategy only); SIGINT/SIGTERM then stop the search
+            and keep the best solution
+        encoding: 'boolean' models every session with per-slot booleans, 'interval' models
+            lectures, tutorials and lab sessions as optional intervals with one NoOverlap
+            per teacher, see solve_teacher_group
+        profile_build: JSON-lines file to append a per-constraint-family build profile of
+            every model to, see build_profiler.BuildProfiler
+        day_patterns: 'counts' bounds the days of each category with linear constraints,
+            'table' allows only the precomputed valid weekly patterns, see day_patterns.py
+    """
+    df = load_course_data(csv_file_path)
+    if df is None:
         return None
 
-    df['Subject'] = df['course_code']
-
-    teachers = sorted(df['Faculty'].dropna().unique().tolist())
-    
-    # Create dictionaries for hours
-    subject_lecture_hours = dict(zip(df['Subject'], df['lecture_hours']))
-    subject_tutorial_hours = dict(zip(df['Subject'], df['tutorial_hours']))
-    subject_practical_hours = dict(zip(df['Subject'], df['practical_hours']))
-    subject_credits = dict(zip(df['Subject'], df['credits']))
-    
-    teacher_subjects = {teacher: df[df['Faculty'] == teacher]['Subject'].unique().tolist()
-                        for teacher in teachers}
-
-    # Creating a dictionary to track which teachers can teach which subjects
-    qualified_teachers = {}
-    for subj in df['Subject'].unique():
-        qualified_teachers[subj] = df[df['Subject'] == subj]['Faculty'].unique().tolist()
-
-    days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'] 
-    num_slots = 7
-    all_slots = [(d, s) for d in range(len(days)) for s in range(num_slots)]
+    tables = build_lookup_tables(df)
+    teachers = tables['teachers']
+    subject_practical_hours = tables['subject_practical_hours']
+    teacher_subjects = tables['teacher_subjects']
+    qualified_teachers = tables['qualified_teachers']
+    subject_primary_teacher = tables['subject_primary_teacher']
 
     # Calculate weekly slots needed for each subject based on lecture, tutorial, and practical hours
     subject_weekly_slots = {}
@@ -65,9 +75,7 @@ def create_timetable(csv_file_path):
     # Track which subjects have practical hours (for batch splitting)
     subjects_with_practicals = []
     
-    for subj in df['Subject'].unique():
-        # Get the subject data
-        subj_data = df[df['Subject'] == subj].iloc[0]
+    for subj, subj_data in tables['subject_rows'].items():
         
         # Weekly slots for lectures
         lecture_slots = subj_data['lecture_hours']
@@ -93,15 +101,178 @@ def create_timetable(csv_file_path):
         # Mark if this subject has practicals (needs consecutive slots)
         subject_consecutive_slots[subj] = practical_hours > 0
 
-    slot_categories = {
-        0: 0, 1: 0, 2: 0,  # Morning
-        3: 1, 4: 1,        # Afternoon
-        5: 2, 6: 2         # Evening
+    inputs = {
+        'teacher_subjects': teacher_subjects,
+        'qualified_teachers': qualified_teachers,
+        'subjects_with_practicals': subjects_with_practicals,
+        'subject_practical_hours': subject_practical_hours,
+        'subject_weekly_slots': subject_weekly_slots,
+        'subject_consecutive_slots': subject_consecutive_slots,
+        'subject_primary_teacher': subject_primary_teacher
     }
 
+    options = {'partial_hints': partial_hints, 'repair_hint': repair_hint, 'solver_config': solver_config,
+               'encoding': encoding, 'profile_build': profile_build, 'day_patterns': day_patterns}
+    if hint_file:
+        options['hints'] = load_timetable_hints(hint_file, DAYS)
+
+    if strategy not in ('single', 'hierarchical') or cache_dir:
+        components = find_components(build_coupling_graph(teachers, teacher_coupling_groups(
+            qualified_teachers, subjects_with_practicals)))
+        if strategy == 'auto':
+            strategy = choose_strategy(components)
+            logging.info(f"Largest of {len(components)} teacher components has {components[0]['size']} "
+                         f"teachers, using '{strategy}' strategy")
+        groups = [component['teachers'] for component in components]
+    else:
+        groups = [teachers]
+
+    # Reuse the stored result of every group whose inputs have not changed since it was solved
+    cached_timetables = {}
+    group_keys = {}
+    if cache_dir:
+        cache = SolveCache(cache_dir)
+        pending_groups = []
+        for group in groups:
+            key = group_cache_key(group, inputs, encoding, strategy, day_patterns)
+            hit = cache.get(key, group)
+            if hit is None:
+                group_keys[tuple(group)] = key
+                pending_groups.append(group)
+            else:
+                cached_timetables.update(hit)
+        groups = pending_groups
+
+    timetables = {}
+    if groups:
+        if strategy == 'hierarchical':
+            from timetable_hierarchical import solve_hierarchical
+            if encoding != 'boolean' or on_solution is not None or hint_file:
+                logging.warning("The 'hierarchical' strategy uses the boolean encoding without hints or streaming")
+            group_teachers = [teacher for group in groups for teacher in group]
+            timetables = solve_hierarchical(group_teachers, slice_inputs(group_teachers, inputs), options)
+        elif strategy == 'single':
+            group_teachers = [teacher for group in groups for teacher in group]
+            if on_solution is not None:
+                options['on_solution'] = lambda partial: on_solution(
+                    {teacher: {**partial, **cached_timetables}[teacher] for teacher in teachers})
+            timetables = solve_teacher_group(group_teachers, slice_inputs(group_teachers, inputs), options)
+        else:
+            if on_solution is not None:
+                logging.warning("Intermediate solutions are only streamed with the 'single' strategy")
+            timetables = solve_decomposed(groups, inputs, max_workers, options)
+
+    if cache_dir:
+        if timetables is not None:
+            for group in groups:
+                cache.put(group_keys[tuple(group)], {teacher: timetables[teacher] for teacher in group})
+        cache.save()
+        report = cache.report()
+        logging.info(f"Solve cache: {len(report['hits'])} teachers reused, {len(report['changed'])} changed, "
+                     f"{len(report['new'])} new, {report['evicted_entries']} entries evicted")
+        if report['changed']:
+            logging.info(f"Re-solved changed teachers: {report['changed']}")
+
+    if timetables is None:
+        return None
+
+    timetables.update(cached_timetables)
+    logging.info("✅ Timetable successfully created")
+    return {teacher: timetables[teacher] for teacher in teachers}
+
+def slice_inputs(teachers, inputs):
+    """Restrict the solver inputs to the subjects taught by a group of teachers"""
+    group_subjects = {subj for teacher in teachers for subj in inputs['teacher_subjects'][teacher]}
+    return {
+        'teacher_subjects': {teacher: inputs['teacher_subjects'][teacher] for teacher in teachers},
+        'qualified_teachers': {subj: inputs['qualified_teachers'][subj] for subj in group_subjects},
+        'subjects_with_practicals': [subj for subj in inputs['subjects_with_practicals'] if subj in group_subjects],
+        'subject_practical_hours': {subj: inputs['subject_practical_hours'][subj] for subj in group_subjects},
+        'subject_weekly_slots': {subj: inputs['subject_weekly_slots'][subj] for subj in group_subjects},
+        'subject_consecutive_slots': {subj: inputs['subject_consecutive_slots'][subj] for subj in group_subjects},
+        'subject_primary_teacher': {subj: inputs['subject_primary_teacher'][subj] for subj in group_subjects}
+    }
+
+def slice_options(teachers, options):
+    """Restrict per-teacher solve options, such as hints, to a group of teachers"""
+    if not options or not options.get('hints'):
+        return options
+    group_options = dict(options)
+    group_options['hints'] = {teacher: options['hints'][teacher] for teacher in teachers if teacher in options['hints']}
+    return group_options
+
+def group_cache_key(teachers, inputs, encoding='boolean', strategy='single', day_patterns='counts'):
+    """Cache key covering everything the model of an independent group of teachers depends on"""
+    group_inputs = slice_inputs(teachers, inputs)
+    # The hierarchical strategy builds its own model, which has no encoding or day pattern option
+    model = {'strategy': strategy}
+    if strategy != 'hierarchical':
+        model.update(encoding=encoding, day_patterns=day_patterns)
+    return make_key({
+        'engine': 'timetable_core',
+        **model,
+        'constants': {
+            'MAX_HOURS_PER_DAY': MAX_HOURS_PER_DAY,
+            'MAX_CONSECUTIVE_SLOTS': MAX_CONSECUTIVE_SLOTS,
+            'SLOT_CATEGORIES': SLOT_CATEGORIES,
+            'DAYS': DAYS,
+            'NUM_SLOTS': NUM_SLOTS
+        },
+        'teacher_subjects': {teacher: sorted(subjects) for teacher, subjects in group_inputs['teacher_subjects'].items()},
+        'qualified_teachers': {subj: sorted(faculty) for subj, faculty in group_inputs['qualified_teachers'].items()
+                               if subj in group_inputs['subjects_with_practicals']},
+        'subject_practical_hours': group_inputs['subject_practical_hours'],
+        'subject_weekly_slots': group_inputs['subject_weekly_slots'],
+        'subject_consecutive_slots': group_inputs['subject_consecutive_slots'],
+        'subject_primary_teacher': {subj: group_inputs['subject_primary_teacher'][subj]
+                                    for subj in group_inputs['subjects_with_practicals']}
+    })
+
+def solve_teacher_group(teachers, inputs, options=None):
+    """Build and solve the timetable model for a group of teachers.
+
+    The group must contain every qualified teacher of each practical subject it
+    teaches, since practical batches are shared between those teachers.
+
+    Args:
+        teachers: Teachers in the group
+        inputs: Solver inputs restricted to the group, see slice_inputs
+        options: Optional solve settings:
+            'hints' - previous timetable from load_timetable_hints to start the search from
+            'partial_hints' - only hint the assignments present in the previous timetable
+            'repair_hint' - let the solver repair hints that violate the constraints
+            'solver_config' - CP-SAT settings from solver_config.load_solver_config
+            'on_solution' - called with the timetables of every improving solution
+            'encoding' - 'boolean' (default) or 'interval'
+            'profile_build' - JSON-lines file to append the build profile of the model to
+            'day_patterns' - 'counts' (default) or 'table' for the 1-2 days per category rule
+
+    With the 'interval' encoding every lecture/tutorial slot and every two-slot lab
+    session is an optional interval on a week-long time axis (day * NUM_SLOTS + slot).
+    Each teacher gets one NoOverlap over their intervals and one cumulative over days
+    bounding the daily load. Lab sessions no longer force the per-slot subject
+    assignments, so those count lecture and tutorial slots only, as the weekly slot
+    calculation intends.
+    """
+    options = options or {}
+    encoding = options.get('encoding', 'boolean')
+    teacher_subjects = inputs['teacher_subjects']
+    qualified_teachers = inputs['qualified_teachers']
+    subjects_with_practicals = inputs['subjects_with_practicals']
+    subject_practical_hours = inputs['subject_practical_hours']
+    subject_consecutive_slots = inputs['subject_consecutive_slots']
+    subject_weekly_slots = inputs['subject_weekly_slots']
+    subject_primary_teacher = inputs['subject_primary_teacher']
+
+    days = DAYS
+    num_slots = NUM_SLOTS
+    slot_categories = SLOT_CATEGORIES
+
     model = cp_model.CpModel()
+    profiler = BuildProfiler(model, 'timetable_core', enabled=bool(options.get('profile_build')))
 
     # Define variables
+    profiler.section('variables')
     
     subject_assignments = {}
     for teacher in teachers:
@@ -125,32 +296,40 @@ def create_timetable(csv_file_path):
                             practical_batch_assignments[(subj, batch, teacher, d, s)] = model.NewBoolVar(
                                 f'{subj}_batch{batch}_{teacher}_day{d}_slot{s}')
 
+    # Lab sessions starting at each (teacher, day, slot), as (subject, batch, start literal)
+    lab_starts = {}
+    for (subj, batch, teacher, d, s), var in practical_batch_assignments.items():
+        lab_starts.setdefault((teacher, d, s), []).append((subj, batch, var))
+
+    # One-hot day category per teacher-day: 0 = A, 1 = C, 2 = B
+    profiler.section('day_category')
     teacher_day_category = {}
     for teacher in teachers:
         for d in range(len(days)):
-            teacher_day_category[(teacher, d)] = model.NewIntVar(0, 2, f'{teacher}_day{d}_category')
+            for cat in range(3):
+                teacher_day_category[(teacher, d, cat)] = model.NewBoolVar(f'{teacher}_day{d}_category{cat}')
+            model.AddExactlyOne(teacher_day_category[(teacher, d, cat)] for cat in range(3))
 
     # Teacher teaching in a slot (any subject)
+    profiler.section('one_subject_per_slot')
     teacher_teaching = {}
     for teacher in teachers:
         for d in range(len(days)):
             for s in range(num_slots):
                 teacher_teaching[(teacher, d, s)] = model.NewBoolVar(f'{teacher}_teaching_day{d}_slot{s}')
                 
-                # Link to subject assignments
-                subject_taught = []
-                for subj in teacher_subjects[teacher]:
-                    subject_taught.append(subject_assignments[(teacher, subj, d, s)])
-                
-                if subject_taught:
-                    model.Add(sum(subject_taught) >= 1).OnlyEnforceIf(teacher_teaching[(teacher, d, s)])
-                    model.Add(sum(subject_taught) == 0).OnlyEnforceIf(teacher_teaching[(teacher, d, s)].Not())
-                else:
-                    model.Add(teacher_teaching[(teacher, d, s)] == 0)
+                # Link to subject assignments; as teacher_teaching is boolean this also
+                # allows at most one subject per slot
+                taught = [subject_assignments[(teacher, subj, d, s)] for subj in teacher_subjects[teacher]]
+                if encoding == 'interval':
+                    # Lab sessions are separate intervals covering their start slot and the next one
+                    taught += [var for _, _, var in lab_starts.get((teacher, d, s), []) + lab_starts.get((teacher, d, s-1), [])]
+                model.Add(teacher_teaching[(teacher, d, s)] == sum(taught))
 
     # Add constraints
     
     # Ensure subjects get their required number of weekly slots (excluding practicals)
+    profiler.section('weekly_slots')
     for teacher in teachers:
         for subj in teacher_subjects[teacher]:
             weekly_slots = subject_weekly_slots[subj]
@@ -158,6 +337,7 @@ def create_timetable(csv_file_path):
                           for d in range(len(days)) for s in range(num_slots)) == weekly_slots)
     
     # NEW: Handle practical sessions with batch splitting
+    profiler.section('practical_linking')
     for subj in subjects_with_practicals:
         practical_hours = subject_practical_hours.get(subj, 0)
         if practical_hours > 0:
@@ -172,7 +352,7 @@ def create_timetable(csv_file_path):
                               for s in range(num_slots-1)) == practical_sessions_per_batch)
             
             # Connect practical batch assignments to subject assignments
-            for batch in [1, 2]:
+            for batch in ([1, 2] if encoding == 'boolean' else []):
                 for teacher in qualified_teachers[subj]:
                     for d in range(len(days)):
                         for s in range(num_slots-1):
@@ -184,12 +364,13 @@ def create_timetable(csv_file_path):
                                 practical_batch_assignments[(subj, batch, teacher, d, s)])
 
     # Constraint: One teacher cannot handle both batches of the same subject by default
+    profiler.section('practical_batches')
     # But if they have free slots, they can be assigned both batches
     for subj in subjects_with_practicals:
         practical_hours = subject_practical_hours.get(subj, 0)
         if practical_hours > 0:
             # Try to assign Batch 1 to the primary teacher
-            primary_teacher = df[df['Subject'] == subj].iloc[0]['Faculty']
+            primary_teacher = subject_primary_teacher[subj]
             
             # Variables to track if each batch is assigned to the primary teacher
             batch1_primary = model.NewBoolVar(f'{subj}_batch1_primary')
@@ -230,14 +411,10 @@ def create_timetable(csv_file_path):
                     # At most one batch can start at this slot
                     model.Add(sum(batch1_session_vars + batch2_session_vars) <= 1)
 
-    # Ensure a teacher can only teach one subject per time slot
-    for teacher in teachers:
-        for d in range(len(days)):
-            for s in range(num_slots):
-                model.Add(sum(subject_assignments[(teacher, subj, d, s)]
-                              for subj in teacher_subjects[teacher]) <= 1)
+    # A teacher can only teach one subject per time slot: enforced by the teacher_teaching link
 
     # No more than MAX_CONSECUTIVE_SLOTS consecutive teaching slots
+    profiler.section('consecutive_limit')
     for teacher in teachers:
         for d in range(len(days)):
             # Check each possible sequence of MAX_CONSECUTIVE_SLOTS+1 consecutive slots
@@ -249,6 +426,7 @@ def create_timetable(csv_file_path):
                 # At least one of the MAX_CONSECUTIVE_SLOTS+1 consecutive slots must be free
                 model.Add(sum(consecutive_vars) <= MAX_CONSECUTIVE_SLOTS)
 
+    profiler.section('day_category')
     for teacher in teachers:
         for d in range(len(days)):
             
@@ -256,119 +434,41 @@ def create_timetable(csv_file_path):
             for cat in range(3):  # Morning, Afternoon, Evening
                 cat_slots = [s for s in range(num_slots) if slot_categories[s] == cat]
                 is_cat[cat] = model.NewBoolVar(f'{teacher}_day{d}_uses_cat{cat}')
+                model.AddMaxEquality(is_cat[cat], [teacher_teaching[(teacher, d, s)] for s in cat_slots])
 
-                category_usage = []
-                for s in cat_slots:
-                    for subj in teacher_subjects[teacher]:
-                        category_usage.append(subject_assignments[(teacher, subj, d, s)])
-
-                if category_usage:
-                    model.AddMaxEquality(is_cat[cat], category_usage)
-                else:
-                    model.Add(is_cat[cat] == 0)
-
-            model.Add(teacher_day_category[(teacher, d)] == 2).OnlyEnforceIf(is_cat[2])
-            model.Add(teacher_day_category[(teacher, d)] == 1).OnlyEnforceIf(is_cat[1], is_cat[2].Not())
-            model.Add(teacher_day_category[(teacher, d)] == 0).OnlyEnforceIf(is_cat[0], is_cat[1].Not(), is_cat[2].Not())
-
-    for teacher in teachers:
-        for d in range(len(days) - 1):
-            c_today = model.NewBoolVar(f'{teacher}_day{d}_is_C')
-            model.Add(teacher_day_category[(teacher, d)] == 2).OnlyEnforceIf(c_today)
-            model.Add(teacher_day_category[(teacher, d)] != 2).OnlyEnforceIf(c_today.Not())
-            model.Add(teacher_day_category[(teacher, d)] != 0).OnlyEnforceIf(c_today)
-
+            model.AddImplication(is_cat[2], teacher_day_category[(teacher, d, 2)])
+            model.AddBoolAnd(teacher_day_category[(teacher, d, 1)]).OnlyEnforceIf(is_cat[1], is_cat[2].Not())
+            model.AddBoolAnd(teacher_day_category[(teacher, d, 0)]).OnlyEnforceIf(
+                is_cat[0], is_cat[1].Not(), is_cat[2].Not())
 
+    profiler.section('variety')
     for teacher in teachers:
+        if options.get('day_patterns') == 'table':
+            add_day_pattern_constraint(model, teacher_day_category, teacher, len(days))
+            continue
         for slot_type in range(3):
-            slot_type_occurrences = []
-            for d in range(len(days)):
-                uses_slot_type = model.NewBoolVar(f'{teacher}_day{d}_uses_type{slot_type}')
-                model.Add(teacher_day_category[(teacher, d)] == slot_type).OnlyEnforceIf(uses_slot_type)
-                model.Add(teacher_day_category[(teacher, d)] != slot_type).OnlyEnforceIf(uses_slot_type.Not())
-                slot_type_occurrences.append(uses_slot_type)
-            
+            slot_type_occurrences = [teacher_day_category[(teacher, d, slot_type)] for d in range(len(days))]
             model.Add(sum(slot_type_occurrences) >= 1)
             model.Add(sum(slot_type_occurrences) <= 2)
 
     # Add constraints for free slots based on slot type
+    profiler.section('free_slots')
     for teacher in teachers:
         for d in range(len(days)):
-            # For slot type A (0): slot4 to slot6 should have one free slot
-            a_type_constraints = model.NewBoolVar(f'{teacher}_day{d}_A_type_constraints')
-            model.Add(teacher_day_category[(teacher, d)] == 0).OnlyEnforceIf(a_type_constraints)
-            model.Add(teacher_day_category[(teacher, d)] != 0).OnlyEnforceIf(a_type_constraints.Not())
-            
-            # For type A, slots 3, 4, 5 (slot4, slot5, slot6 in 1-indexed notation)
-            # We need at least one of them to be free
+            # For slot type A (0): slots 3, 4, 5 (slot4 to slot6 in 1-indexed notation) need one free slot
             type_a_slots = [3, 4, 5]
-            slot_occupied = []
-            for s in type_a_slots:
-                is_occupied = model.NewBoolVar(f'{teacher}_day{d}_slot{s}_occupied')
-                slot_assignments = []
-                for subj in teacher_subjects[teacher]:
-                    slot_assignments.append(subject_assignments[(teacher, subj, d, s)])
-                
-                if slot_assignments:
-                    model.Add(sum(slot_assignments) >= 1).OnlyEnforceIf(is_occupied)
-                    model.Add(sum(slot_assignments) == 0).OnlyEnforceIf(is_occupied.Not())
-                else:
-                    model.Add(is_occupied == 0)
-                
-                slot_occupied.append(is_occupied)
-            
-            # Ensure at least one slot is free
-            model.Add(sum(slot_occupied) <= len(type_a_slots) - 1).OnlyEnforceIf(a_type_constraints)
-            
-            # For slot type B (2): slot2 to slot4 should have one free slot
-            b_type_constraints = model.NewBoolVar(f'{teacher}_day{d}_B_type_constraints')
-            model.Add(teacher_day_category[(teacher, d)] == 2).OnlyEnforceIf(b_type_constraints)
-            model.Add(teacher_day_category[(teacher, d)] != 2).OnlyEnforceIf(b_type_constraints.Not())
+            model.Add(sum(teacher_teaching[(teacher, d, s)] for s in type_a_slots)
+                      <= len(type_a_slots) - 1).OnlyEnforceIf(teacher_day_category[(teacher, d, 0)])
             
-            # For type B, slots 1, 2, 3 (slot2, slot3, slot4 in 1-indexed notation)
+            # For slot type B (2): slots 1, 2, 3 (slot2 to slot4 in 1-indexed notation) need one free slot
             type_b_slots = [1, 2, 3]
-            slot_occupied = []
-            for s in type_b_slots:
-                is_occupied = model.NewBoolVar(f'{teacher}_day{d}_slot{s}_occupied')
-                slot_assignments = []
-                for subj in teacher_subjects[teacher]:
-                    slot_assignments.append(subject_assignments[(teacher, subj, d, s)])
-                
-                if slot_assignments:
-                    model.Add(sum(slot_assignments) >= 1).OnlyEnforceIf(is_occupied)
-                    model.Add(sum(slot_assignments) == 0).OnlyEnforceIf(is_occupied.Not())
-                else:
-                    model.Add(is_occupied == 0)
-                
-                slot_occupied.append(is_occupied)
-            
-            # Ensure at least one slot is free
-            model.Add(sum(slot_occupied) <= len(type_b_slots) - 1).OnlyEnforceIf(b_type_constraints)
-            
-            # For slot type C (1): slot1 to slot2 should have one free slot
-            c_type_constraints = model.NewBoolVar(f'{teacher}_day{d}_C_type_constraints')
-            model.Add(teacher_day_category[(teacher, d)] == 1).OnlyEnforceIf(c_type_constraints)
-            model.Add(teacher_day_category[(teacher, d)] != 1).OnlyEnforceIf(c_type_constraints.Not())
+            model.Add(sum(teacher_teaching[(teacher, d, s)] for s in type_b_slots)
+                      <= len(type_b_slots) - 1).OnlyEnforceIf(teacher_day_category[(teacher, d, 2)])
             
-            # For type C, slots 0, 1 (slot1, slot2 in 1-indexed notation)
+            # For slot type C (1): slots 0, 1 (slot1 to slot2 in 1-indexed notation) need one free slot
             type_c_slots = [0, 1]
-            slot_occupied = []
-            for s in type_c_slots:
-                is_occupied = model.NewBoolVar(f'{teacher}_day{d}_slot{s}_occupied')
-                slot_assignments = []
-                for subj in teacher_subjects[teacher]:
-                    slot_assignments.append(subject_assignments[(teacher, subj, d, s)])
-                
-                if slot_assignments:
-                    model.Add(sum(slot_assignments) >= 1).OnlyEnforceIf(is_occupied)
-                    model.Add(sum(slot_assignments) == 0).OnlyEnforceIf(is_occupied.Not())
-                else:
-                    model.Add(is_occupied == 0)
-                
-                slot_occupied.append(is_occupied)
-            
-            # Ensure at least one slot is free
-            model.Add(sum(slot_occupied) <= len(type_c_slots) - 1).OnlyEnforceIf(c_type_constraints)
+            model.Add(sum(teacher_teaching[(teacher, d, s)] for s in type_c_slots)
+                      <= len(type_c_slots) - 1).OnlyEnforceIf(teacher_day_category[(teacher, d, 1)])
 
 
     def add_open_elective_constraints(model, subject_assignments, teachers, days, num_slots):
@@ -388,43 +488,56 @@ def create_timetable(csv_file_path):
                     model.Add(sum(slot_assignments) == 0).OnlyEnforceIf(open_elective_slots[(d, s)].Not())
 
     # Add maximum teaching hours per day constraint
-    for teacher in teachers:
-        for d in range(len(days)):
-            day_slots = []
-            for s in range(num_slots):
-                for subj in teacher_subjects[teacher]:
-                    day_slots.append(subject_assignments[(teacher, subj, d, s)])
-            model.Add(sum(day_slots) <= MAX_HOURS_PER_DAY)
+    profiler.section('max_hours')
+    if encoding == 'interval':
+        for teacher in teachers:
+            week_intervals = []
+            day_intervals = []
+            day_demands = []
+            for subj in teacher_subjects[teacher]:
+                for d in range(len(days)):
+                    for s in range(num_slots):
+                        taught = subject_assignments[(teacher, subj, d, s)]
+                        week_intervals.append(model.NewOptionalFixedSizeIntervalVar(
+                            d * num_slots + s, 1, taught, f'{teacher}_{subj}_day{d}_slot{s}_interval'))
+                        day_intervals.append(model.NewOptionalFixedSizeIntervalVar(
+                            d, 1, taught, f'{teacher}_{subj}_day{d}_slot{s}_load'))
+                        day_demands.append(1)
+            for d in range(len(days)):
+                for s in range(num_slots - 1):
+                    for subj, batch, lab in lab_starts.get((teacher, d, s), []):
+                        week_intervals.append(model.NewOptionalFixedSizeIntervalVar(
+                            d * num_slots + s, 2, lab, f'{subj}_batch{batch}_{teacher}_day{d}_slot{s}_interval'))
+                        day_intervals.append(model.NewOptionalFixedSizeIntervalVar(
+                            d, 1, lab, f'{subj}_batch{batch}_{teacher}_day{d}_slot{s}_load'))
+                        day_demands.append(2)
+            model.AddNoOverlap(week_intervals)
+            model.AddCumulative(day_intervals, day_demands, MAX_HOURS_PER_DAY)
+    else:
+        for teacher in teachers:
+            for d in range(len(days)):
+                day_slots = [teacher_teaching[(teacher, d, s)] for s in range(num_slots)]
+                model.Add(sum(day_slots) <= MAX_HOURS_PER_DAY)
 
     # Each teacher is either in Mon-Fri batch or Tue-Sat batch
+    profiler.section('mon_fri')
     for teacher in teachers:
         mon_to_fri = model.NewBoolVar(f'{teacher}_mon_to_fri')
         
-        for d in range(len(days)):
-            day_slots = []
-            for s in range(num_slots):
-                for subj in teacher_subjects[teacher]:
-                    day_slots.append(subject_assignments[(teacher, subj, d, s)])
-            
-            # If Mon-Fri batch, no teaching on Saturday (d=5)
-            if d == 5:  # Saturday
-                model.Add(sum(day_slots) == 0).OnlyEnforceIf(mon_to_fri)
-            
-            # If Tue-Sat batch, no teaching on Monday (d=0)
-            elif d == 0:  # Monday
-                model.Add(sum(day_slots) == 0).OnlyEnforceIf(mon_to_fri.Not())
-            
-            # Maintain the MAX_HOURS_PER_DAY constraint
-            model.Add(sum(day_slots) <= MAX_HOURS_PER_DAY)
+        # If Mon-Fri batch, no teaching on Saturday (d=5); if Tue-Sat batch, no teaching on Monday (d=0)
+        model.Add(sum(teacher_teaching[(teacher, 5, s)] for s in range(num_slots)) == 0).OnlyEnforceIf(mon_to_fri)
+        model.Add(sum(teacher_teaching[(teacher, 0, s)] for s in range(num_slots)) == 0).OnlyEnforceIf(mon_to_fri.Not())
 
+    profiler.section('open_electives')
     add_open_elective_constraints(model, subject_assignments, teachers, days, num_slots)
 
     # Create an objective function to prefer primary teacher for batch 2 when possible
+    profiler.section('objective')
     objective_terms = []
     
     # Add a penalty for assigning batch 2 to secondary teachers
     for subj in subjects_with_practicals:
-        primary_teacher = df[df['Subject'] == subj].iloc[0]['Faculty']
+        primary_teacher = subject_primary_teacher[subj]
         
         # For each practical session of batch 2
         practical_hours = subject_practical_hours.get(subj, 0)
@@ -433,7 +546,7 @@ def create_timetable(csv_file_path):
                 for s in range(num_slots-1):
                     # Add a reward for using the primary teacher for batch 2
                     primary_batch2 = practical_batch_assignments.get((subj, 2, primary_teacher, d, s))
-                    if primary_batch2:
+                    if primary_batch2 is not None:
                         # Add a large bonus to prioritize using the primary teacher
                         objective_terms.append(100 * primary_batch2)
     
@@ -442,23 +555,17 @@ def create_timetable(csv_file_path):
         model.Maximize(sum(objective_terms))
 
     solver = cp_model.CpSolver()
-    status = solver.Solve(model)
-
-    timetables = {}
-    if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-        # Track which teachers and batches are assigned to each practical course
-        practical_assignments = {}
-        for subj in subjects_with_practicals:
-            practical_assignments[subj] = {1: set(), 2: set()}
-            for batch in [1, 2]:
-                for teacher in qualified_teachers[subj]:
-                    for d in range(len(days)):
-                        for s in range(num_slots-1):
-                            if (subj, batch, teacher, d, s) in practical_batch_assignments:
-                                if solver.Value(practical_batch_assignments[(subj, batch, teacher, d, s)]):
-                                    practical_assignments[subj][batch].add(teacher)
-                                    logging.info(f"Practical Assignment: {subj} Batch {batch} assigned to {teacher} on {days[d]} slots {s},{s+1}")
-        
+    if options.get('hints'):
+        profiler.section('hints')
+        hint_count = add_core_hints(model, options['hints'], teachers, teacher_subjects, subject_assignments,
+                                    practical_batch_assignments, teacher_day_category, num_slots,
+                                    partial=options.get('partial_hints', False),
+                                    labs_separate=encoding == 'interval')
+        logging.info(f"Added {hint_count} hints for {sum(teacher in options['hints'] for teacher in teachers)}"
+                     f"/{len(teachers)} teachers")
+        solver.parameters.repair_hint = options.get('repair_hint', False)
+    def extract_timetables(value):
+        timetables = {}
         for teacher in teachers:
             timetable = []
             for d in range(len(days)):
@@ -467,24 +574,28 @@ def create_timetable(csv_file_path):
                 for s in range(num_slots):
                     cell_value = ""
                     for subj in teacher_subjects[teacher]:
-                        if solver.Value(subject_assignments[(teacher, subj, d, s)]):
+                        if value(subject_assignments[(teacher, subj, d, s)]):
                             # Check if this is part of a practical session
                             batch_info = ""
-                            if subject_consecutive_slots.get(subj, False):
+                            if subject_consecutive_slots.get(subj, False) and encoding == 'boolean':
                                 # Check if this is a practical session start
                                 for batch in [1, 2]:
                                     if s > 0 and (subj, batch, teacher, d, s-1) in practical_batch_assignments:
-                                        if solver.Value(practical_batch_assignments[(subj, batch, teacher, d, s-1)]):
+                                        if value(practical_batch_assignments[(subj, batch, teacher, d, s-1)]):
                                             batch_info = f" (Lab-B{batch})"
                                     elif s < num_slots-1 and (subj, batch, teacher, d, s) in practical_batch_assignments:
-                                        if solver.Value(practical_batch_assignments[(subj, batch, teacher, d, s)]):
+                                        if value(practical_batch_assignments[(subj, batch, teacher, d, s)]):
                                             batch_info = f" (Lab-B{batch})"
                             
                             cell_value = f"{subj}{batch_info}"
                             break
+                    if encoding == 'interval' and not cell_value:
+                        for subj, batch, lab in lab_starts.get((teacher, d, s), []) + lab_starts.get((teacher, d, s-1), []):
+                            if value(lab):
+                                cell_value = f"{subj} (Lab-B{batch})"
                     row.append(cell_value)
                 
-                day_cat = solver.Value(teacher_day_category[(teacher, d)])
+                day_cat = next(cat for cat in range(3) if value(teacher_day_category[(teacher, d, cat)]))
                 category_names = {0: "A (8–3)", 2: "B (10–5)", 1: "C (12–7)"}
                 row.append(category_names[day_cat])
                 
@@ -492,13 +603,73 @@ def create_timetable(csv_file_path):
                 
             columns = ["Teacher", "Day"] + [f"Slot {s+1}" for s in range(num_slots)] + ["SlotType"]
             timetables[teacher] = pd.DataFrame(timetable, columns=columns)
-
-        logging.info("✅ Timetable successfully created")
         return timetables
+
+    apply_solver_config(solver, options.get('solver_config'))
+    profiler.solve_started(len(teachers))
+    if options.get('on_solution') is not None:
+        # Hand each improving solution to on_solution while the search continues
+        callback = TimetableSolutionCallback(extract_timetables, options['on_solution'])
+        with stop_on_signals(callback):
+            status = solver.Solve(model, callback)
+    else:
+        status = solver.Solve(model)
+    profiler.solve_finished(solver, status)
+    profiler.save(options.get('profile_build'))
+    record_solve(options.get('solver_config'), solver, status, 'timetable_core', len(teachers))
+
+    if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        # Track which teachers and batches are assigned to each practical course
+        practical_assignments = {}
+        for subj in subjects_with_practicals:
+            practical_assignments[subj] = {1: set(), 2: set()}
+            for batch in [1, 2]:
+                for teacher in qualified_teachers[subj]:
+                    for d in range(len(days)):
+                        for s in range(num_slots-1):
+                            if (subj, batch, teacher, d, s) in practical_batch_assignments:
+                                if solver.Value(practical_batch_assignments[(subj, batch, teacher, d, s)]):
+                                    practical_assignments[subj][batch].add(teacher)
+                                    logging.info(f"Practical Assignment: {subj} Batch {batch} assigned to {teacher} on {days[d]} slots {s},{s+1}")
+        
+        return extract_timetables(solver.Value)
     else:
         logging.error(f"❌ No feasible schedule found. Solver status: {solver.StatusName(status)}")
         return None
 
+def teacher_coupling_groups(qualified_teachers, subjects_with_practicals):
+    """Groups of teachers that must share a model: practical batches and open electives"""
+    groups = [('practical', qualified_teachers[subj]) for subj in subjects_with_practicals]
+    groups += [('open_elective', qualified_teachers[subj]) for subj in qualified_teachers if 'OpenElective' in subj]
+    return groups
+
+def solve_decomposed(groups, inputs, max_workers=None, options=None):
+    """Solve each independent group of teachers as its own model on a process pool"""
+    teachers = [teacher for group in groups for teacher in group]
+    max_workers = max_workers or os.cpu_count()
+    logging.info(f"Decomposed {len(teachers)} teachers into {len(groups)} independent groups "
+                 f"(largest: {len(groups[0]) if groups else 0}) using {max_workers} workers")
+
+    timetables = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for group in groups:
+            futures[executor.submit(solve_teacher_group, group, slice_inputs(group, inputs),
+                                    slice_options(group, options))] = group
+
+        for future in concurrent.futures.as_completed(futures):
+            group = futures[future]
+            group_timetables = future.result()
+            if group_timetables is None:
+                logging.error(f"❌ No feasible schedule found for group of {len(group)} teachers: {group}")
+                for pending in futures:
+                    pending.cancel()
+                return None
+            timetables.update(group_timetables)
+            logging.info(f"Solved group of {len(group)} teachers. Total timetables: {len(timetables)}/{len(teachers)}")
+
+    return timetables
+
 def export_timetable_to_csv(timetables, output_file="teacher_timetables.csv"):
     if timetables is None:
         logging.warning("No timetable data to export.")
@@ -0,0 +1,230 @@
+import itertools
+import logging
+import time
+from functools import lru_cache
+import pandas as pd
+from ortools.sat.python import cp_model
+from day_patterns import valid_day_patterns
+from solver_config import apply_solver_config, record_solve
+from timetable_core import DAYS, NUM_SLOTS, SLOT_CATEGORIES, MAX_HOURS_PER_DAY, MAX_CONSECUTIVE_SLOTS
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Slots of which one must stay free on a day of each category (0 = A, 1 = C, 2 = B), as in solve_teacher_group
+FREE_SLOT_WINDOWS = {0: (3, 4, 5), 1: (0, 1), 2: (1, 2, 3)}
+CATEGORY_NAMES = {0: "A (8–3)", 2: "B (10–5)", 1: "C (12–7)"}
+# A lab session takes its start slot and the next one
+LAB_STARTS = list(range(NUM_SLOTS - 1))
+
+def valid_day(taught, category):
+    """Whether a set of taught slots meets the day-local rules of timetable_core on a day of `category`"""
+    if len(taught) > MAX_HOURS_PER_DAY:
+        return False
+    run = MAX_CONSECUTIVE_SLOTS + 1
+    if any(all(s + i in taught for i in range(run)) for s in range(NUM_SLOTS - run + 1)):
+        return False
+    # The category of a day is the latest part of the day it uses; an empty day can have any
+    if taught and max(SLOT_CATEGORIES[s] for s in taught) != category:
+        return False
+    return not all(s in taught for s in FREE_SLOT_WINDOWS[category])
+
+def pack_day(category, lab_starts, lectures):
+    """
+    Place `lectures` lecture/tutorial slots around lab sessions starting at `lab_starts`.
+
+    Every subset of the free slots is tried, at most C(7, 3) = 35 of them, so the first
+    fit found is exact: None means the day cannot be packed.
+
+    Returns:
+        Sorted lecture slots, or None
+    """
+    lab_slots = {s + i for s in lab_starts for i in range(2)}
+    if len(lab_slots) != 2 * len(lab_starts):
+        return None
+    free = [s for s in range(NUM_SLOTS) if s not in lab_slots]
+    for chosen in itertools.combinations(free, lectures):
+        if valid_day(lab_slots | set(chosen), category):
+            return list(chosen)
+    return None
+
+@lru_cache(maxsize=None)
+def day_table():
+    """Every (category, lab start flags per slot..., lectures) combination pack_day can place"""
+    rows = []
+    for category in range(3):
+        for flags in itertools.product([0, 1], repeat=len(LAB_STARTS)):
+            lab_starts = [s for s, flag in zip(LAB_STARTS, flags) if flag]
+            for lectures in range(MAX_HOURS_PER_DAY + 1):
+                if pack_day(category, lab_starts, lectures) is not None:
+                    rows.append((category, *flags, lectures))
+    return rows
+
+def plan_week(teachers, inputs, solver_config=None):
+    """
+    Phase one: pick each teacher's weekly category pattern, off day, lab sessions and the
+    number of lecture/tutorial slots of every subject on every day.
+
+    Slot positions of lectures are left out; each teacher-day is limited to the
+    combinations of day_table, so phase two can always place them.
+
+    Returns:
+        {'category': {(teacher, d): cat}, 'lectures': {(teacher, d): {subj: count}},
+         'labs': {(teacher, d): [(subj, batch, start)]}}, or None if no plan exists
+    """
+    teacher_subjects = inputs['teacher_subjects']
+    qualified_teachers = inputs['qualified_teachers']
+    subject_practical_hours = inputs['subject_practical_hours']
+    subject_weekly_slots = inputs['subject_weekly_slots']
+    subject_primary_teacher = inputs['subject_primary_teacher']
+    practicals = [subj for subj in inputs['subjects_with_practicals'] if subject_practical_hours.get(subj, 0) > 0]
+    days = range(len(DAYS))
+
+    model = cp_model.CpModel()
+
+    category = {}
+    for teacher in teachers:
+        for d in days:
+            category[(teacher, d)] = model.NewIntVar(0, 2, f'{teacher}_day{d}_category')
+        model.AddAllowedAssignments([category[(teacher, d)] for d in days], valid_day_patterns(len(DAYS)))
+
+    lectures = {}
+    for teacher in teachers:
+        for subj in teacher_subjects[teacher]:
+            for d in days:
+                lectures[(teacher, subj, d)] = model.NewIntVar(0, MAX_HOURS_PER_DAY, f'{teacher}_{subj}_day{d}_lectures')
+
+    labs = {}
+    for subj in practicals:
+        for batch in [1, 2]:
+            for teacher in qualified_teachers[subj]:
+                for d in days:
+                    for s in LAB_STARTS:
+                        labs[(subj, batch, teacher, d, s)] = model.NewBoolVar(f'{subj}_batch{batch}_{teacher}_day{d}_slot{s}')
+    teacher_labs = {}
+    subject_labs = {}
+    for (subj, batch, teacher, d, s), var in labs.items():
+        teacher_labs.setdefault((teacher, d, s), []).append(var)
+        subject_labs.setdefault((teacher, subj), []).append(var)
+
+    # Every teacher-day is one row of the day table
+    day_load = {}
+    for teacher in teachers:
+        for d in days:
+            starts = []
+            for s in LAB_STARTS:
+                start = model.NewBoolVar(f'{teacher}_day{d}_lab_start{s}')
+                model.Add(start == sum(teacher_labs.get((teacher, d, s), [])))
+                starts.append(start)
+            day_lectures = model.NewIntVar(0, MAX_HOURS_PER_DAY, f'{teacher}_day{d}_lectures')
+            model.Add(day_lectures == sum(lectures[(teacher, subj, d)] for subj in teacher_subjects[teacher]))
+            model.AddAllowedAssignments([category[(teacher, d)], *starts, day_lectures], day_table())
+            day_load[(teacher, d)] = starts + [day_lectures]
+
+    # Weekly slots of a subject include the two slots of each of its lab sessions
+    for teacher in teachers:
+        for subj in teacher_subjects[teacher]:
+            model.Add(sum(lectures[(teacher, subj, d)] for d in days) + 2 * sum(subject_labs.get((teacher, subj), []))
+                      == subject_weekly_slots[subj])
+
+    objective_terms = []
+    for subj in practicals:
+        sessions = {batch: {teacher: [labs[(subj, batch, teacher, d, s)] for d in days for s in LAB_STARTS]
+                            for teacher in qualified_teachers[subj]} for batch in [1, 2]}
+        for batch in [1, 2]:
+            model.Add(sum(var for teacher_sessions in sessions[batch].values() for var in teacher_sessions)
+                      == subject_practical_hours[subj])
+        primary_teacher = subject_primary_teacher[subj]
+        model.Add(sum(sessions[1][primary_teacher]) >= 1)
+        objective_terms += [100 * var for var in sessions[2].get(primary_teacher, [])]
+        # One lab session of a subject per start slot
+        for d in days:
+            for s in LAB_STARTS:
+                model.Add(sum(labs[(subj, batch, teacher, d, s)] for batch in [1, 2]
+                              for teacher in qualified_teachers[subj]) <= 1)
+
+    # Mon-Fri teachers are off on Saturday, Tue-Sat teachers on Monday
+    for teacher in teachers:
+        mon_to_fri = model.NewBoolVar(f'{teacher}_mon_to_fri')
+        model.Add(sum(day_load[(teacher, len(DAYS) - 1)]) == 0).OnlyEnforceIf(mon_to_fri)
+        model.Add(sum(day_load[(teacher, 0)]) == 0).OnlyEnforceIf(mon_to_fri.Not())
+
+    if objective_terms:
+        model.Maximize(sum(objective_terms))
+
+    solver = cp_model.CpSolver()
+    apply_solver_config(solver, solver_config)
+    status = solver.Solve(model)
+    record_solve(solver_config, solver, status, 'timetable_hierarchical', len(teachers))
+    if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        logging.error(f"❌ No feasible weekly plan found. Solver status: {solver.StatusName(status)}")
+        return None
+
+    plan = {'category': {}, 'lectures': {}, 'labs': {}}
+    for teacher in teachers:
+        for d in days:
+            plan['category'][(teacher, d)] = solver.Value(category[(teacher, d)])
+            plan['lectures'][(teacher, d)] = {subj: solver.Value(lectures[(teacher, subj, d)])
+                                              for subj in teacher_subjects[teacher]}
+            plan['labs'][(teacher, d)] = []
+    for (subj, batch, teacher, d, s), var in labs.items():
+        if solver.Value(var):
+            plan['labs'][(teacher, d)].append((subj, batch, s))
+    return plan
+
+def pack_week(teachers, plan):
+    """
+    Phase two: place the planned slots of every teacher-day independently.
+
+    Returns:
+        {teacher: DataFrame} in the format of timetable_core
+    """
+    columns = ["Teacher", "Day"] + [f"Slot {s+1}" for s in range(NUM_SLOTS)] + ["SlotType"]
+    timetables = {}
+    for teacher in teachers:
+        timetable = []
+        for d, day in enumerate(DAYS):
+            cells = [""] * NUM_SLOTS
+            day_labs = plan['labs'][(teacher, d)]
+            for subj, batch, s in day_labs:
+                cells[s] = cells[s + 1] = f"{subj} (Lab-B{batch})"
+
+            lectures = plan['lectures'][(teacher, d)]
+            slots = pack_day(plan['category'][(teacher, d)], [s for _, _, s in day_labs], sum(lectures.values()))
+            if slots is None:
+                raise ValueError(f"Planned day {day} of {teacher} cannot be packed")
+            subjects = [subj for subj, count in lectures.items() for _ in range(count)]
+            for s, subj in zip(slots, subjects):
+                cells[s] = subj
+
+            timetable.append([teacher, day] + cells + [CATEGORY_NAMES[plan['category'][(teacher, d)]]])
+        timetables[teacher] = pd.DataFrame(timetable, columns=columns)
+    return timetables
+
+def solve_hierarchical(teachers, inputs, options=None):
+    """
+    Solve timetable_core's model in two phases: a weekly plan without slot positions for
+    all teachers (plan_week), then per-teacher-day slot packing (pack_week).
+
+    The A/B/C free-slot windows, consecutive limit and daily maximum only involve one
+    teacher-day, so they are enumerated once into day_table and the weekly plan never
+    needs per-slot lecture variables. Follows the 'boolean' encoding: lab sessions
+    count towards their subject's weekly slots.
+
+    Args:
+        teachers: Teachers to schedule
+        inputs: Solver inputs, see slice_inputs
+        options: Solve settings of create_timetable; only 'solver_config' is used
+
+    Returns:
+        {teacher: DataFrame}, or None if no plan exists
+    """
+    options = options or {}
+    start = time.perf_counter()
+    plan = plan_week(teachers, inputs, options.get('solver_config'))
+    if plan is None:
+        return None
+    planned = time.perf_counter()
+    timetables = pack_week(teachers, plan)
+    logging.info(f"Planned the week in {planned - start:.2f}s and packed "
+                 f"{len(teachers) * len(DAYS)} teacher-days in {time.perf_counter() - planned:.2f}s")
+    return timetables
@@ -0,0 +1,120 @@
+import logging
+import re
+import pandas as pd
+
+# SlotType labels written by export_timetable_to_csv, mapped back to the day category values
+CATEGORY_LABELS = {'A': 0, 'C': 1, 'B': 2}
+LAB_BATCH_PATTERN = re.compile(r'^(?P<subject>.+?) \(Lab-B(?P<batch>\d)\)$')
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def load_timetable_hints(csv_file_path, days):
+    """
+    Read a timetable exported by export_timetable_to_csv for use as solver hints.
+
+    Args:
+        csv_file_path: Path to a 'Teacher, Day, Slot 1..n, SlotType' CSV
+        days: Day names in model order
+
+    Returns:
+        {teacher: {day_index: {'cells': [(subject, batch) or None per slot], 'category': int or None}}},
+        or None if the file cannot be used
+    """
+    try:
+        df = pd.read_csv(csv_file_path, dtype=str, keep_default_na=False)
+    except FileNotFoundError:
+        logging.error(f"Hint file not found: {csv_file_path}")
+        return None
+    except pd.errors.EmptyDataError:
+        logging.error(f"Hint file is empty or invalid: {csv_file_path}")
+        return None
+
+    slot_columns = [col for col in df.columns if re.fullmatch(r'Slot \d+', col)]
+    if not {'Teacher', 'Day'}.issubset(df.columns) or not slot_columns:
+        logging.error(f"Hint file must have Teacher, Day and 'Slot N' columns: {csv_file_path}")
+        return None
+    slot_columns.sort(key=lambda col: int(col.split()[1]))
+
+    hints = {}
+    for row in df.to_dict(orient='records'):
+        if row['Day'] not in days:
+            continue
+
+        cells = []
+        for col in slot_columns:
+            value = row[col].strip()
+            match = LAB_BATCH_PATTERN.match(value)
+            if match:
+                cells.append((match.group('subject'), int(match.group('batch'))))
+            elif value:
+                cells.append((value, None))
+            else:
+                cells.append(None)
+
+        slot_type = row.get('SlotType', '').strip()
+        category = CATEGORY_LABELS.get(slot_type[:1]) if slot_type else None
+        hints.setdefault(row['Teacher'], {})[days.index(row['Day'])] = {'cells': cells, 'category': category}
+
+    logging.info(f"Loaded hints for {len(hints)} teachers from {csv_file_path}")
+    return hints
+
+def lab_session_starts(cells):
+    """Find (slot, subject, batch) for every two-slot lab session in a day's cells"""
+    starts = []
+    s = 0
+    while s < len(cells) - 1:
+        cell = cells[s]
+        if cell is not None and cell[1] is not None and cells[s + 1] == cell:
+            starts.append((s, cell[0], cell[1]))
+            s += 2
+        else:
+            s += 1
+    return starts
+
+def add_core_hints(model, hints, teachers, teacher_subjects, subject_assignments,
+                   practical_batch_assignments, teacher_day_category, num_slots, partial=False,
+                   labs_separate=False):
+    """
+    Hint the timetable_core model variables from a previous timetable.
+
+    Teachers missing from the hints are left unhinted. With partial=True only the
+    assignments present in the previous timetable are hinted, leaving the solver free
+    to choose everything else; otherwise every mappable variable of a hinted teacher
+    gets a 0/1 hint. With labs_separate=True lab cells only hint the lab session
+    variables, for models whose subject assignments cover lectures and tutorials only.
+
+    Returns:
+        Number of hints added
+    """
+    count = 0
+    for teacher in teachers:
+        if teacher not in hints:
+            continue
+        subjects = set(teacher_subjects[teacher])
+        for d, day in hints[teacher].items():
+            cells = day['cells'][:num_slots]
+            for s in range(num_slots):
+                cell = cells[s] if s < len(cells) else None
+                for subj in subjects:
+                    taught = cell is not None and cell[0] == subj and not (labs_separate and cell[1] is not None)
+                    if taught or not partial:
+                        model.AddHint(subject_assignments[(teacher, subj, d, s)], int(taught))
+                        count += 1
+
+            starts = {(s, subj, batch) for s, subj, batch in lab_session_starts(cells)}
+            for subj in subjects:
+                for batch in [1, 2]:
+                    for s in range(num_slots - 1):
+                        var = practical_batch_assignments.get((subj, batch, teacher, d, s))
+                        if var is None:
+                            continue
+                        started = (s, subj, batch) in starts
+                        if started or not partial:
+                            model.AddHint(var, int(started))
+                            count += 1
+
+            if day['category'] is not None:
+                for cat in range(3):
+                    model.AddHint(teacher_day_category[(teacher, d, cat)], int(cat == day['category']))
+                    count += 1
+    return count
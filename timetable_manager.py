@@ -1,62 +1,67 @@
 import pandas as pd
 from ortools.sat.python import cp_model
 import logging
+import time
+from preprocessing import load_course_data, build_lookup_tables
+from solver_config import apply_solver_config, record_solve
+from day_patterns import add_day_pattern_constraint
+from solution_stream import TimetableSolutionCallback, stop_on_signals
 
 MAX_HOURS_PER_DAY = 7  # Keep this as is
 MAX_CONSECUTIVE_SLOTS = 4  # Keep this constraint as is
 MORNING_SLOTS = [0, 1, 2]
 SURVEY_LAB_CODE = 'CE23331'
+# Per-teacher constraint families that relax_on_infeasible may switch off, most expendable first
+RELAXABLE_FAMILIES = ['variety', 'free_slot', 'mon_fri', 'consecutive', 'max_hours']
+# Penalty of each violation of an optional rule with soft_constraints
+SOFT_PENALTIES = {'mon_fri': 10, 'variety': 3, 'free_slot': 2, 'transition': 1}
+# Slots of which one must stay free on a day of each category (0 = A, 1 = C, 2 = B)
+FREE_SLOT_WINDOWS = {0: [3, 4, 5], 2: [1, 2, 3], 1: [0, 1]}
+CATEGORY_NAMES = {0: "A (8–3)", 2: "B (10–5)", 1: "C (12–7)"}
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def create_timetable(csv_file_path, relaxed_constraints=False):
+def create_timetable(csv_file_path, relaxed_constraints=False, only_teachers=None, solver_config=None,
+                     on_solution=None, relax_on_infeasible=False, soft_constraints=False, day_patterns='counts'):
     """
     Create a timetable based on input CSV data.
     
     Args:
         csv_file_path: Path to the CSV file with course data
         relaxed_constraints: If True, relax some constraints to find a feasible solution
+        only_teachers: If given, build and solve the model for these teachers only
+        solver_config: CP-SAT settings from solver_config.load_solver_config
+        on_solution: If given, called with the timetables of every improving solution as the
+            search finds it; SIGINT/SIGTERM then stop the search and keep the best solution
+        relax_on_infeasible: If the model is infeasible, switch off the constraint families
+            (RELAXABLE_FAMILIES) of the teachers in the solver's infeasibility core and solve
+            again in the same model; once a timetable is found, every pair that can be enforced
+            again is restored, see restore_relaxed
+        soft_constraints: Turn the optional rules (free slots, 1-2 days of each slot type,
+            no C day followed by an A day, Mon-Fri/Tue-Sat) into penalties weighted by
+            SOFT_PENALTIES and return the least-violating timetable found; each timetable
+            then has a 'Violations' column listing the rules broken on that day
+        day_patterns: 'counts' bounds the days of each slot type with linear constraints,
+            'table' allows only the precomputed valid weekly patterns, see day_patterns.py;
+            soft_constraints always uses the counts, one penalty per bound
     """
-    try:
-        df = pd.read_csv(csv_file_path)
-        
-    except FileNotFoundError:
-        logging.error(f"File not found: {csv_file_path}")
-        return None
-    except pd.errors.EmptyDataError:
-        logging.error(f"File is empty or invalid: {csv_file_path}")
-        return None
-
-    # Check that all required columns are present
-    required_columns = ['course_code', 'Faculty', 'lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']
-    if not all(col in df.columns for col in required_columns):
-        logging.error(f"Missing required columns in the CSV file. Required: {required_columns}")
-        return None
-
-    # Convert numeric columns
-    for col in ['lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    df = df.dropna(subset=['credits'])
-    df = df[(df['credits'] >= 1) & (df['credits'] <= 5)]
-
-    if df.empty:
-        logging.error("No valid data found after filtering.")
+    df = load_course_data(csv_file_path)
+    if df is None:
         return None
 
-    df['Subject'] = df['course_code']
-
     # Extract teachers and subjects
-    teachers = sorted(df['Faculty'].dropna().unique().tolist())
+    tables = build_lookup_tables(df)
+    teachers = tables['teachers']
+    if only_teachers is not None:
+        teachers = [teacher for teacher in teachers if teacher in only_teachers]
     
     # Create dictionaries for hours
-    subject_lecture_hours = dict(zip(df['Subject'], df['lecture_hours']))
-    subject_tutorial_hours = dict(zip(df['Subject'], df['tutorial_hours']))
-    subject_practical_hours = dict(zip(df['Subject'], df['practical_hours']))
-    subject_credits = dict(zip(df['Subject'], df['credits']))
+    subject_lecture_hours = tables['subject_lecture_hours']
+    subject_tutorial_hours = tables['subject_tutorial_hours']
+    subject_practical_hours = tables['subject_practical_hours']
+    subject_credits = tables['subject_credits']
     
-    teacher_subjects = {teacher: df[df['Faculty'] == teacher]['Subject'].unique().tolist()
-                        for teacher in teachers}
+    teacher_subjects = tables['teacher_subjects']
 
     days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'] 
     num_slots = 7
@@ -66,9 +71,7 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
     subject_weekly_slots = {}
     subject_consecutive_slots = {}  # To track which subjects need consecutive slots
 
-    for subj in df['Subject'].unique():
-        # Get the subject data
-        subj_data = df[df['Subject'] == subj].iloc[0]
+    for subj, subj_data in tables['subject_rows'].items():
         
         # Weekly slots for lectures
         lecture_slots = subj_data['lecture_hours']
@@ -98,6 +101,21 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
     # Create the model
     model = cp_model.CpModel()
 
+    # Enforcement literal of each (constraint family, teacher) pair; with relax_on_infeasible
+    # they are solver assumptions, so an infeasible solve reports which pairs conflict
+    enforced = {}
+    # With soft_constraints, one literal per rule instance of the optional families instead;
+    # the objective penalizes every one that is false
+    kept_rules = {}
+    def enforce(family, teacher, *where):
+        if soft_constraints and family in SOFT_PENALTIES:
+            kept_rules[(family, teacher, *where)] = model.NewBoolVar(
+                f'{teacher}_keep_{family}' + ''.join(f'_{w}' for w in where))
+            return kept_rules[(family, teacher, *where)]
+        if (family, teacher) not in enforced:
+            enforced[(family, teacher)] = model.NewBoolVar(f'{teacher}_enforce_{family}')
+        return enforced[(family, teacher)]
+
     # Define variables
     subject_assignments = {}
     for teacher in teachers:
@@ -118,10 +136,13 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
                         practical_sessions[(teacher, subj, d, s)] = model.NewBoolVar(
                             f'{teacher}_{subj}_practical_day{d}_slot{s}')
 
+    # One-hot day category per teacher-day: 0 = A, 1 = C, 2 = B
     teacher_day_category = {}
     for teacher in teachers:
         for d in range(len(days)):
-            teacher_day_category[(teacher, d)] = model.NewIntVar(0, 2, f'{teacher}_day{d}_category')
+            for cat in range(3):
+                teacher_day_category[(teacher, d, cat)] = model.NewBoolVar(f'{teacher}_day{d}_category{cat}')
+            model.AddExactlyOne(teacher_day_category[(teacher, d, cat)] for cat in range(3))
 
     # Teacher teaching in a slot (any subject)
     teacher_teaching = {}
@@ -130,16 +151,10 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
             for s in range(num_slots):
                 teacher_teaching[(teacher, d, s)] = model.NewBoolVar(f'{teacher}_teaching_day{d}_slot{s}')
                 
-                # Link to subject assignments
-                subject_taught = []
-                for subj in teacher_subjects[teacher]:
-                    subject_taught.append(subject_assignments[(teacher, subj, d, s)])
-                
-                if subject_taught:
-                    model.Add(sum(subject_taught) >= 1).OnlyEnforceIf(teacher_teaching[(teacher, d, s)])
-                    model.Add(sum(subject_taught) == 0).OnlyEnforceIf(teacher_teaching[(teacher, d, s)].Not())
-                else:
-                    model.Add(teacher_teaching[(teacher, d, s)] == 0)
+                # Link to subject assignments; as teacher_teaching is boolean this also
+                # allows at most one subject per slot
+                model.Add(teacher_teaching[(teacher, d, s)] ==
+                          sum(subject_assignments[(teacher, subj, d, s)] for subj in teacher_subjects[teacher]))
 
     # Add constraints
     
@@ -168,12 +183,7 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
                         model.Add(sum(practical_sessions[(teacher, subj, d, s)] 
                                     for d in range(len(days)) for s in range(num_slots-1)) == practical_hours // 2)
 
-    # 3. Ensure a teacher can only teach one subject per time slot
-    for teacher in teachers:
-        for d in range(len(days)):
-            for s in range(num_slots):
-                model.Add(sum(subject_assignments[(teacher, subj, d, s)]
-                              for subj in teacher_subjects[teacher]) <= 1)
+    # 3. A teacher can only teach one subject per time slot: enforced by the teacher_teaching link
 
     # 4. Max consecutive teaching slots constraint
     for teacher in teachers:
@@ -185,7 +195,8 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
                     consecutive_vars.append(teacher_teaching[(teacher, d, s)])
                 
                 # At least one of the MAX_CONSECUTIVE_SLOTS+1 consecutive slots must be free
-                model.Add(sum(consecutive_vars) <= MAX_CONSECUTIVE_SLOTS)
+                model.Add(sum(consecutive_vars) <= MAX_CONSECUTIVE_SLOTS).OnlyEnforceIf(
+                    enforce('consecutive', teacher))
 
     # 5. Calculate day categories for each teacher (A, B, C)
     for teacher in teachers:
@@ -194,122 +205,52 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
             for cat in range(3):  # Morning (A), Afternoon (C), Evening (B)
                 cat_slots = [s for s in range(num_slots) if slot_categories[s] == cat]
                 is_cat[cat] = model.NewBoolVar(f'{teacher}_day{d}_uses_cat{cat}')
+                model.AddMaxEquality(is_cat[cat], [teacher_teaching[(teacher, d, s)] for s in cat_slots])
 
-                category_usage = []
-                for s in cat_slots:
-                    for subj in teacher_subjects[teacher]:
-                        category_usage.append(subject_assignments[(teacher, subj, d, s)])
-
-                if category_usage:
-                    model.AddMaxEquality(is_cat[cat], category_usage)
-                else:
-                    model.Add(is_cat[cat] == 0)
-
-            model.Add(teacher_day_category[(teacher, d)] == 2).OnlyEnforceIf(is_cat[2])
-            model.Add(teacher_day_category[(teacher, d)] == 1).OnlyEnforceIf(is_cat[1], is_cat[2].Not())
-            model.Add(teacher_day_category[(teacher, d)] == 0).OnlyEnforceIf(is_cat[0], is_cat[1].Not(), is_cat[2].Not())
+            model.AddImplication(is_cat[2], teacher_day_category[(teacher, d, 2)])
+            model.AddBoolAnd(teacher_day_category[(teacher, d, 1)]).OnlyEnforceIf(is_cat[1], is_cat[2].Not())
+            model.AddBoolAnd(teacher_day_category[(teacher, d, 0)]).OnlyEnforceIf(
+                is_cat[0], is_cat[1].Not(), is_cat[2].Not())
 
-    # 6. Day continuity constraints
-    for teacher in teachers:
-        for d in range(len(days) - 1):
-            c_today = model.NewBoolVar(f'{teacher}_day{d}_is_C')
-            model.Add(teacher_day_category[(teacher, d)] == 2).OnlyEnforceIf(c_today)
-            model.Add(teacher_day_category[(teacher, d)] != 2).OnlyEnforceIf(c_today.Not())
-            model.Add(teacher_day_category[(teacher, d)] != 0).OnlyEnforceIf(c_today)
+    # 6. Day continuity: no C (12–7) day directly followed by an A (8–3) day, only as a soft rule
+    if soft_constraints:
+        for teacher in teachers:
+            for d in range(1, len(days)):
+                model.AddBoolOr([teacher_day_category[(teacher, d - 1, 1)].Not(),
+                                 teacher_day_category[(teacher, d, 0)].Not()]).OnlyEnforceIf(
+                    enforce('transition', teacher, d))
 
     # 7. Ensure teachers have a variety of slot types (RELAXED if relaxed_constraints is True)
-    if not relaxed_constraints:  # Only apply if we're not relaxing constraints
+    if soft_constraints or not relaxed_constraints:  # Only apply if we're not relaxing constraints
         for teacher in teachers:
+            if day_patterns == 'table' and not soft_constraints:
+                add_day_pattern_constraint(model, teacher_day_category, teacher, len(days)).OnlyEnforceIf(
+                    enforce('variety', teacher))
+                continue
             for slot_type in range(3):
-                slot_type_occurrences = []
-                for d in range(len(days)):
-                    uses_slot_type = model.NewBoolVar(f'{teacher}_day{d}_uses_type{slot_type}')
-                    model.Add(teacher_day_category[(teacher, d)] == slot_type).OnlyEnforceIf(uses_slot_type)
-                    model.Add(teacher_day_category[(teacher, d)] != slot_type).OnlyEnforceIf(uses_slot_type.Not())
-                    slot_type_occurrences.append(uses_slot_type)
-                
-                model.Add(sum(slot_type_occurrences) >= 1)  # At least one day of each type
-                model.Add(sum(slot_type_occurrences) <= 2)  # At most two days of each type
+                slot_type_occurrences = [teacher_day_category[(teacher, d, slot_type)] for d in range(len(days))]
+                # At least one and at most two days of each type
+                model.Add(sum(slot_type_occurrences) >= 1).OnlyEnforceIf(enforce('variety', teacher, slot_type, 'min'))
+                model.Add(sum(slot_type_occurrences) <= 2).OnlyEnforceIf(enforce('variety', teacher, slot_type, 'max'))
 
     # 8. Free slot constraints based on day type (RELAXED if relaxed_constraints is True)
-    if not relaxed_constraints:  # Only apply if we're not relaxing constraints
+    if soft_constraints or not relaxed_constraints:  # Only apply if we're not relaxing constraints
         for teacher in teachers:
             for d in range(len(days)):
-                # For slot type A (0): slot4 to slot6 should have one free slot
-                a_type_constraints = model.NewBoolVar(f'{teacher}_day{d}_A_type_constraints')
-                model.Add(teacher_day_category[(teacher, d)] == 0).OnlyEnforceIf(a_type_constraints)
-                model.Add(teacher_day_category[(teacher, d)] != 0).OnlyEnforceIf(a_type_constraints.Not())
+                # For slot type A (0): slots 3, 4, 5 (slot4 to slot6 in 1-indexed notation) need one free slot
+                type_a_slots = FREE_SLOT_WINDOWS[0]
+                model.Add(sum(teacher_teaching[(teacher, d, s)] for s in type_a_slots) <= len(type_a_slots) - 1).OnlyEnforceIf(
+                    teacher_day_category[(teacher, d, 0)], enforce('free_slot', teacher, d))
                 
-                # For type A, slots 3, 4, 5 (slot4, slot5, slot6 in 1-indexed notation)
-                # We need at least one of them to be free
-                type_a_slots = [3, 4, 5]
-                slot_occupied = []
-                for s in type_a_slots:
-                    is_occupied = model.NewBoolVar(f'{teacher}_day{d}_slot{s}_occupied')
-                    slot_assignments = []
-                    for subj in teacher_subjects[teacher]:
-                        slot_assignments.append(subject_assignments[(teacher, subj, d, s)])
-                    
-                    if slot_assignments:
-                        model.Add(sum(slot_assignments) >= 1).OnlyEnforceIf(is_occupied)
-                        model.Add(sum(slot_assignments) == 0).OnlyEnforceIf(is_occupied.Not())
-                    else:
-                        model.Add(is_occupied == 0)
-                    
-                    slot_occupied.append(is_occupied)
-                
-                # Ensure at least one slot is free
-                model.Add(sum(slot_occupied) <= len(type_a_slots) - 1).OnlyEnforceIf(a_type_constraints)
-                
-                # For slot type B (2): slot2 to slot4 should have one free slot
-                b_type_constraints = model.NewBoolVar(f'{teacher}_day{d}_B_type_constraints')
-                model.Add(teacher_day_category[(teacher, d)] == 2).OnlyEnforceIf(b_type_constraints)
-                model.Add(teacher_day_category[(teacher, d)] != 2).OnlyEnforceIf(b_type_constraints.Not())
-                
-                # For type B, slots 1, 2, 3 (slot2, slot3, slot4 in 1-indexed notation)
-                type_b_slots = [1, 2, 3]
-                slot_occupied = []
-                for s in type_b_slots:
-                    is_occupied = model.NewBoolVar(f'{teacher}_day{d}_slot{s}_occupied')
-                    slot_assignments = []
-                    for subj in teacher_subjects[teacher]:
-                        slot_assignments.append(subject_assignments[(teacher, subj, d, s)])
-                    
-                    if slot_assignments:
-                        model.Add(sum(slot_assignments) >= 1).OnlyEnforceIf(is_occupied)
-                        model.Add(sum(slot_assignments) == 0).OnlyEnforceIf(is_occupied.Not())
-                    else:
-                        model.Add(is_occupied == 0)
-                    
-                    slot_occupied.append(is_occupied)
-                
-                # Ensure at least one slot is free
-                model.Add(sum(slot_occupied) <= len(type_b_slots) - 1).OnlyEnforceIf(b_type_constraints)
-                
-                # For slot type C (1): slot1 to slot2 should have one free slot
-                c_type_constraints = model.NewBoolVar(f'{teacher}_day{d}_C_type_constraints')
-                model.Add(teacher_day_category[(teacher, d)] == 1).OnlyEnforceIf(c_type_constraints)
-                model.Add(teacher_day_category[(teacher, d)] != 1).OnlyEnforceIf(c_type_constraints.Not())
-                
-                # For type C, slots 0, 1 (slot1, slot2 in 1-indexed notation)
-                type_c_slots = [0, 1]
-                slot_occupied = []
-                for s in type_c_slots:
-                    is_occupied = model.NewBoolVar(f'{teacher}_day{d}_slot{s}_occupied')
-                    slot_assignments = []
-                    for subj in teacher_subjects[teacher]:
-                        slot_assignments.append(subject_assignments[(teacher, subj, d, s)])
-                    
-                    if slot_assignments:
-                        model.Add(sum(slot_assignments) >= 1).OnlyEnforceIf(is_occupied)
-                        model.Add(sum(slot_assignments) == 0).OnlyEnforceIf(is_occupied.Not())
-                    else:
-                        model.Add(is_occupied == 0)
-                    
-                    slot_occupied.append(is_occupied)
+                # For slot type B (2): slots 1, 2, 3 (slot2 to slot4 in 1-indexed notation) need one free slot
+                type_b_slots = FREE_SLOT_WINDOWS[2]
+                model.Add(sum(teacher_teaching[(teacher, d, s)] for s in type_b_slots) <= len(type_b_slots) - 1).OnlyEnforceIf(
+                    teacher_day_category[(teacher, d, 2)], enforce('free_slot', teacher, d))
                 
-                # Ensure at least one slot is free
-                model.Add(sum(slot_occupied) <= len(type_c_slots) - 1).OnlyEnforceIf(c_type_constraints)
+                # For slot type C (1): slots 0, 1 (slot1 to slot2 in 1-indexed notation) need one free slot
+                type_c_slots = FREE_SLOT_WINDOWS[1]
+                model.Add(sum(teacher_teaching[(teacher, d, s)] for s in type_c_slots) <= len(type_c_slots) - 1).OnlyEnforceIf(
+                    teacher_day_category[(teacher, d, 1)], enforce('free_slot', teacher, d))
 
     # 9. Open elective constraints
     def add_open_elective_constraints(model, subject_assignments, teachers, days, num_slots):
@@ -331,56 +272,72 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
     # 10. Maximum hours per day constraint
     for teacher in teachers:
         for d in range(len(days)):
-            day_slots = []
-            for s in range(num_slots):
-                for subj in teacher_subjects[teacher]:
-                    day_slots.append(subject_assignments[(teacher, subj, d, s)])
-            model.Add(sum(day_slots) <= MAX_HOURS_PER_DAY)
+            day_slots = [teacher_teaching[(teacher, d, s)] for s in range(num_slots)]
+            model.Add(sum(day_slots) <= MAX_HOURS_PER_DAY).OnlyEnforceIf(enforce('max_hours', teacher))
 
     # 11. Mon-Fri or Tue-Sat batch constraint (RELAXED if relaxed_constraints is True)
-    if not relaxed_constraints:  # Only apply if we're not relaxing constraints
+    if soft_constraints or not relaxed_constraints:  # Only apply if we're not relaxing constraints
         for teacher in teachers:
             # Each teacher is either in Mon-Fri batch or Tue-Sat batch
             mon_to_fri = model.NewBoolVar(f'{teacher}_mon_to_fri')
+            split = enforce('mon_fri', teacher)
             
             for d in range(len(days)):
-                day_slots = []
-                for s in range(num_slots):
-                    for subj in teacher_subjects[teacher]:
-                        day_slots.append(subject_assignments[(teacher, subj, d, s)])
+                day_slots = [teacher_teaching[(teacher, d, s)] for s in range(num_slots)]
                 
                 # If Mon-Fri batch, no teaching on Saturday (d=5)
                 if d == 5:  # Saturday
-                    model.Add(sum(day_slots) == 0).OnlyEnforceIf(mon_to_fri)
+                    model.Add(sum(day_slots) == 0).OnlyEnforceIf(mon_to_fri, split)
                 
                 # If Tue-Sat batch, no teaching on Monday (d=0)
                 elif d == 0:  # Monday
-                    model.Add(sum(day_slots) == 0).OnlyEnforceIf(mon_to_fri.Not())
+                    model.Add(sum(day_slots) == 0).OnlyEnforceIf(mon_to_fri.Not(), split)
 
     # Add open elective constraints
     add_open_elective_constraints(model, subject_assignments, teachers, days, num_slots)
 
-    # Solve the model
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = 300  # Set a time limit of 5 minutes
-    status = solver.Solve(model)
+    if soft_constraints:
+        model.Minimize(sum(SOFT_PENALTIES[key[0]] * literal.Not() for key, literal in kept_rules.items()))
 
-    # Process the results
-    timetables = {}
-    if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+    def find_violations(value, teacher):
+        """Optional rules the timetable of a teacher breaks, as {day index: [descriptions]}"""
+        violations = {d: [] for d in range(len(days))}
+        teaching = [[value(teacher_teaching[(teacher, d, s)]) for s in range(num_slots)] for d in range(len(days))]
+        category = [next(cat for cat in range(3) if value(teacher_day_category[(teacher, d, cat)]))
+                    for d in range(len(days))]
+        for d in range(len(days)):
+            window = FREE_SLOT_WINDOWS[category[d]]
+            if all(teaching[d][s] for s in window):
+                violations[d].append(f"no free slot in Slot {window[0] + 1}-{window[-1] + 1}")
+            if d > 0 and category[d - 1] == 1 and category[d] == 0:
+                violations[d].append("A day after a C day")
+        for cat in range(3):
+            cat_days = [d for d in range(len(days)) if category[d] == cat]
+            if not cat_days:
+                violations[0].append(f"no {CATEGORY_NAMES[cat]} day")
+            elif len(cat_days) > 2:
+                violations[cat_days[2]].append(f"{len(cat_days)} {CATEGORY_NAMES[cat]} days")
+        if any(teaching[0]) and any(teaching[5]):
+            violations[0].append("teaches Mon and Sat")
+            violations[5].append("teaches Mon and Sat")
+        return violations
+
+    def extract_timetables(value):
+        timetables = {}
         for teacher in teachers:
             timetable = []
+            violations = find_violations(value, teacher) if soft_constraints else None
             for d in range(len(days)):
                 row = [teacher, days[d]]
                 
                 for s in range(num_slots):
                     cell_value = ""
                     for subj in teacher_subjects[teacher]:
-                        if solver.Value(subject_assignments[(teacher, subj, d, s)]):
+                        if value(subject_assignments[(teacher, subj, d, s)]):
                             # Check if this is part of a practical session
                             is_practical = False
                             if subject_consecutive_slots.get(subj, False) and s > 0:
-                                if solver.Value(subject_assignments[(teacher, subj, d, s-1)]):
+                                if value(subject_assignments[(teacher, subj, d, s-1)]):
                                     is_practical = True
                             
                             # Add a marker for practical sessions
@@ -389,7 +346,7 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
                             else:
                                 # Check if this is the start of a practical session
                                 if subject_consecutive_slots.get(subj, False) and s < num_slots-1:
-                                    if solver.Value(subject_assignments[(teacher, subj, d, s+1)]):
+                                    if value(subject_assignments[(teacher, subj, d, s+1)]):
                                         cell_value = f"{subj} (Practical)"
                                     else:
                                         cell_value = subj
@@ -398,15 +355,75 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
                             break
                     row.append(cell_value)
                 
-                day_cat = solver.Value(teacher_day_category[(teacher, d)])
-                category_names = {0: "A (8–3)", 2: "B (10–5)", 1: "C (12–7)"}
-                row.append(category_names[day_cat])
+                day_cat = next(cat for cat in range(3) if value(teacher_day_category[(teacher, d, cat)]))
+                row.append(CATEGORY_NAMES[day_cat])
+                if soft_constraints:
+                    row.append("; ".join(violations[d]))
                 
                 timetable.append(row)
                 
             columns = ["Teacher", "Day"] + [f"Slot {s+1}" for s in range(num_slots)] + ["SlotType"]
+            if soft_constraints:
+                columns.append("Violations")
             timetables[teacher] = pd.DataFrame(timetable, columns=columns)
+        return timetables
+
+    # Solve the model
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = 300  # Set a time limit of 5 minutes
+    apply_solver_config(solver, solver_config)
+
+    if not relax_on_infeasible:
+        for literal in enforced.values():
+            model.Add(literal == 1)
+    assumed = dict(enforced)
+    relaxed = []
+    # The solve and every re-solve after relaxing share the run's time limit
+    time_limit = solver.parameters.max_time_in_seconds
+    deadline = time.perf_counter() + time_limit
+    status = cp_model.UNKNOWN
+
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            logging.warning(f"Time limit of {time_limit:.0f}s spent, stopping after relaxing {len(relaxed)} constraints")
+            break
+        solver.parameters.max_time_in_seconds = remaining
+        if relax_on_infeasible:
+            model.ClearAssumptions()
+            model.AddAssumptions(list(assumed.values()))
+        if on_solution is not None:
+            # Hand each improving solution to on_solution while the search continues
+            callback = TimetableSolutionCallback(extract_timetables, on_solution)
+            with stop_on_signals(callback):
+                status = solver.Solve(model, callback)
+        else:
+            status = solver.Solve(model)
+        record_solve(solver_config, solver, status, 'timetable_manager', len(teachers))
+        if status != cp_model.INFEASIBLE or not relax_on_infeasible:
+            break
+
+        # Switch off every pair the solver needed to prove infeasibility; a core without
+        # any pair means no relaxation can help
+        core = set(solver.SufficientAssumptionsForInfeasibility())
+        conflict = [pair for pair, literal in assumed.items() if literal.Index() in core]
+        if not conflict:
+            break
+        for pair in conflict:
+            del assumed[pair]
+        relaxed.extend(conflict)
+        logging.warning(f"Infeasible, relaxing {len(conflict)} constraints: "
+                        f"{', '.join(f'{family} for {teacher}' for family, teacher in conflict)}")
+
+    if relaxed and status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        relaxed, solver = restore_relaxed(model, solver, assumed, enforced, relaxed, solver_config,
+                                          time_budget=time_limit)
+        logging.warning(f"Relaxed {len(relaxed)} of {len(enforced)} teacher constraints: "
+                        f"{', '.join(f'{family} for {teacher}' for family, teacher in relaxed)}")
 
+    # Process the results
+    if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        timetables = extract_timetables(solver.Value)
         logging.info("✅ Timetable successfully created")
         return timetables
     else:
@@ -420,6 +437,199 @@ def create_timetable(csv_file_path, relaxed_constraints=False):
             logging.error(f"❌ Solver failed with status: {solver.StatusName(status)}")
             return None
 
+def restore_relaxed(model, solver, assumed, enforced, relaxed, solver_config=None, time_budget=300):
+    """
+    Enforce relaxed (family, teacher) pairs again one at a time, most important family first.
+
+    An infeasibility core is rarely minimal, so a timetable can often be found with some
+    of its pairs enforced. Each check is hinted with the last timetable found and gets the
+    part of time_budget the earlier checks left; a pair stays relaxed unless a timetable is
+    found with it, and once the budget is spent the remaining pairs stay relaxed unchecked.
+
+    Args:
+        model: Model with one assumption literal per enforced pair
+        solver: Solver holding the timetable found with the pairs relaxed
+        assumed: {(family, teacher): literal} currently enforced, updated in place
+        enforced: {(family, teacher): literal} of every pair
+        relaxed: Relaxed (family, teacher) pairs
+        solver_config: CP-SAT settings of the run
+        time_budget: Seconds all checks together may take, normally the run's time limit
+
+    Returns:
+        (pairs that stay relaxed, solver holding the last timetable found)
+    """
+    still_relaxed = []
+    deadline = time.perf_counter() + time_budget
+    pairs = sorted(relaxed, key=lambda pair: -RELAXABLE_FAMILIES.index(pair[0]))
+    for position, pair in enumerate(pairs):
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            still_relaxed.extend(pairs[position:])
+            logging.warning(f"Restore time budget of {time_budget:.0f}s spent, "
+                            f"leaving {len(pairs) - position} constraints relaxed without a check")
+            break
+        model.ClearHints()
+        for index, value in enumerate(solver.ResponseProto().solution):
+            model.AddHint(model.GetIntVarFromProtoIndex(index), value)
+        model.ClearAssumptions()
+        model.AddAssumptions(list(assumed.values()) + [enforced[pair]])
+
+        check = cp_model.CpSolver()
+        apply_solver_config(check, solver_config)
+        check.parameters.max_time_in_seconds = remaining
+        if check.Solve(model) in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+            assumed[pair] = enforced[pair]
+            solver = check
+            logging.info(f"Restored {pair[0]} for {pair[1]}")
+        else:
+            still_relaxed.append(pair)
+    return still_relaxed, solver
+
+def violation_report(timetables):
+    """
+    Per-teacher summary of the rules broken in timetables made with soft_constraints.
+
+    Returns:
+        DataFrame with 'Teacher', 'Violations' (count) and 'Details' for each teacher
+        that breaks at least one rule, most violations first
+    """
+    rows = []
+    for teacher, timetable in timetables.items():
+        if 'Violations' not in timetable.columns:
+            continue
+        details = [f"{day}: {text}" for day, cell in zip(timetable['Day'], timetable['Violations'])
+                   if isinstance(cell, str) and cell for text in cell.split('; ')]
+        if details:
+            rows.append({'Teacher': teacher, 'Violations': len(details), 'Details': '; '.join(details)})
+    report = pd.DataFrame(rows, columns=['Teacher', 'Violations', 'Details'])
+    return report.sort_values('Violations', ascending=False, kind='stable').reset_index(drop=True)
+
+def diff_course_mappings(old_df, new_df):
+    """
+    Compare two course mappings (as returned by load_course_data) row by row.
+
+    Returns:
+        Dict with 'added_teachers', 'removed_teachers', 'moved_subjects' as
+        (subject, from teachers, to teachers), 'changed_hours' as (teacher, subject) pairs,
+        'changed_subjects' whose shared hours changed, and 'affected_teachers' in the new
+        mapping whose model inputs differ
+    """
+    old_tables = build_lookup_tables(old_df)
+    new_tables = build_lookup_tables(new_df)
+    old_pairs = old_tables['teacher_subject_hours']
+    new_pairs = new_tables['teacher_subject_hours']
+
+    added_teachers = sorted(set(new_tables['teachers']) - set(old_tables['teachers']))
+    removed_teachers = sorted(set(old_tables['teachers']) - set(new_tables['teachers']))
+    added_pairs = set(new_pairs) - set(old_pairs)
+    removed_pairs = set(old_pairs) - set(new_pairs)
+    changed_hours = sorted(pair for pair in set(new_pairs) & set(old_pairs) if new_pairs[pair] != old_pairs[pair])
+
+    moved_subjects = []
+    for subj in sorted({subj for _, subj in added_pairs} & {subj for _, subj in removed_pairs}):
+        moved_subjects.append((subj,
+                               sorted(teacher for teacher, pair_subj in removed_pairs if pair_subj == subj),
+                               sorted(teacher for teacher, pair_subj in added_pairs if pair_subj == subj)))
+
+    # Weekly slots come from the first row of each subject and practical sessions from the last,
+    # so a change there affects every teacher of the subject
+    def subject_signature(tables, subj):
+        row = tables['subject_rows'][subj]
+        return (row['lecture_hours'], row['tutorial_hours'], row['practical_hours'],
+                tables['subject_practical_hours'][subj])
+
+    changed_subjects = sorted(subj for subj in set(new_tables['subject_rows']) & set(old_tables['subject_rows'])
+                              if subject_signature(new_tables, subj) != subject_signature(old_tables, subj))
+
+    affected = set(added_teachers)
+    affected.update(teacher for teacher, _ in added_pairs | removed_pairs)
+    affected.update(teacher for teacher, _ in changed_hours)
+    for subj in changed_subjects:
+        affected.update(new_tables['qualified_teachers'][subj])
+
+    return {
+        'added_teachers': added_teachers,
+        'removed_teachers': removed_teachers,
+        'moved_subjects': moved_subjects,
+        'changed_hours': changed_hours,
+        'changed_subjects': changed_subjects,
+        'affected_teachers': sorted(affected & set(new_tables['teachers']))
+    }
+
+def load_previous_timetables(csv_file_path):
+    """Read a timetable written by export_timetable_to_csv back into {teacher: DataFrame}"""
+    try:
+        df = pd.read_csv(csv_file_path, dtype=str, keep_default_na=False)
+    except FileNotFoundError:
+        logging.error(f"Previous timetable not found: {csv_file_path}")
+        return None
+    except pd.errors.EmptyDataError:
+        logging.error(f"Previous timetable is empty or invalid: {csv_file_path}")
+        return None
+
+    return {teacher: rows.reset_index(drop=True) for teacher, rows in df.groupby('Teacher', sort=False)}
+
+def create_timetable_incremental(old_csv_file_path, new_csv_file_path, previous_timetable_path,
+                                 relaxed_constraints=False, solver_config=None, on_solution=None,
+                                 relax_on_infeasible=False, soft_constraints=False, day_patterns='counts'):
+    """
+    Re-solve only the teachers affected by the changes between two course mappings.
+
+    Only the teachers whose model inputs changed are rebuilt and solved. No constraint of
+    this model spans more than one teacher (open electives only add indicator variables),
+    so every other teacher keeps their timetable from previous_timetable_path unchanged.
+
+    Args:
+        old_csv_file_path: Course mapping the previous timetable was generated from
+        new_csv_file_path: Updated course mapping
+        previous_timetable_path: CSV written by export_timetable_to_csv for the old mapping
+        relaxed_constraints: If True, relax some constraints to find a feasible solution
+        solver_config: CP-SAT settings from solver_config.load_solver_config
+        on_solution: If given, called with the full timetables, kept teachers included, of every
+            improving solution of the re-solved teachers
+        relax_on_infeasible: Relax conflicting constraints of the re-solved teachers, see create_timetable
+        soft_constraints: Penalize the optional rules of the re-solved teachers, see create_timetable
+        day_patterns: 'counts' or 'table', see create_timetable
+    """
+    old_df = load_course_data(old_csv_file_path)
+    new_df = load_course_data(new_csv_file_path)
+    previous = load_previous_timetables(previous_timetable_path)
+    if old_df is None or new_df is None or previous is None:
+        return None
+
+    diff = diff_course_mappings(old_df, new_df)
+    logging.info(f"Course mapping diff: {len(diff['added_teachers'])} teachers added, "
+                 f"{len(diff['removed_teachers'])} removed, {len(diff['moved_subjects'])} subjects moved, "
+                 f"{len(diff['changed_hours'])} teacher-subject hours changed, "
+                 f"{len(diff['changed_subjects'])} subjects with changed hours")
+
+    teachers = build_lookup_tables(new_df)['teachers']
+    resolve = set(diff['affected_teachers'])
+    # Teachers missing from the previous timetable have nothing to keep
+    resolve.update(teacher for teacher in teachers if teacher not in previous)
+
+    logging.info(f"Re-solving {len(resolve)} of {len(teachers)} teachers")
+
+    def merge_previous(timetables):
+        timetables = dict(timetables)
+        for teacher in teachers:
+            if teacher not in resolve:
+                timetables[teacher] = previous[teacher]
+        return {teacher: timetables[teacher] for teacher in teachers}
+
+    timetables = {}
+    if resolve:
+        stream = None
+        if on_solution is not None:
+            stream = lambda partial: on_solution(merge_previous(partial))
+        timetables = create_timetable(new_csv_file_path, relaxed_constraints=relaxed_constraints,
+                                      only_teachers=resolve, solver_config=solver_config, on_solution=stream,
+                                      relax_on_infeasible=relax_on_infeasible, soft_constraints=soft_constraints,
+                                      day_patterns=day_patterns)
+        if timetables is None:
+            return None
+
+    return merge_previous(timetables)
 
 def export_timetable_to_csv(timetables, output_file="teacher_timetables.csv"):
     if timetables is None:
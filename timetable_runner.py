@@ -1,6 +1,10 @@
 import argparse
 import logging
 from timetable_core import create_timetable, export_timetable_to_csv, export_timetable_to_excel
+from solver_config import add_solver_arguments, solver_config_from_args
+from solution_stream import solution_writer
+from prescreen import apply_prescreen
+from build_profiler import DEFAULT_PROFILE_FILE
 
 def main():
     parser = argparse.ArgumentParser(description='Create a timetable based on a CSV file')
@@ -9,16 +13,61 @@ def main():
                         help='Output file path (default: teacher_timetables.xlsx)')
     parser.add_argument('--format', '-f', choices=['csv', 'excel'], default='excel',
                         help='Output format: csv or excel (default: excel)')
+    parser.add_argument('--strategy', '-s', choices=['single', 'decomposed', 'auto', 'hierarchical'], default='single',
+                        help='Solve one model, independent groups of teachers in parallel, pick '
+                             'automatically from the coupling components, or plan the week first and '
+                             'pack each teacher-day on its own (default: single)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Number of worker processes for decomposed mode (default: all cores)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Reuse timetables of teachers whose inputs are unchanged, stored in this directory')
+    parser.add_argument('--hint-from', default=None,
+                        help='Previously exported timetable CSV to warm-start the solver from')
+    parser.add_argument('--partial-hints', action='store_true',
+                        help='Only hint the assignments present in the previous timetable')
+    parser.add_argument('--repair-hint', action='store_true',
+                        help='Let the solver repair hints that no longer satisfy the constraints')
+    parser.add_argument('--encoding', choices=['boolean', 'interval'], default='boolean',
+                        help='Model sessions with per-slot booleans or as optional intervals with one '
+                             'NoOverlap per teacher (default: boolean)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write every improving solution to the output file as soon as it is found; '
+                             'Ctrl+C or SIGTERM then stops the search and keeps the best timetable so far')
+    parser.add_argument('--prescreen', action='store_true',
+                        help='Check every teacher and subject against the weekly capacity before building the model '
+                             'and stop if any cannot be scheduled')
+    parser.add_argument('--quarantine', default=None,
+                        help='Pre-screen, move the rows of teachers and subjects that cannot be scheduled to this CSV '
+                             'and solve the rest')
+    parser.add_argument('--profile-build', nargs='?', const=DEFAULT_PROFILE_FILE, default=None, metavar='FILE',
+                        help='Log the time, variables, constraints and literals of each constraint family and '
+                             f'the search time, and append them to FILE (default: {DEFAULT_PROFILE_FILE})')
+    parser.add_argument('--day-patterns', choices=['counts', 'table'], default='counts',
+                        help='Bound the days of each day category with linear counts, or allow only the '
+                             'precomputed valid weekly patterns with one table constraint per teacher (default: counts)')
+    add_solver_arguments(parser)
     
     args = parser.parse_args()
+    export = export_timetable_to_csv if args.format == 'csv' else export_timetable_to_excel
+
+    csv_file = args.csv_file
+    if args.prescreen or args.quarantine:
+        engine = 'timetable_core_interval' if args.encoding == 'interval' else 'timetable_core'
+        csv_file = apply_prescreen(csv_file, engine, args.quarantine)
+        if csv_file is None:
+            logging.error("Failed to create timetable.")
+            return 1
     
-    timetables = create_timetable(args.csv_file)
+    timetables = create_timetable(csv_file, strategy=args.strategy, max_workers=args.workers,
+                                  cache_dir=args.cache_dir, hint_file=args.hint_from,
+                                  partial_hints=args.partial_hints, repair_hint=args.repair_hint,
+                                  solver_config=solver_config_from_args(args),
+                                  on_solution=solution_writer(args.output, export) if args.stream else None,
+                                  encoding=args.encoding, profile_build=args.profile_build,
+                                  day_patterns=args.day_patterns)
     
     if timetables:
-        if args.format == 'csv':
-            export_timetable_to_csv(timetables, args.output)
-        else:
-            export_timetable_to_excel(timetables, args.output)
+        export(timetables, args.output)
         
         logging.info(f"Timetable creation complete! Output saved to {args.output}")
     else:
@@ -1,6 +1,7 @@
 import pandas as pd
 from ortools.sat.python import cp_model
 import logging
+from preprocessing import load_course_data, build_lookup_tables
 
 MAX_HOURS_PER_DAY = 5
 MAX_CONSECUTIVE_SLOTS = 2  # New constraint: maximum consecutive teaching slots
@@ -10,47 +11,21 @@ SURVEY_LAB_CODE = 'CE23331'
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 def create_timetable(csv_file_path):
-    try:
-        df = pd.read_csv(csv_file_path)
-        
-    except FileNotFoundError:
-        logging.error(f"File not found: {csv_file_path}")
-        return None
-    except pd.errors.EmptyDataError:
-        logging.error(f"File is empty or invalid: {csv_file_path}")
-        return None
-
-
-    required_columns = ['course_code', 'Faculty', 'lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']
-    if not all(col in df.columns for col in required_columns):
-        logging.error(f"Missing required columns in the CSV file. Required: {required_columns}")
+    df = load_course_data(csv_file_path)
+    if df is None:
         return None
 
 
-    # Convert numeric columns
-    for col in ['lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    df = df.dropna(subset=['credits'])
-    df = df[(df['credits'] >= 1) & (df['credits'] <= 5)]
-
-    if df.empty:
-        logging.error("No valid data found after filtering.")
-        return None
-
-    df['Subject'] = df['course_code']
-
-
-    teachers = sorted(df['Faculty'].dropna().unique().tolist())
+    tables = build_lookup_tables(df)
+    teachers = tables['teachers']
     
     # Create dictionaries for hours
-    subject_lecture_hours = dict(zip(df['Subject'], df['lecture_hours']))
-    subject_tutorial_hours = dict(zip(df['Subject'], df['tutorial_hours']))
-    subject_practical_hours = dict(zip(df['Subject'], df['practical_hours']))
-    subject_credits = dict(zip(df['Subject'], df['credits']))
+    subject_lecture_hours = tables['subject_lecture_hours']
+    subject_tutorial_hours = tables['subject_tutorial_hours']
+    subject_practical_hours = tables['subject_practical_hours']
+    subject_credits = tables['subject_credits']
     
-    teacher_subjects = {teacher: df[df['Faculty'] == teacher]['Subject'].unique().tolist()
-                        for teacher in teachers}
+    teacher_subjects = tables['teacher_subjects']
 
     days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'] 
     num_slots = 7
@@ -62,9 +37,7 @@ def create_timetable(csv_file_path):
     subject_consecutive_slots = {}  # To track which subjects need consecutive slots
 
 
-    for subj in df['Subject'].unique():
-        # Get the subject data
-        subj_data = df[df['Subject'] == subj].iloc[0]
+    for subj, subj_data in tables['subject_rows'].items():
         
         # Weekly slots for lectures
         lecture_slots = subj_data['lecture_hours']
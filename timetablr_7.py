@@ -1,6 +1,7 @@
 import pandas as pd
 from ortools.sat.python import cp_model
 import logging
+from preprocessing import load_course_data, build_lookup_tables, split_practical_courses
 
 MAX_HOURS_PER_DAY = 5
 MAX_CONSECUTIVE_SLOTS = 2  # New constraint: maximum consecutive teaching slots
@@ -10,47 +11,21 @@ SURVEY_LAB_CODE = 'CE23331'
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 def create_timetable(csv_file_path):
-    try:
-        df = pd.read_csv(csv_file_path)
-        
-    except FileNotFoundError:
-        logging.error(f"File not found: {csv_file_path}")
-        return None
-    except pd.errors.EmptyDataError:
-        logging.error(f"File is empty or invalid: {csv_file_path}")
-        return None
-
-
-    required_columns = ['course_code', 'Faculty', 'lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']
-    if not all(col in df.columns for col in required_columns):
-        logging.error(f"Missing required columns in the CSV file. Required: {required_columns}")
-        return None
-
-
-    # Convert numeric columns
-    for col in ['lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    df = df.dropna(subset=['credits'])
-    df = df[(df['credits'] >= 1) & (df['credits'] <= 5)]
-
-    if df.empty:
-        logging.error("No valid data found after filtering.")
+    df = load_course_data(csv_file_path)
+    if df is None:
         return None
 
-    df['Subject'] = df['course_code']
-
 
-    teachers = sorted(df['Faculty'].dropna().unique().tolist())
+    tables = build_lookup_tables(df)
+    teachers = tables['teachers']
     
     # Create dictionaries for hours
-    subject_lecture_hours = dict(zip(df['Subject'], df['lecture_hours']))
-    subject_tutorial_hours = dict(zip(df['Subject'], df['tutorial_hours']))
-    subject_practical_hours = dict(zip(df['Subject'], df['practical_hours']))
-    subject_credits = dict(zip(df['Subject'], df['credits']))
+    subject_lecture_hours = tables['subject_lecture_hours']
+    subject_tutorial_hours = tables['subject_tutorial_hours']
+    subject_practical_hours = tables['subject_practical_hours']
+    subject_credits = tables['subject_credits']
     
-    teacher_subjects = {teacher: df[df['Faculty'] == teacher]['Subject'].unique().tolist()
-                        for teacher in teachers}
+    teacher_subjects = tables['teacher_subjects']
 
     days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'] 
     num_slots = 7
@@ -62,9 +37,7 @@ def create_timetable(csv_file_path):
     subject_consecutive_slots = {}  # To track which subjects need consecutive slots
 
 
-    for subj in df['Subject'].unique():
-        # Get the subject data
-        subj_data = df[df['Subject'] == subj].iloc[0]
+    for subj, subj_data in tables['subject_rows'].items():
         
         # Weekly slots for lectures
         lecture_slots = subj_data['lecture_hours']
@@ -366,18 +339,11 @@ def create_timetable(csv_file_path):
     
     if handle_practical_batches:
         # Define practical courses that need to be split into two batches
-        practical_courses_with_60_students = []
-        for course_code in df['course_code'].unique():
-            course_data = df[df['course_code'] == course_code]
-            # Check if this is a practical course with 60 students
-            if (course_data['practical_hours'].iloc[0] > 0 and 
-                course_data['registration'].iloc[0] == 60):
-                practical_courses_with_60_students.append(course_code)
+        practical_courses_with_60_students = split_practical_courses(tables['subject_rows'])
 
         # Find qualified teachers for each course
-        qualified_teachers = {}
-        for course in practical_courses_with_60_students:
-            qualified_teachers[course] = df[df['course_code'] == course]['Faculty'].unique().tolist()
+        qualified_teachers = {course: tables['qualified_teachers'][course]
+                              for course in practical_courses_with_60_students}
 
         # For each practical course with 60 students
         for course in practical_courses_with_60_students:
@@ -412,13 +378,15 @@ def create_timetable(csv_file_path):
                 
                 # 4. Constraint: Different teachers for each batch
                 for teacher in qualified_teachers[course]:
-                    # A teacher cannot be assigned to both batches
-                    for d1 in range(len(days)):
-                        for s1 in range(num_slots):
-                            for d2 in range(len(days)):
-                                for s2 in range(num_slots):
-                                    model.Add(batch1_assignments[(teacher, d1, s1)] + 
-                                            batch2_assignments[(teacher, d2, s2)] <= 1)
+                    # A teacher cannot be assigned to both batches; each batch is assigned
+                    # exactly once, so these indicators are plain sums
+                    teaches_batch1 = model.NewBoolVar(f'batch1_{course}_{teacher}')
+                    teaches_batch2 = model.NewBoolVar(f'batch2_{course}_{teacher}')
+                    model.Add(teaches_batch1 == sum(batch1_assignments[(teacher, d, s)]
+                                                    for d in range(len(days)) for s in range(num_slots)))
+                    model.Add(teaches_batch2 == sum(batch2_assignments[(teacher, d, s)]
+                                                    for d in range(len(days)) for s in range(num_slots)))
+                    model.AddAtMostOne(teaches_batch1, teaches_batch2)
                 
                 # 5. Constraint: Different time slots for each batch
                 for d in range(len(days)):
@@ -436,7 +404,7 @@ def create_timetable(csv_file_path):
                 
                 # 6. For practical sessions that need consecutive slots (if applicable):
                 # If these are 2-hour lab sessions (which is common), ensure consecutive slots
-                practical_hours = int(df[df['course_code'] == course]['practical_hours'].iloc[0])
+                practical_hours = int(tables['subject_rows'][course]['practical_hours'])
                 if practical_hours >= 2:
                     # Each batch should have consecutive slots (if practical requires multiple hours)
                     consecutive_slots = 2  # Assuming 2-hour practical sessions
@@ -1,6 +1,7 @@
 import pandas as pd
 from ortools.sat.python import cp_model
 import logging
+from preprocessing import load_course_data, build_lookup_tables
 
 MAX_HOURS_PER_DAY = 5
 MAX_CONSECUTIVE_SLOTS = 2  # New constraint: maximum consecutive teaching slots
@@ -10,47 +11,12 @@ MORNING_SLOTS = [0, 1, 2]
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 def create_timetable(csv_file_path):
-    try:
-        df = pd.read_csv(csv_file_path)
-        
-    except FileNotFoundError:
-        logging.error(f"File not found: {csv_file_path}")
-        return None
-    except pd.errors.EmptyDataError:
-        logging.error(f"File is empty or invalid: {csv_file_path}")
+    df = load_course_data(csv_file_path)
+    if df is None:
         return None
 
-
-    required_columns = ['course_code', 'Faculty', 'lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']
-    if not all(col in df.columns for col in required_columns):
-        logging.error(f"Missing required columns in the CSV file. Required: {required_columns}")
-        return None
-
-
-    # Convert numeric columns
-    for col in ['lecture_hours', 'tutorial_hours', 'practical_hours', 'credits']:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    df = df.dropna(subset=['credits'])
-    df = df[(df['credits'] >= 1) & (df['credits'] <= 5)]
-
-    if df.empty:
-        logging.error("No valid data found after filtering.")
-        return None
-
-    df['Subject'] = df['course_code']
-
-
-    teachers = sorted(df['Faculty'].dropna().unique().tolist())
-    
-    # Create dictionaries for hours
-    # Group the data by teacher and subject to get a unique entry for each combination
-    teacher_subject_data = df.groupby(['Faculty', 'Subject']).agg({
-        'lecture_hours': 'first',
-        'tutorial_hours': 'first',
-        'practical_hours': 'first',
-        'credits': 'first'
-    }).reset_index()
+    tables = build_lookup_tables(df)
+    teachers = tables['teachers']
     
     # Create dictionaries with proper teacher-subject pairs
     subject_lecture_hours = {}
@@ -59,20 +25,17 @@ def create_timetable(csv_file_path):
     subject_credits = {}
     teacher_subjects = {teacher: [] for teacher in teachers}
     
-    # Fill the dictionaries
-    for _, row in teacher_subject_data.iterrows():
-        teacher = row['Faculty']
-        subject = row['Subject']
-        key = (teacher, subject)  # Use a tuple of (teacher, subject) as the key
+    # Fill the dictionaries from the first entry of each teacher-subject combination
+    for key, hours in tables['teacher_subject_hours'].items():
+        teacher, subject = key  # Use a tuple of (teacher, subject) as the key
         
-        subject_lecture_hours[key] = int(row['lecture_hours'])
-        subject_tutorial_hours[key] = int(row['tutorial_hours'])
-        subject_practical_hours[key] = int(row['practical_hours'])
-        subject_credits[key] = int(row['credits'])
+        subject_lecture_hours[key] = int(hours['lecture_hours'])
+        subject_tutorial_hours[key] = int(hours['tutorial_hours'])
+        subject_practical_hours[key] = int(hours['practical_hours'])
+        subject_credits[key] = int(hours['credits'])
         
         # Add subject to the teacher's list
-        if subject not in teacher_subjects[teacher]:
-            teacher_subjects[teacher].append(subject)
+        teacher_subjects[teacher].append(subject)
 
     days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'] 
     num_slots = 7
@@ -171,5 +171,6 @@ def genetic_algorithm(csv_file_path):
 
 
 # Example Usage
-csv_file_path = 'course_schedule.csv'  # Path to your CSV file
-best_timetable = genetic_algorithm(csv_file_path)
+if __name__ == "__main__":
+    csv_file_path = 'course_schedule.csv'  # Path to your CSV file
+    best_timetable = genetic_algorithm(csv_file_path)
@@ -1,6 +1,9 @@
 import pandas as pd
 from ortools.sat.python import cp_model
 import logging
+from time_grid import build_time_grid, overlap_cliques
+from build_profiler import BuildProfiler
+from solver_config import apply_solver_config, record_solve
 
 MAX_HOURS_PER_DAY = 5
 MAX_CONSECUTIVE_SLOTS = 2  # Maximum consecutive teaching slots
@@ -49,7 +52,17 @@ SLOT_TYPE_MAP = {
 DISPLAY_THEORY_SLOTS = ['T1', 'T2', 'T3', 'T4', 'T5/T6', 'T7', 'T8', 'T9', 'T10', 'T11', 'T12']
 DISPLAY_LAB_SLOTS = ['L1', 'L2', 'L3', 'L4', 'L5', 'L6']
 
-def create_timetable(csv_file_path):
+def create_timetable(csv_file_path, profile_build=None, solver_config=None):
+    """
+    Create theory and lab timetables for every teacher from course data.
+
+    Args:
+        csv_file_path: Path to the CSV file with course data
+        profile_build: JSON-lines file to append a per-constraint-family build profile of
+            the model to, see build_profiler.BuildProfiler
+        solver_config: Solver settings from solver_config.load_solver_config; the solve is
+            recorded in its run log
+    """
     try:
         df = pd.read_csv(csv_file_path)
         
@@ -115,6 +128,9 @@ def create_timetable(csv_file_path):
     # Use the slot names as defined in the image
     theory_slot_names = list(THEORY_SLOTS.keys())
     lab_slot_names = list(LAB_SLOTS.keys())
+
+    # Groups of theory/lab slots that overlap in real time
+    slot_cliques = overlap_cliques(build_time_grid({'theory': THEORY_SLOTS, 'lab': LAB_SLOTS}))
     
     # Calculate total number of slots
     num_slots = len(theory_slot_names)  # Use theory slots as they cover all time periods
@@ -151,8 +167,10 @@ def create_timetable(csv_file_path):
             subject_consecutive_slots[key] = practical_slots > 0
 
     model = cp_model.CpModel()
+    profiler = BuildProfiler(model, 'withslot', enabled=bool(profile_build))
 
     # Define variables
+    profiler.section('variables')
     
     # Split assignment variables by type
     lecture_assignments = {}     # For lecture hours
@@ -197,6 +215,7 @@ def create_timetable(csv_file_path):
                             f'{teacher}_{subj}_practical_day{d}_slot{s}')
 
     # Teacher day slot type (A, B, or C)
+    profiler.section('day_category')
     teacher_day_slot_type = {}
     for teacher in teachers:
         for d in range(len(days)):
@@ -204,6 +223,7 @@ def create_timetable(csv_file_path):
             teacher_day_slot_type[(teacher, d)] = model.NewIntVar(0, 2, f'{teacher}_day{d}_slot_type')
 
     # Teacher teaching in a slot (any subject)
+    profiler.section('one_subject_per_slot')
     teacher_teaching = {}
     for teacher in teachers:
         for d in range(len(days)):
@@ -250,6 +270,7 @@ def create_timetable(csv_file_path):
     # Add constraints
     
     # Ensure each type of session gets the required number of slots
+    profiler.section('weekly_slots')
     for teacher in teachers:
         for subj in teacher_subjects[teacher]:
             key = (teacher, subj)
@@ -281,36 +302,28 @@ def create_timetable(csv_file_path):
     # This depends on how practicals are actually handled in your institution
     # For now, assuming each practical takes one lab slot
     
-    # Ensure a teacher can only teach one subject per time slot
+    profiler.section('one_subject_per_slot')
+    # Ensure a teacher teaches at most one session at any moment. Theory and lab slots
+    # overlap in time (e.g. L2 runs over T3 and T4), so one at-most-one per group of
+    # mutually overlapping slots covers both the same-slot and cross-type conflicts
     for teacher in teachers:
         for d in range(len(days)):
-            # For theory slots
-            for s in range(len(theory_slot_names)):
-                theory_assignments = []
-                for subj in teacher_subjects[teacher]:
-                    key = (teacher, subj)
-                    # Collect lecture and tutorial assignments for this slot
-                    if subject_lecture_slots[key] > 0 and (teacher, subj, d, s) in lecture_assignments:
-                        theory_assignments.append(lecture_assignments[(teacher, subj, d, s)])
-                    if subject_tutorial_slots[key] > 0 and (teacher, subj, d, s) in tutorial_assignments:
-                        theory_assignments.append(tutorial_assignments[(teacher, subj, d, s)])
-                
-                if theory_assignments:
-                    model.Add(sum(theory_assignments) <= 1)
-            
-            # For lab slots
-            for s in range(len(lab_slot_names)):
-                lab_assignments = []
-                for subj in teacher_subjects[teacher]:
-                    key = (teacher, subj)
-                    # Collect practical assignments for this slot
-                    if subject_practical_slots[key] > 0 and (teacher, subj, d, s) in practical_assignments:
-                        lab_assignments.append(practical_assignments[(teacher, subj, d, s)])
-                
-                if lab_assignments:
-                    model.Add(sum(lab_assignments) <= 1)
+            for clique in slot_cliques:
+                clique_assignments = []
+                for kind, s in clique:
+                    for subj in teacher_subjects[teacher]:
+                        if kind == 'theory':
+                            for assignments in (lecture_assignments, tutorial_assignments):
+                                if (teacher, subj, d, s) in assignments:
+                                    clique_assignments.append(assignments[(teacher, subj, d, s)])
+                        elif (teacher, subj, d, s) in practical_assignments:
+                            clique_assignments.append(practical_assignments[(teacher, subj, d, s)])
+
+                if len(clique_assignments) > 1:
+                    model.AddAtMostOne(clique_assignments)
     
     # No more than MAX_CONSECUTIVE_SLOTS consecutive teaching slots
+    profiler.section('consecutive_limit')
     for teacher in teachers:
         for d in range(len(days)):
             # For theory slots
@@ -332,6 +345,7 @@ def create_timetable(csv_file_path):
                 model.Add(sum(consecutive_vars) <= MAX_CONSECUTIVE_SLOTS)
 
     # Slot type constraints
+    profiler.section('day_category')
     for teacher in teachers:
         for d in range(len(days)):
             # For each slot type (A, B, C)
@@ -372,6 +386,7 @@ def create_timetable(csv_file_path):
                                 model.Add(practical_assignments[(teacher, subj, d, s)] == 0).OnlyEnforceIf(is_this_slot_type)
 
     # Maximum teaching hours per day
+    profiler.section('max_hours')
     for teacher in teachers:
         for d in range(len(days)):
             # Count all teaching slots (theory and lab) for this day
@@ -388,6 +403,7 @@ def create_timetable(csv_file_path):
             model.Add(sum(day_slots) <= MAX_HOURS_PER_DAY)
 
     # Ensure each teacher has a balanced distribution of slot types
+    profiler.section('variety')
     for teacher in teachers:
         for slot_type_idx, slot_type in enumerate(SLOT_TYPE_MAP.values()):
             slot_type_days = []
@@ -402,6 +418,7 @@ def create_timetable(csv_file_path):
             model.Add(sum(slot_type_days) <= 2)
 
     # Mon-Fri or Tue-Sat working days
+    profiler.section('mon_fri')
     for teacher in teachers:
         # Each teacher is either in Mon-Fri batch or Tue-Sat batch
         mon_to_fri = model.NewBoolVar(f'{teacher}_mon_to_fri')
@@ -427,7 +444,12 @@ def create_timetable(csv_file_path):
                 model.Add(sum(day_slots) == 0).OnlyEnforceIf(mon_to_fri.Not())
 
     solver = cp_model.CpSolver()
+    apply_solver_config(solver, solver_config)
+    profiler.solve_started(len(teachers))
     status = solver.Solve(model)
+    profiler.solve_finished(solver, status)
+    profiler.save(profile_build)
+    record_solve(solver_config, solver, status, 'withslot', len(teachers))
 
     # Create timetable output in the specific format requested
     teacher_timetables = {}
@@ -15,6 +15,7 @@ merged_df.drop(columns=["teacher"], inplace=True)
 final_columns = ["course_code", "Faculty", "lecture_hours", "tutorial_hours", "practical_hours", "credits", "id",
                  "day_0", "day_1", "day_2", "day_3", "day_4"]
 
-# Reorder and display the final DataFrame
+# Reorder and save the final DataFrame
 final_df = merged_df[final_columns]
-final_df.head()
+final_df.to_csv("final_course_teacher_schedule.csv", index=False)
+print("✅ Merged data saved to 'final_course_teacher_schedule.csv'")